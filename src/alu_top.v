@@ -6,8 +6,9 @@ module alu_top (
     input  wire [7:0] in,        // 8-bit input data bus for operand bytes
     output reg  [7:0] out,       // 8-bit output data bus for result bytes
 
-    input  wire       opcode,    // 1-bit opcode (0 for add, 1 for subtract)
-    input  wire       start,     // 'Start' signal for user to request an operation
+    input  wire [1:0] opcode,    // opcode[0]: 0 for add, 1 for subtract. opcode[1]: accumulate (A = previous result), sampled with start
+    input  wire       start,     // 'Start' signal for user to request an operation (held high while loading B[3] to stream the next one)
+                                 // The byte on 'in' with start in IDLE selects the number format, see FORMAT_*
     output reg        done,      // 'Done' signal indicating ready to output data
     output wire [3:0] state_out  // Current state of the ALU
 );
@@ -27,27 +28,63 @@ module alu_top (
     parameter OUTPUT_2    = 4'd12;  // Output byte 2 of result
     parameter OUTPUT_3    = 4'd13;  // Output byte 3 of result
 
+    // Number formats, latched from in[1:0] when an operation is started from IDLE and kept while streaming
+    parameter FORMAT_FP32 = 2'd0;   // One 32-bit float per operand
+    parameter FORMAT_FP16 = 2'd1;   // Two packed FP16 floats per operand, lane 0 in bits [15:0]
+    parameter FORMAT_BF16 = 2'd2;   // Two packed bfloat16 floats per operand (3 is reserved and works as FP32)
+
     // Register declaration
     reg [3:0]  state;               // Current state of ALU
     reg [31:0] operand_a;           // First input operand
     reg [31:0] operand_b;           // Second input operand
-    reg [23:0] partial_result;      // Final result after computation
+    reg [31:0] last_result;         // Result of the last operation, also the accumulator
+    reg        accumulate;          // Current operation uses last_result as operand A (operand A is not loaded)
+    reg        sub;                 // Current operation is a subtraction, opcode[0] sampled with the last byte of B
+    reg        pending;             // A streamed operation is executed in this cycle
+    reg [1:0]  format;              // Number format of the operands and results
+
+    // Operand A is either loaded or taken from the previous result
+    wire [31:0] addsub_a = accumulate ? last_result : operand_a;
+
+    // Wires to receive the result from the floating-point adder/subtractor, and from the two packed 16-bit lanes
+    wire [31:0] fp32_result;
+    wire [31:0] packed_result;
 
-    // Decide if operation is subtraction based on opcode
-    wire sub = opcode;  // 1 if subtract, 0 if add
+    wire is_packed = (format == FORMAT_FP16) | (format == FORMAT_BF16);
+    wire [31:0] addsub_result = is_packed ? packed_result : fp32_result;
 
-    // Wire to receive the result from the floating-point adder/subtractor
-    wire [31:0] addsub_result;
+    // Streaming: if start is high while the last byte of B is loaded, the next operation starts loading straight
+    // away. The result is computed from the registered operands in the first cycle of the next operation (before
+    // its first byte overwrites them), so the adder only sits between registers. The result bytes are output
+    // while the next operand A is being loaded, giving 8 cycles per operation (4 cycles for accumulate
+    // operations, where the result is output while the next operand B is loaded).
 
     // Connect state register to the output for debug
     assign state_out = state;
 
     // Instantiate the floating-point add/subtract unit
     fp_addsub u_addsub (
-        .a      (operand_a),       // First operand input
+        .a      (addsub_a),        // First operand input
         .b      (operand_b),       // Second operand input
         .sub    (sub),             // Control: 1 for subtract, 0 for add
-        .result (addsub_result)    // Output result
+        .result (fp32_result)      // Output result
+    );
+
+    // Instantiate the two 16-bit lanes used in the packed formats
+    fp_addsub16 u_addsub_lane0 (
+        .a      (addsub_a[15:0]),
+        .b      (operand_b[15:0]),
+        .sub    (sub),
+        .bf16   (format == FORMAT_BF16),
+        .result (packed_result[15:0])
+    );
+
+    fp_addsub16 u_addsub_lane1 (
+        .a      (addsub_a[31:16]),
+        .b      (operand_b[31:16]),
+        .sub    (sub),
+        .bf16   (format == FORMAT_BF16),
+        .result (packed_result[31:16])
     );
 
     // Sequential logic: handles state transitions, input loading, and output
@@ -57,7 +94,11 @@ module alu_top (
             state          <= IDLE;
             operand_a      <= 32'd0;
             operand_b      <= 32'd0;
-            partial_result <= 24'd0;
+            last_result    <= 32'd0;
+            accumulate     <= 1'b0;
+            sub            <= 1'b0;
+            pending        <= 1'b0;
+            format         <= FORMAT_FP32;
             out            <= 8'd0;
             done           <= 1'b0;
         end else begin
@@ -65,25 +106,67 @@ module alu_top (
             case (state)
                 IDLE: begin
                     done <= 1'b0;  // Reset done signal just in case
-                    if (start)     // Wait for start signal
-                        state <= LOAD_A_0;
+                    if (start) begin  // Wait for start signal
+                        accumulate <= opcode[1];
+                        format     <= in[1:0];
+                        state      <= opcode[1] ? LOAD_B_0 : LOAD_A_0;  // Accumulate only loads operand B
+                    end
                 end
 
                 // Load 32-bit operand A one byte per cycle (LSB to MSB)
-                LOAD_A_0: begin operand_a[7:0]    <= in; state <= LOAD_A_1; end
-                LOAD_A_1: begin operand_a[15:8]   <= in; state <= LOAD_A_2; end
-                LOAD_A_2: begin operand_a[23:16]  <= in; state <= LOAD_A_3; end
-                LOAD_A_3: begin operand_a[31:24]  <= in; state <= LOAD_B_0; end
+                // When streaming, the previous operation is executed in LOAD_A_0 and its result is output while
+                // A is loaded (done is only high then)
+                LOAD_A_0: begin
+                    operand_a[7:0] <= in;
+                    state          <= LOAD_A_1;
+                    if (pending) begin
+                        last_result <= addsub_result;
+                        accumulate  <= 1'b0;
+                        pending     <= 1'b0;
+                        done        <= 1'b1;
+                        out         <= addsub_result[7:0];
+                    end
+                end
+                LOAD_A_1: begin operand_a[15:8]   <= in; state <= LOAD_A_2; if (done) out <= last_result[15:8];  end
+                LOAD_A_2: begin operand_a[23:16]  <= in; state <= LOAD_A_3; if (done) out <= last_result[23:16]; end
+                LOAD_A_3: begin operand_a[31:24]  <= in; state <= LOAD_B_0; if (done) out <= last_result[31:24]; end
 
                 // Load 32-bit operand B one byte per cycle (LSB to MSB)
-                LOAD_B_0: begin operand_b[7:0]    <= in; state <= LOAD_B_1; end
-                LOAD_B_1: begin operand_b[15:8]   <= in; state <= LOAD_B_2; end
-                LOAD_B_2: begin operand_b[23:16]  <= in; state <= LOAD_B_3; end
-                LOAD_B_3: begin operand_b[31:24]  <= in; state <= EXECUTE;  end
+                // When streaming accumulate operations, the previous operation is executed in LOAD_B_0 and its
+                // result is output at the same time
+                LOAD_B_0: begin
+                    operand_b[7:0] <= in;
+                    state          <= LOAD_B_1;
+                    if (pending) begin
+                        last_result <= addsub_result;
+                        accumulate  <= 1'b1;
+                        pending     <= 1'b0;
+                        done        <= 1'b1;
+                        out         <= addsub_result[7:0];
+                    end
+                    else begin
+                        done <= 1'b0;
+                    end
+                end
+                LOAD_B_1: begin operand_b[15:8]   <= in; state <= LOAD_B_2; if (done) out <= last_result[15:8];  end
+                LOAD_B_2: begin operand_b[23:16]  <= in; state <= LOAD_B_3; if (done) out <= last_result[23:16]; end
+                LOAD_B_3: begin
+                    operand_b[31:24] <= in;
+                    sub              <= opcode[0];
+                    if (done) out <= last_result[31:24];
+                    if (start) begin
+                        // Start loading the next operation, this one is executed in its first cycle
+                        pending <= 1'b1;
+                        state   <= opcode[1] ? LOAD_B_0 : LOAD_A_0;
+                    end
+                    else begin
+                        state <= EXECUTE;
+                    end
+                end
 
                 // Perform the selected floating-point operation
                 EXECUTE: begin
-                    partial_result <= addsub_result[31:8];  // Capture result TODO: We will need to make sure that fp_addsub finishes within 1 clock cycle
+                    last_result <= addsub_result;           // Capture result TODO: We will need to make sure that fp_addsub finishes within 1 clock cycle
                     state  <= OUTPUT_0;                     // Begin output phase
                     done   <= 1'b1;                         // Set 'done' high, which will begin to be high in the next state
                     out    <= addsub_result[7:0];           // Set first byte, which will begin to send in the next state
@@ -91,15 +174,15 @@ module alu_top (
 
                 // Output result byte-by-byte, LSB to MSB
                 OUTPUT_0: begin
-                    out        <= partial_result[7:0];   // Set byte 1
+                    out        <= last_result[15:8];   // Set byte 1
                     state      <= OUTPUT_1;
                 end
                 OUTPUT_1: begin
-                    out        <= partial_result[15:8];  // Set byte 2
+                    out        <= last_result[23:16];  // Set byte 2
                     state      <= OUTPUT_2;
                 end
                 OUTPUT_2: begin
-                    out        <= partial_result[23:16];  // Set byte 3
+                    out        <= last_result[31:24];  // Set byte 3
                     state      <= OUTPUT_3;
                 end
                 OUTPUT_3: begin
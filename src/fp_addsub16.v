@@ -0,0 +1,142 @@
+/*
+ * Copyright (c) 2024 Your Name
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+`default_nettype none
+
+// 16-bit floating point adder/subtractor for the packed lanes of alu_top, in FP16 (1/5/10) or bfloat16
+// (1/8/7) selected at run time. It works like fp_addsub (truncate-on-align, no rounding, subnormals,
+// signed zeros and a canonical quiet NaN) on a shared datapath with an 8-bit exponent and an 11-bit
+// mantissa. bfloat16 mantissas sit in the upper 8 bits, and the alignment shift drops what falls below
+// them, so both formats give the same results as fp_addsub would with their field widths.
+module fp_addsub16 (
+    input  wire [15:0] a,      // Input float A
+    input  wire [15:0] b,      // Input float B
+    input  wire        sub,    // Operation select: 0 = add, 1 = subtract
+    input  wire        bf16,   // Format select: 0 = FP16, 1 = bfloat16
+    output reg  [15:0] result  // Resulting float, same format as the inputs
+);
+
+    // Step 1: Unpack inputs
+
+    wire sign_a = a[15];             // Sign bit of A
+    wire sign_b = b[15] ^ sub;       // Sign bit of B, flipped if subtracting
+
+    wire [7:0] raw_exp_a = bf16 ? a[14:7] : {3'b0, a[14:10]}; // Raw exponent of A
+    wire [7:0] raw_exp_b = bf16 ? b[14:7] : {3'b0, b[14:10]}; // Raw exponent of B
+    wire [9:0] frac_a    = bf16 ? {a[6:0], 3'b0} : a[9:0];    // Stored mantissa of A, left-aligned
+    wire [9:0] frac_b    = bf16 ? {b[6:0], 3'b0} : b[9:0];    // Stored mantissa of B, left-aligned
+
+    wire [7:0] exp_max  = bf16 ? 8'hFF : 8'h1F;          // Exponent of infinity and NaN
+    wire [10:0] man_lsb = bf16 ? 11'b111_1111_1000 : 11'h7FF;  // Mantissa bits that exist in the format
+
+    wire is_subnormal_a = (raw_exp_a == 8'b0); // Check if A is subnormal
+    wire is_subnormal_b = (raw_exp_b == 8'b0); // Check if B is subnormal
+
+    wire [7:0] exp_a = is_subnormal_a ? 8'd1 : raw_exp_a; // Adjust exponent of A for subnormal numbers
+    wire [7:0] exp_b = is_subnormal_b ? 8'd1 : raw_exp_b; // Adjust exponent of B for subnormal numbers
+
+    wire [10:0] man_a = {~is_subnormal_a, frac_a}; // Mantissa of A with implicit leading 1 if normalized
+    wire [10:0] man_b = {~is_subnormal_b, frac_b}; // Mantissa of B with implicit leading 1 if normalized
+
+    // Step 1.5: Handle special cases (NaN, infinity, zero)
+
+    wire is_special_a = (raw_exp_a == exp_max);
+    wire is_special_b = (raw_exp_b == exp_max);
+
+    wire is_man_zero_a = (frac_a == 0);
+    wire is_man_zero_b = (frac_b == 0);
+
+    wire is_nan_a = is_special_a & (~is_man_zero_a);  // A is NaN if exponent is all 1s and mantissa is nonzero
+    wire is_nan_b = is_special_b & (~is_man_zero_b);  // B is NaN
+
+    wire is_inf_a = is_special_a & is_man_zero_a;  // A is infinity if exponent is all 1s and mantissa is zero
+    wire is_inf_b = is_special_b & is_man_zero_b;  // B is infinity
+
+    wire is_zero_a = is_subnormal_a & is_man_zero_a;  // A is zero if exponent is all 0s and mantissa is zero
+    wire is_zero_b = is_subnormal_b & is_man_zero_b;  // B is zero
+
+    // Step 2: Align exponents, bits shifted below the format's mantissa are dropped
+
+    wire exp_a_greater = (exp_a >= exp_b);  // Determine which operand has greater exponent
+    wire [7:0] exp_diff = exp_a_greater ? (exp_a - exp_b) : (exp_b - exp_a); // Compute exponent difference
+
+    wire [10:0] man_a_shifted = exp_a_greater ? man_a : ((man_a >> exp_diff) & man_lsb);  // Shift A's mantissa if needed
+    wire [10:0] man_b_shifted = exp_a_greater ? ((man_b >> exp_diff) & man_lsb) : man_b;  // Shift B's mantissa if needed
+
+    wire [7:0] exp_base = exp_a_greater ? exp_a : exp_b;  // Base exponent used after alignment
+
+    // Step 3: Add/Sub aligned mantissas
+
+    wire [11:0] extended_a = {1'b0, man_a_shifted};  // Extend mantissas to 12 bits (guard bit to capture overflow)
+    wire [11:0] extended_b = {1'b0, man_b_shifted};
+
+    wire extended_a_greater = (extended_a >= extended_b);  // Determine dominant magnitude
+    wire sign_equal = (sign_a == sign_b);                  // True if signs are the same
+
+    wire [11:0] sum = sign_equal ? (extended_a + extended_b) :  // If same sign: add
+                      (extended_a_greater ? extended_a - extended_b : extended_b - extended_a);  // Else: subtract smaller from larger
+
+    wire sign_res = extended_a_greater ? sign_a : sign_b; // Determine result sign based on dominant operand
+
+    // Step 4: Normalize result using static priority encoder
+
+    reg [7:0] shift;       // Number of left shifts required for normalization
+    reg [7:0] exp_res;     // Exponent of the result
+    reg [9:0] man_res;     // Stored mantissa of the result, left-aligned as in frac_a
+
+    always @(*) begin
+        casez (sum[10:0])
+            11'b1??????????: shift = 0;
+            11'b01?????????: shift = 1;
+            11'b001????????: shift = 2;
+            11'b0001???????: shift = 3;
+            11'b00001??????: shift = 4;
+            11'b000001?????: shift = 5;
+            11'b0000001????: shift = 6;
+            11'b00000001???: shift = 7;
+            11'b000000001??: shift = 8;
+            11'b0000000001?: shift = 9;
+            default:         shift = 10;
+        endcase
+
+        // If MSB is 1 (overflow), shift right and increment exponent, infinity if it reaches exp_max
+        if (sum[11] == 1'b1) begin
+            exp_res = exp_base + 1;
+            man_res = (exp_base + 1 == exp_max) ? 10'd0 : sum[10:1];
+        end
+        // Subnormal result (exponent becomes <= 0), keep the unshifted mantissa
+        else if (exp_base <= shift) begin
+            exp_res = 8'd0;
+            man_res = sum[9:0];
+        end
+        else begin
+            exp_res = exp_base - shift;
+            man_res = sum[9:0] << shift;
+        end
+    end
+
+    always @(*) begin
+        // Special case: NaN or inf - inf
+        if (is_nan_a | is_nan_b | (is_inf_a & is_inf_b & (sign_a ^ sign_b))) begin
+            result = bf16 ? 16'h7FC0 : 16'h7E00;  // Return quiet NaN (+qNaN)
+        end
+        // Special case: A is infinity
+        else if (is_inf_a) begin
+            result = bf16 ? {sign_a, 8'hFF, 7'd0} : {sign_a, 5'h1F, 10'd0};  // Return signed infinity
+        end
+        // Special case: B is infinity
+        else if (is_inf_b) begin
+            result = bf16 ? {sign_b, 8'hFF, 7'd0} : {sign_b, 5'h1F, 10'd0};  // Return signed infinity
+        end
+        // Special case: -0 + -0 = -0, all other signed zero operations result in +0
+        else if (sum == 12'd0) begin
+            result = {sign_a & sign_b & is_zero_a & is_zero_b, 15'd0};
+        end
+        else begin
+            result = bf16 ? {sign_res, exp_res, man_res[9:3]} : {sign_res, exp_res[4:0], man_res};
+        end
+    end
+
+endmodule
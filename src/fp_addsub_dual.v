@@ -0,0 +1,181 @@
+/*
+ * Copyright (c) 2024 Your Name
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+`default_nettype none
+
+// Variant of fp_addsub with a near/far dual-path datapath, producing bit-identical results.
+// fp_addsub aligns with a full right shift and then normalizes with a full left shift, but no
+// operation needs both. An effective subtraction with an exponent difference of 0 or 1 (near path)
+// aligns by at most one bit and may cancel any number of leading bits. Every other operation (far
+// path) needs the full alignment shift, but its sum is normalized by at most one bit either way.
+// When the exponent difference shifts the smaller operand out completely, the larger operand is the
+// result and both paths are bypassed.
+module fp_addsub_dual (
+    input  wire [31:0] a,      // Input float A (IEEE 754 format)
+    input  wire [31:0] b,      // Input float B (IEEE 754 format)
+    input  wire        sub,    // Operation select: 0 = add, 1 = subtract
+    output reg  [31:0] result  // Resulting float (IEEE 754 format)
+);
+
+    // Step 1: Unpack inputs
+
+    wire sign_a = a[31];             // Sign bit of A
+    wire sign_b = b[31] ^ sub;       // Sign bit of B, flipped if subtracting
+
+    wire [7:0] raw_exp_a = a[30:23]; // Raw exponent of A
+    wire [7:0] raw_exp_b = b[30:23]; // Raw exponent of B
+
+    wire is_subnormal_a = (raw_exp_a == 8'b0); // Check if A is subnormal
+    wire is_subnormal_b = (raw_exp_b == 8'b0); // Check if B is subnormal
+
+    wire [7:0] exp_a = is_subnormal_a ? 8'd1 : raw_exp_a; // Adjust exponent of A for subnormal numbers
+    wire [7:0] exp_b = is_subnormal_b ? 8'd1 : raw_exp_b; // Adjust exponent of B for subnormal numbers
+
+    wire [23:0] man_a = is_subnormal_a ? {1'b0, a[22:0]} : {1'b1, a[22:0]}; // Mantissa of A with implicit leading 1 if normalized
+    wire [23:0] man_b = is_subnormal_b ? {1'b0, b[22:0]} : {1'b1, b[22:0]}; // Mantissa of B with implicit leading 1 if normalized
+
+    // Step 1.5: Handle special cases (NaN, infinity, zero)
+
+    wire is_special_a = (raw_exp_a == 8'hFF);
+    wire is_special_b = (raw_exp_b == 8'hFF);
+
+    wire is_man_zero_a = (a[22:0] == 0);
+    wire is_man_zero_b = (b[22:0] == 0);
+
+    wire is_nan_a = is_special_a & (~is_man_zero_a);  // A is NaN if exponent is all 1s and mantissa is nonzero
+    wire is_nan_b = is_special_b & (~is_man_zero_b);  // B is NaN
+
+    wire is_inf_a = is_special_a & is_man_zero_a;  // A is infinity if exponent is all 1s and mantissa is zero
+    wire is_inf_b = is_special_b & is_man_zero_b;  // B is infinity
+
+    wire is_zero_a = is_subnormal_a & is_man_zero_a;  // A is zero if exponenet is all 0s and mantissa is zero (otherwise there's an implicit leading 1)
+    wire is_zero_b = is_subnormal_b & is_man_zero_b;  // B is zero
+
+    // Step 2: Compare exponents and select the path
+
+    wire exp_a_greater = (exp_a >= exp_b);  // Determine which operand has greater exponent
+    wire [7:0] exp_diff = exp_a_greater ? (exp_a - exp_b) : (exp_b - exp_a); // Compute exponent difference
+
+    wire [7:0] exp_base = exp_a_greater ? exp_a : exp_b;  // Base exponent used after alignment
+
+    wire sign_equal = (sign_a == sign_b);       // True if signs are the same
+    wire near = ~sign_equal & (exp_diff <= 1);  // Effective subtraction that can cancel more than one leading bit
+    wire bypass = (exp_diff >= 8'd24);          // The smaller operand is shifted out completely
+
+    // Step 3a: Far path, full alignment shift, add/sub, normalize by at most one bit
+
+    // The operand with the greater exponent is also the greater magnitude here (or the signs are equal)
+    wire [23:0] man_big   = exp_a_greater ? man_a : man_b;
+    wire [23:0] man_small = exp_a_greater ? man_b : man_a;
+    wire        sign_far  = exp_a_greater ? sign_a : sign_b;
+
+    wire [23:0] man_small_shifted = man_small >> exp_diff[4:0];  // Differences of 24 and more are bypassed
+
+    wire [24:0] far_sum = sign_equal ? ({1'b0, man_big} + {1'b0, man_small_shifted}) :  // If same sign: add
+                                       ({1'b0, man_big} - {1'b0, man_small_shifted});   // Else: the smaller operand is at most half of the larger
+
+    // Step 3b: Near path, alignment by at most one bit, subtract, full normalize shift
+
+    wire [23:0] near_a = exp_a_greater ? man_a : {1'b0, man_a[23:1]};              // Shift A's mantissa if needed
+    wire [23:0] near_b = (exp_a_greater & exp_diff[0]) ? {1'b0, man_b[23:1]} : man_b;  // Shift B's mantissa if needed
+
+    wire near_a_greater = (near_a >= near_b);  // Determine dominant magnitude
+    wire [23:0] near_sum = near_a_greater ? near_a - near_b : near_b - near_a;  // Subtract smaller from larger
+    wire sign_near = near_a_greater ? sign_a : sign_b;  // Determine result sign based on dominant operand
+
+    reg [7:0] shift;     // Number of left shifts required to normalize the near path
+
+    always @(*) begin
+        // Priority encoder to detect how much to left-shift the mantissa
+        casez (near_sum)
+            24'b1???????????????????????: shift = 0;
+            24'b01??????????????????????: shift = 1;
+            24'b001?????????????????????: shift = 2;
+            24'b0001????????????????????: shift = 3;
+            24'b00001???????????????????: shift = 4;
+            24'b000001??????????????????: shift = 5;
+            24'b0000001?????????????????: shift = 6;
+            24'b00000001????????????????: shift = 7;
+            24'b000000001???????????????: shift = 8;
+            24'b0000000001??????????????: shift = 9;
+            24'b00000000001?????????????: shift = 10;
+            24'b000000000001????????????: shift = 11;
+            24'b0000000000001???????????: shift = 12;
+            24'b00000000000001??????????: shift = 13;
+            24'b000000000000001?????????: shift = 14;
+            24'b0000000000000001????????: shift = 15;
+            24'b00000000000000001???????: shift = 16;
+            24'b000000000000000001??????: shift = 17;
+            24'b0000000000000000001?????: shift = 18;
+            24'b00000000000000000001????: shift = 19;
+            24'b000000000000000000001???: shift = 20;
+            24'b0000000000000000000001??: shift = 21;
+            24'b00000000000000000000001?: shift = 22;
+            24'b000000000000000000000001: shift = 23;
+            default: shift = 8'd24; // Zero difference, handled as a signed zero
+        endcase
+    end
+
+    // Step 4: Select the result
+
+    always @(*) begin
+        // Special case: NaN or inf - inf
+        if (is_nan_a | is_nan_b | (is_inf_a & is_inf_b & (sign_a ^ sign_b))) begin
+            result = 32'h7FC00000;  // Return quiet NaN (+qNaN)
+        end
+        // Special case: A is infinity
+        else if (is_inf_a) begin
+            result = {sign_a, 8'hFF, 23'd0};  // Return signed infinity
+        end
+        // Special case: B is infinity
+        else if (is_inf_b) begin
+            result = {sign_b, 8'hFF, 23'd0};  // Return signed infinity
+        end
+        // Bypass: the smaller operand doesn't reach the mantissa, return the larger one
+        else if (bypass) begin
+            result = exp_a_greater ? {sign_a, a[30:0]} : {sign_b, b[30:0]};
+        end
+        // Special case: -0 + -0 = -0 - +0 = -0, all other signed zero operations result in +0
+        else if (near ? (near_sum == 24'd0) : (far_sum == 25'd0)) begin
+            if(sign_a & sign_b & is_zero_a & is_zero_b) begin
+                result = {1'b1, 31'd0};  // -0 + -0 = -0
+            end
+            else begin
+                result = 32'd0;  // Otherwise, it is always +0
+            end
+        end
+        else if (near) begin
+            if (exp_base <= shift) begin
+                // Subnormal result (exponent becomes <= 0, which is no longer a normalized number)
+                result[31]    = sign_near;      // Sign bit
+                result[30:23] = 8'd0;           // Exponent = 0
+                result[22:0]  = near_sum[22:0]; // Unshifted mantissa
+            end
+            else begin
+                result[31]    = sign_near;              // Sign bit
+                result[30:23] = exp_base - shift;       // Adjusted exponent
+                result[22:0]  = near_sum[22:0] << shift; // Left-shifted mantissa (without leading 1)
+            end
+        end
+        // Far path: if MSB is 1 (overflow), shift right and increment exponent
+        else if (far_sum[24] == 1'b1) begin
+            result[31]    = sign_far;           // Sign bit
+            result[30:23] = exp_base + 1;       // Increase exponent
+            result[22:0]  = (exp_base + 1 == 8'hFF) ? 0 : far_sum[23:1];  // If overflow, set to infinity. Otherwise, drop LSB and implicit 1
+        end
+        // Far path: already normalized
+        else if (far_sum[23] == 1'b1) begin
+            result = {sign_far, exp_base, far_sum[22:0]};
+        end
+        // Far path: one bit lost to the subtraction, or both operands subnormal (exponent 1)
+        else if (exp_base == 8'd1) begin
+            result = {sign_far, 8'd0, far_sum[22:0]};  // Subnormal result, unshifted mantissa
+        end
+        else begin
+            result = {sign_far, exp_base - 8'd1, far_sum[21:0], 1'b0};  // Shift left by one
+        end
+    end
+
+endmodule
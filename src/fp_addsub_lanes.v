@@ -0,0 +1,37 @@
+/*
+ * Copyright (c) 2024 Your Name
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+`default_nettype none
+
+// Implementation of fp_addsub in every lane (fp_addsub or one of its bit-identical variants)
+`ifndef FP_ADDSUB
+`define FP_ADDSUB fp_addsub
+`endif
+
+// LANES independent fp_addsub units side by side, with packed buses: lane i takes a[32*i +: 32],
+// b[32*i +: 32] and sub[i] and drives result[32*i +: 32]. The testbench uses it to check LANES
+// vectors per simulator step, and it is the starting point of a multi-lane datapath.
+module fp_addsub_lanes #(
+    parameter LANES = 8                   // Number of adders
+) (
+    input  wire [32*LANES-1:0] a,         // Input floats A, lane 0 in the low bits
+    input  wire [32*LANES-1:0] b,         // Input floats B
+    input  wire [LANES-1:0]    sub,       // Operation select per lane: 0 = add, 1 = subtract
+    output wire [32*LANES-1:0] result     // Resulting floats
+);
+
+    genvar i;
+    generate
+        for (i = 0; i < LANES; i = i + 1) begin : lane
+            `FP_ADDSUB u_addsub (
+                .a      (a[32*i +: 32]),
+                .b      (b[32*i +: 32]),
+                .sub    (sub[i]),
+                .result (result[32*i +: 32])
+            );
+        end
+    endgenerate
+
+endmodule
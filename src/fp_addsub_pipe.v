@@ -0,0 +1,229 @@
+/*
+ * Copyright (c) 2024 Your Name
+ * SPDX-License-Identifier: Apache-2.0
+ */
+
+`default_nettype none
+
+// Pipelined version of fp_addsub, producing bit-identical results.
+// The datapath is split into three stages (align, add, normalize) with a register after each enabled stage:
+//   STAGES = 1: result register only                    (latency 1)
+//   STAGES = 2: align | add + normalize                 (latency 2)
+//   STAGES = 3: align | add | normalize                 (latency 3)
+// A new operation can be started every cycle, valid_out follows valid_in after STAGES cycles.
+module fp_addsub_pipe #(
+    parameter STAGES = 3           // Number of pipeline stages (1 to 3)
+) (
+    input  wire        clk,        // Clock input
+    input  wire        rst_n,      // Active-low reset input
+    input  wire        valid_in,   // a, b and sub hold an operation to start this cycle
+    input  wire [31:0] a,          // Input float A (IEEE 754 format)
+    input  wire [31:0] b,          // Input float B (IEEE 754 format)
+    input  wire        sub,        // Operation select: 0 = add, 1 = subtract
+    output reg         valid_out,  // result holds the result of an operation
+    output reg  [31:0] result      // Resulting float (IEEE 754 format)
+);
+
+    // Any other value would build a 3-stage pipe, with a latency that doesn't match STAGES
+    generate
+        if (STAGES < 1 || STAGES > 3) begin : bad_stages
+            $error("fp_addsub_pipe: STAGES must be 1, 2 or 3, got %0d", STAGES);
+        end
+    endgenerate
+
+    // ---------------------------------------------------------------------------------------------
+    // Stage 1: Unpack, detect special cases and align exponents
+    // ---------------------------------------------------------------------------------------------
+
+    wire sign_a = a[31];             // Sign bit of A
+    wire sign_b = b[31] ^ sub;       // Sign bit of B, flipped if subtracting
+
+    wire [7:0] raw_exp_a = a[30:23]; // Raw exponent of A
+    wire [7:0] raw_exp_b = b[30:23]; // Raw exponent of B
+
+    wire is_subnormal_a = (raw_exp_a == 8'b0); // Check if A is subnormal
+    wire is_subnormal_b = (raw_exp_b == 8'b0); // Check if B is subnormal
+
+    wire [7:0] exp_a = is_subnormal_a ? 8'd1 : raw_exp_a; // Adjust exponent of A for subnormal numbers
+    wire [7:0] exp_b = is_subnormal_b ? 8'd1 : raw_exp_b; // Adjust exponent of B for subnormal numbers
+
+    wire [23:0] man_a = is_subnormal_a ? {1'b0, a[22:0]} : {1'b1, a[22:0]}; // Mantissa of A with implicit leading 1 if normalized
+    wire [23:0] man_b = is_subnormal_b ? {1'b0, b[22:0]} : {1'b1, b[22:0]}; // Mantissa of B with implicit leading 1 if normalized
+
+    wire is_special_a = (raw_exp_a == 8'hFF);
+    wire is_special_b = (raw_exp_b == 8'hFF);
+
+    wire is_man_zero_a = (a[22:0] == 0);
+    wire is_man_zero_b = (b[22:0] == 0);
+
+    wire is_nan_a = is_special_a & (~is_man_zero_a);  // A is NaN if exponent is all 1s and mantissa is nonzero
+    wire is_nan_b = is_special_b & (~is_man_zero_b);  // B is NaN
+
+    wire is_inf_a = is_special_a & is_man_zero_a;  // A is infinity if exponent is all 1s and mantissa is zero
+    wire is_inf_b = is_special_b & is_man_zero_b;  // B is infinity
+
+    wire is_zero_a = is_subnormal_a & is_man_zero_a;  // A is zero
+    wire is_zero_b = is_subnormal_b & is_man_zero_b;  // B is zero
+
+    wire is_nan_res = is_nan_a | is_nan_b | (is_inf_a & is_inf_b & (sign_a ^ sign_b));  // NaN or inf - inf
+    wire is_neg_zero = sign_a & sign_b & is_zero_a & is_zero_b;                        // -0 + -0 = -0
+
+    wire exp_a_greater = (exp_a >= exp_b);  // Determine which operand has greater exponent
+    wire [7:0] exp_diff = exp_a_greater ? (exp_a - exp_b) : (exp_b - exp_a); // Compute exponent difference
+
+    wire [23:0] man_a_shifted = exp_a_greater ? man_a : (man_a >> exp_diff);  // Shift A's mantissa if needed
+    wire [23:0] man_b_shifted = exp_a_greater ? (man_b >> exp_diff) : man_b;  // Shift B's mantissa if needed
+
+    wire [7:0] exp_base = exp_a_greater ? exp_a : exp_b;  // Base exponent used after alignment
+
+    // Everything the later stages need: valid, sign_a, sign_b, is_nan_res, is_inf_a, is_inf_b, is_neg_zero, exp_base, mantissas
+    localparam ALIGN_W = 1 + 6 + 8 + 24 + 24;
+    wire [ALIGN_W-1:0] align_d = {valid_in, sign_a, sign_b, is_nan_res, is_inf_a, is_inf_b, is_neg_zero,
+                                  exp_base, man_a_shifted, man_b_shifted};
+    wire [ALIGN_W-1:0] align_q;
+
+    generate
+        if (STAGES >= 2) begin : align_reg
+            reg [ALIGN_W-1:0] q;
+            always @(posedge clk or negedge rst_n) begin
+                if (!rst_n) q <= {ALIGN_W{1'b0}};
+                else        q <= align_d;
+            end
+            assign align_q = q;
+        end else begin : align_comb
+            assign align_q = align_d;
+        end
+    endgenerate
+
+    // ---------------------------------------------------------------------------------------------
+    // Stage 2: Add/Sub aligned mantissas
+    // ---------------------------------------------------------------------------------------------
+
+    wire        s2_valid;
+    wire        s2_sign_a, s2_sign_b, s2_is_nan_res, s2_is_inf_a, s2_is_inf_b, s2_is_neg_zero;
+    wire [7:0]  s2_exp_base;
+    wire [23:0] s2_man_a_shifted, s2_man_b_shifted;
+    assign {s2_valid, s2_sign_a, s2_sign_b, s2_is_nan_res, s2_is_inf_a, s2_is_inf_b, s2_is_neg_zero,
+            s2_exp_base, s2_man_a_shifted, s2_man_b_shifted} = align_q;
+
+    wire [24:0] extended_a = {1'b0, s2_man_a_shifted};  // Extend mantissas to 25 bits (guard bit to capture overflow)
+    wire [24:0] extended_b = {1'b0, s2_man_b_shifted};
+
+    wire extended_a_greater = (extended_a >= extended_b);  // Determine dominant magnitude
+    wire sign_equal = (s2_sign_a == s2_sign_b);            // True if signs are the same
+
+    wire [24:0] sum = sign_equal ? (extended_a + extended_b) :  // If same sign: add
+                      (extended_a_greater ? extended_a - extended_b : extended_b - extended_a);  // Else: subtract smaller from larger
+
+    wire sign_res = extended_a_greater ? s2_sign_a : s2_sign_b; // Determine result sign based on dominant operand
+
+    // valid, sign_a, sign_b, is_nan_res, is_inf_a, is_inf_b, is_neg_zero, sign_res, exp_base, sum
+    localparam ADD_W = 1 + 7 + 8 + 25;
+    wire [ADD_W-1:0] add_d = {s2_valid, s2_sign_a, s2_sign_b, s2_is_nan_res, s2_is_inf_a, s2_is_inf_b, s2_is_neg_zero,
+                              sign_res, s2_exp_base, sum};
+    wire [ADD_W-1:0] add_q;
+
+    generate
+        if (STAGES >= 3) begin : add_reg
+            reg [ADD_W-1:0] q;
+            always @(posedge clk or negedge rst_n) begin
+                if (!rst_n) q <= {ADD_W{1'b0}};
+                else        q <= add_d;
+            end
+            assign add_q = q;
+        end else begin : add_comb
+            assign add_q = add_d;
+        end
+    endgenerate
+
+    // ---------------------------------------------------------------------------------------------
+    // Stage 3: Normalize result
+    // ---------------------------------------------------------------------------------------------
+
+    wire        s3_valid;
+    wire        s3_sign_a, s3_sign_b, s3_is_nan_res, s3_is_inf_a, s3_is_inf_b, s3_is_neg_zero, s3_sign_res;
+    wire [7:0]  s3_exp_base;
+    wire [24:0] s3_sum;
+    assign {s3_valid, s3_sign_a, s3_sign_b, s3_is_nan_res, s3_is_inf_a, s3_is_inf_b, s3_is_neg_zero,
+            s3_sign_res, s3_exp_base, s3_sum} = add_q;
+
+    reg [7:0]  shift;         // Number of left shifts required for normalization
+    reg [31:0] normalized;    // Result before the output register
+
+    always @(*) begin
+        // Priority encoder to detect how much to left-shift the mantissa
+        casez (s3_sum[23:0])
+            24'b1???????????????????????: shift = 0;
+            24'b01??????????????????????: shift = 1;
+            24'b001?????????????????????: shift = 2;
+            24'b0001????????????????????: shift = 3;
+            24'b00001???????????????????: shift = 4;
+            24'b000001??????????????????: shift = 5;
+            24'b0000001?????????????????: shift = 6;
+            24'b00000001????????????????: shift = 7;
+            24'b000000001???????????????: shift = 8;
+            24'b0000000001??????????????: shift = 9;
+            24'b00000000001?????????????: shift = 10;
+            24'b000000000001????????????: shift = 11;
+            24'b0000000000001???????????: shift = 12;
+            24'b00000000000001??????????: shift = 13;
+            24'b000000000000001?????????: shift = 14;
+            24'b0000000000000001????????: shift = 15;
+            24'b00000000000000001???????: shift = 16;
+            24'b000000000000000001??????: shift = 17;
+            24'b0000000000000000001?????: shift = 18;
+            24'b00000000000000000001????: shift = 19;
+            24'b000000000000000000001???: shift = 20;
+            24'b0000000000000000000001??: shift = 21;
+            24'b00000000000000000000001?: shift = 22;
+            24'b000000000000000000000001: shift = 23;
+            default: shift = 8'd24; // Only when sum is 0, which is handled separately
+        endcase
+
+        // Special case: NaN or inf - inf
+        if (s3_is_nan_res) begin
+            normalized = 32'h7FC00000;  // Return quiet NaN (+qNaN)
+        end
+        // Special case: A is infinity
+        else if (s3_is_inf_a) begin
+            normalized = {s3_sign_a, 8'hFF, 23'd0};  // Return signed infinity
+        end
+        // Special case: B is infinity
+        else if (s3_is_inf_b) begin
+            normalized = {s3_sign_b, 8'hFF, 23'd0};  // Return signed infinity
+        end
+        // Special case: only -0 + -0 = -0, all other zero results are +0
+        else if (s3_sum == 25'd0) begin
+            normalized = {s3_is_neg_zero, 31'd0};
+        end
+        // If MSB is 1 (overflow), shift right and increment exponent
+        else if (s3_sum[24] == 1'b1) begin
+            normalized[31]    = s3_sign_res;           // Sign bit
+            normalized[30:23] = s3_exp_base + 1;       // Increase exponent
+            normalized[22:0]  = (s3_exp_base + 1 == 8'hFF) ? 23'd0 : s3_sum[23:1];  // If overflow, set to infinity
+        end
+        // Subnormal result (exponent becomes <= 0)
+        else if (s3_exp_base <= shift) begin
+            normalized[31]    = s3_sign_res;   // Sign bit
+            normalized[30:23] = 8'd0;          // Exponent = 0
+            normalized[22:0]  = s3_sum[22:0];  // Unshifted mantissa
+        end
+        else begin
+            normalized[31]    = s3_sign_res;                 // Sign bit
+            normalized[30:23] = s3_exp_base - shift;         // Adjusted exponent
+            normalized[22:0]  = s3_sum[22:0] << shift;       // Left-shifted mantissa (without leading 1)
+        end
+    end
+
+    // Output register
+    always @(posedge clk or negedge rst_n) begin
+        if (!rst_n) begin
+            valid_out <= 1'b0;
+            result    <= 32'd0;
+        end else begin
+            valid_out <= s3_valid;
+            result    <= normalized;
+        end
+    end
+
+endmodule
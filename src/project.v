@@ -27,7 +27,7 @@ module tt_um_32_bit_fp_ALU_S_M (
         .rst_n     (rst_n),         // Connect active-low reset
         .in        (ui_in),         // Operand input byte from input pins
         .out       (uo_out),        // Result output byte to output pins
-        .opcode    (uio_in[0]),     // Opcode: choose which operation for ALU to do
+        .opcode    (uio_in[1:0]),   // Opcode: choose which operation for ALU to do
         .start     (uio_in[2]),     // 'Start' signal: request ALU to do an operation
         .done      (uio_out[3]),    // 'Done' signal: ready for outputting
         .state_out (uio_out[7:4])   // Current state of ALU
@@ -36,6 +36,6 @@ module tt_um_32_bit_fp_ALU_S_M (
     assign uio_out[2:0] = 3'b000;   // Avoid "undriven" warning
 
     // List all unused inputs to prevent warnings
-    wire _unused = &{ena, uio_in[7:3], uio_in[1], 1'b0};
+    wire _unused = &{ena, uio_in[7:3], 1'b0};
 
 endmodule
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+
+"""Switching activity of a waveform dump, per signal, per module and per class of fp_addsub operation.
+
+The dump is read as a stream, one line at a time, so memory does not grow with its length and multi-GB
+dumps work. FST files are converted on the fly with fst2vcd (part of gtkwave), .gz files are decompressed.
+
+A toggle is a 0 -> 1 or 1 -> 0 transition of one bit. Changes from or to x/z, which is also what the
+testbench dumps while dumping is switched off, are not counted. Operations are delimited by the inputs of
+the adder: every time step where a, b or sub of an fp_addsub instance changes starts a new operation
+window, and the toggles of that step and of every step until the next operation belong to it. Each window
+is binned by the branch of fp_addsub.v the operation takes (the bins of fp_coverage.py), and the signals of
+the adder are grouped into the parts of its datapath (PARTS), so the report shows which parts switch the
+most for which kind of operation.
+
+    make -B DUMP=1 DUMP_SCOPE=multi_lane_adder MODULE=test_fp_addsub TESTCASE=test_random_regression FP_VECTORS=100000
+    python activity.py unit_tests.vcd --saif activity.saif --windows windows.csv
+
+The report goes to activity.json. --saif writes the per-bit toggle counts and the time spent at 0, 1 and
+x in SAIF, which power estimators read (e.g. read_saif in OpenSTA). Dump the gate-level netlist
+(GATES=yes) for net names that match the hardened design.
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+import fp_coverage
+
+
+ACTIVITY_FILE = "activity.json"
+OP_SIGNALS = ("a", "b", "sub")  # Inputs of fp_addsub that start a new operation when they change
+BATCH = 4096                    # Operation windows classified at once
+
+# Part of the datapath of fp_addsub and its variants (fp_addsub_lza, fp_addsub_dual) every signal belongs to
+PARTS = {
+    "operands": ["a", "b", "sub"],
+    "unpack": ["sign_a", "sign_b", "raw_exp_a", "raw_exp_b", "is_subnormal_a", "is_subnormal_b", "exp_a", "exp_b",
+               "man_a", "man_b", "is_special_a", "is_special_b", "is_man_zero_a", "is_man_zero_b", "is_nan_a",
+               "is_nan_b", "is_inf_a", "is_inf_b", "is_zero_a", "is_zero_b"],
+    "align": ["exp_a_greater", "exp_diff", "exp_base", "man_a_shifted", "man_b_shifted", "near", "bypass",
+              "man_big", "man_small", "man_small_shifted", "near_a", "near_b", "near_a_greater"],
+    "sum": ["extended_a", "extended_b", "extended_a_greater", "sign_equal", "sum", "sign_res", "far_sum",
+            "near_sum", "sign_near"],
+    "normalize": ["shift", "t", "man_or", "indicator", "lza_shift", "exp_norm", "exp_corrected", "sum_shifted",
+                  "man_norm"],
+    "result": ["result"],
+}
+PART_NAMES = list(PARTS) + ["other"]
+PART_OF = {signal: i for i, part in enumerate(PARTS) for signal in PARTS[part]}
+
+UNKNOWN = len(fp_coverage.BINS)  # Class of windows whose operands are not fully known (x/z)
+CLASSES = fp_coverage.BINS + ["unknown"]
+
+_RANGE = re.compile(r"\[(\d+)(?::(\d+))?\]")
+_KNOWN = str.maketrans("01xzXZ", "110000")
+_ZERO = str.maketrans("xzXZ", "0000")
+
+
+class Var:
+    """One $var of the dump"""
+
+    def __init__(self, scope, name, width, slot, msb, lsb):
+        self.scope = scope  # Path of the enclosing scope, a tuple of names
+        self.name = name
+        self.width = width
+        self.slot = slot    # Index of the value, shared by all vars with the same identifier code
+        self.msb = msb
+        self.lsb = lsb
+
+    @property
+    def path(self) -> str:
+        return ".".join(self.scope + (self.name,))
+
+    def bit_names(self) -> list:
+        """SAIF net name of every bit, LSB first"""
+        if self.msb is None:
+            return [self.name] if self.width == 1 else [f"{self.name}\\[{i}\\]" for i in range(self.width)]
+        step = 1 if self.msb >= self.lsb else -1
+        return [f"{self.name}\\[{self.lsb + step * i}\\]" for i in range(self.width)]
+
+
+@contextmanager
+def open_dump(path):
+    """Lines of a VCD file, decompressing .gz and converting .fst with fst2vcd"""
+    path = str(path)
+    if path.endswith(".fst"):
+        process = subprocess.Popen(["fst2vcd", path], stdout=subprocess.PIPE, text=True, bufsize=1 << 20)
+        try:
+            yield process.stdout
+        finally:
+            process.stdout.close()
+            process.wait()
+    elif path.endswith(".gz"):
+        with gzip.open(path, "rt") as f:
+            yield f
+    elif path == "-":
+        yield sys.stdin
+    else:
+        with open(path, buffering=1 << 20) as f:
+            yield f
+
+
+def read_header(lines, scope=None):
+    """Parse the declarations up to $enddefinitions, return (vars, {identifier code: slot}, widths, timescale)
+
+    Only the vars inside scope (a dotted path) are kept.
+    """
+    tokens = []
+    for line in lines:
+        tokens += line.split()
+        if "$enddefinitions" in tokens:
+            break
+    prefix = tuple(scope.split(".")) if scope else ()
+
+    variables, slots, widths, timescale = [], {}, [], "1 ns"
+    path, i = [], 0
+    while i < len(tokens):
+        end = tokens.index("$end", i)
+        keyword, args = tokens[i], tokens[i + 1:end]
+        if keyword == "$scope":
+            path.append(args[1])
+        elif keyword == "$upscope":
+            path.pop()
+        elif keyword == "$timescale":
+            timescale = " ".join(re.findall(r"\d+|[a-z]+", "".join(args)))
+        elif keyword == "$var" and tuple(path[:len(prefix)]) == prefix:
+            kind, width, code, name = args[0], int(args[1]), args[2], args[3]
+            match = _RANGE.search(" ".join(args[3:]))
+            if "[" in name:
+                name = name[:name.index("[")]
+            if kind not in ("real", "realtime", "string", "event"):
+                if code not in slots:
+                    slots[code] = len(widths)
+                    widths.append(width)
+                msb, lsb = (None, None) if match is None else (int(match.group(1)), int(match.group(2) or match.group(1)))
+                variables.append(Var(tuple(path), name, width, slots[code], msb, lsb))
+        i = end + 1
+    return variables, slots, widths, timescale
+
+
+def adder_scopes(variables) -> list:
+    """Scopes with the ports of a 32-bit fp_addsub (a, b, sub and result)"""
+    ports = {}
+    for var in variables:
+        if var.name in ("a", "b", "result") and var.width == 32 or var.name == "sub" and var.width == 1:
+            ports.setdefault(var.scope, set()).add(var.name)
+    return [scope for scope, names in ports.items() if len(names) == 4]
+
+
+class Activity:
+    """Toggle counts of every signal, in total and per class of operation of one fp_addsub instance"""
+
+    def __init__(self, variables, widths, adder=None, saif=False):
+        self.variables = variables
+        self.widths = widths
+        self.adder = adder
+        self.toggles = np.zeros(len(widths), dtype=np.int64)                      # Per slot, whole dump
+        self.by_class = np.zeros((len(CLASSES), len(widths)), dtype=np.int64)     # Per class and slot, inside windows
+        self.ops = np.zeros(len(CLASSES), dtype=np.int64)
+        self.duration = 0
+
+        # Part of the adder every slot belongs to, -1 for slots outside of it
+        self.part = np.full(len(widths), -1, dtype=np.int64)
+        self.op_slots = []
+        if adder is not None:
+            names = {var.name: var.slot for var in variables if var.scope == adder}
+            for name, slot in names.items():
+                self.part[slot] = PART_OF.get(name, len(PARTS))
+            self.op_slots = [names[name] for name in OP_SIGNALS]
+
+        # Per-bit counts for SAIF: toggles, time at 1 and time at x (time at 0 is the rest)
+        self.saif = saif
+        if saif:
+            self.tc = [[0] * width for width in widths]
+            self.t1 = [[0] * width for width in widths]
+            self.tx = [[0] * width for width in widths]
+
+    def read(self, lines, slots, windows=None):
+        """Accumulate the value changes after the header, windows is an optional csv.writer for every operation"""
+        widths = self.widths
+        full = [(1 << width) - 1 for width in widths]
+        value = [0] * len(widths)
+        known = [0] * len(widths)  # Bits that are 0 or 1, everything starts as x
+        since = [0] * len(widths)  # Time of the last change, for SAIF
+        toggles = [0] * len(widths)
+        op_slots = set(self.op_slots)
+        saif = self.saif
+
+        now = 0
+        step = []           # (slot, toggles) of the current time step
+        step_op = False     # An operand of the adder changed in the current time step
+        window = []         # (slot, toggles) of the current operation window
+        batch = Batch(self, windows)
+
+        def end_step():
+            nonlocal step, window, step_op
+            if step_op:
+                if batch.started:
+                    batch.add(window)
+                operands = [value[s] for s in self.op_slots]
+                batch.start(now, operands if all(known[s] == full[s] for s in self.op_slots) else None)
+                window, step_op = [], False
+            if batch.started:
+                window += step
+            step = []
+
+        for line in lines:
+            c = line[:1]
+            if c == "b" or c == "B":
+                bits, code = line[1:].split()
+            elif c in "01xzXZ" and c:
+                bits, code = c, line[1:].strip()
+            elif c == "#":
+                end_step()
+                now = int(line[1:])
+                continue
+            elif c == "$" and line.startswith("$comment") and "$end" not in line:
+                for line in lines:
+                    if "$end" in line:
+                        break
+                continue
+            else:
+                continue  # $dumpvars, $dumpoff, $end, reals and strings
+
+            slot = slots.get(code)
+            if slot is None:
+                continue
+            if bits.isdigit():
+                new, new_known = int(bits, 2), full[slot]  # Shorter values are left-extended with 0
+            else:
+                new, new_known = int(bits.translate(_ZERO), 2), int(bits.translate(_KNOWN), 2)
+                if bits[0] in "01":
+                    new_known |= full[slot] & ~((1 << len(bits)) - 1)
+            old, old_known = value[slot], known[slot]
+            if new == old and new_known == old_known:
+                continue
+
+            changed = (old ^ new) & old_known & new_known
+            n = changed.bit_count()
+            if n:
+                toggles[slot] += n
+                step.append((slot, n))
+            if slot in op_slots:
+                step_op = True
+            if saif:
+                self._saif_change(slot, old, old_known, changed, now - since[slot])
+                since[slot] = now
+            value[slot], known[slot] = new, new_known
+
+        end_step()
+        if batch.started:
+            batch.add(window)
+        batch.flush()
+        self.toggles += np.array(toggles, dtype=np.int64)
+        self.duration = now
+        if saif:
+            for slot in range(len(widths)):
+                self._saif_change(slot, value[slot], known[slot], 0, now - since[slot])
+
+    def _saif_change(self, slot, old, old_known, changed, dt):
+        t1, tx, tc = self.t1[slot], self.tx[slot], self.tc[slot]
+        for bits, counts, amount in ((old & old_known, t1, dt), (~old_known & ((1 << len(t1)) - 1), tx, dt), (changed, tc, 1)):
+            while bits:
+                low = bits & -bits
+                counts[low.bit_length() - 1] += amount
+                bits ^= low
+
+    def part_toggles(self, row) -> np.ndarray:
+        """Sum a per-slot row over the parts of the adder"""
+        inside = self.part >= 0
+        return np.bincount(self.part[inside], weights=row[inside], minlength=len(PART_NAMES))
+
+    def report(self) -> dict:
+        by_path = {var.path: int(self.toggles[var.slot]) for var in self.variables}
+        modules = {}
+        for var in self.variables:
+            for depth in range(1, len(var.scope) + 1):
+                name = ".".join(var.scope[:depth])
+                modules[name] = modules.get(name, 0) + int(self.toggles[var.slot])
+
+        classes = {}
+        for c in np.flatnonzero(self.ops):
+            ops = int(self.ops[c])
+            row = self.by_class[c]
+            classes[CLASSES[c]] = {
+                "ops": ops,
+                "toggles_per_op": round(float(row[self.part >= 0].sum()) / ops, 3),
+                "parts": {name: round(float(t) / ops, 3) for name, t in zip(PART_NAMES, self.part_toggles(row))},
+                "signals": {var.name: round(float(row[var.slot]) / ops, 3) for var in self.variables if var.scope == self.adder},
+            }
+        return {
+            "adder": ".".join(self.adder) if self.adder else None,
+            "duration": self.duration,
+            "ops": int(self.ops.sum()),
+            "classes": classes,
+            "modules": modules,
+            "signals": by_path,
+        }
+
+    def write_saif(self, path, timescale, top=None):
+        """Write the per-bit activity as SAIF, with one INSTANCE per scope below top"""
+        tree = {}
+        for var in self.variables:
+            node = tree
+            for name in var.scope:
+                node = node.setdefault(name, {})
+            node.setdefault(None, []).append(var)
+
+        def instance(f, name, node, indent):
+            f.write(f"{indent}(INSTANCE {name}\n")
+            if node.get(None):
+                f.write(f"{indent}  (NET\n")
+                for var in node[None]:
+                    s = var.slot
+                    for i, bit in enumerate(var.bit_names()):
+                        t1, tx = self.t1[s][i], self.tx[s][i]
+                        f.write(f"{indent}    ({bit} (T0 {self.duration - t1 - tx}) (T1 {t1}) (TX {tx}) (TC {self.tc[s][i]}) (IG 0))\n")
+                f.write(f"{indent}  )\n")
+            for child, subtree in node.items():
+                if child is not None:
+                    instance(f, child, subtree, indent + "  ")
+            f.write(f"{indent})\n")
+
+        with open(path, "w") as f:
+            f.write('(SAIFILE\n(SAIFVERSION "2.0")\n(DIRECTION "backward")\n(DESIGN )\n')
+            f.write(f'(DATE "{time.strftime("%a %b %d %H:%M:%S %Y")}")\n(VENDOR "")\n(PROGRAM_NAME "activity.py")\n(VERSION "1.0")\n')
+            f.write(f"(DIVIDER / )\n(TIMESCALE {timescale})\n(DURATION {self.duration})\n")
+            for name, node in tree.items():
+                instance(f, name, node, "")
+            f.write(")\n")
+
+
+class Batch:
+    """Closed operation windows waiting to be classified, flushed every BATCH windows"""
+
+    def __init__(self, activity, windows=None):
+        self.activity = activity
+        self.windows = windows  # csv.writer or None
+        self.count = 0          # Windows flushed so far
+        self.started = False
+        self.clear()
+
+    def clear(self):
+        self.times, self.operands, self.index, self.slots, self.toggles = [], [], [], [], []
+        self.closed = 0
+
+    def start(self, now, operands):
+        """Open a window at time now, operands is (a, b, sub) or None if any of them is not known"""
+        self.started = True
+        self.times.append(now)
+        self.operands.append(operands)
+
+    def add(self, window):
+        """Close the last started window with its (slot, toggles) pairs"""
+        n = len(self.operands) - 1
+        if window:
+            slots, toggles = zip(*window)
+            self.index += [n] * len(window)
+            self.slots += slots
+            self.toggles += toggles
+        self.closed = n + 1
+        if self.closed >= BATCH:
+            self.flush()
+
+    def flush(self):
+        n = self.closed
+        if n == 0:
+            return
+        activity = self.activity
+        valid = np.array([ops is not None for ops in self.operands], dtype=bool)
+        classes = np.full(n, UNKNOWN, dtype=np.int64)
+        if valid.any():
+            a, b, sub = np.array([ops for ops in self.operands if ops is not None], dtype=np.uint32).T
+            classes[valid] = fp_coverage.classify(a, b, sub)
+        activity.ops += np.bincount(classes, minlength=len(CLASSES))
+
+        index = np.array(self.index, dtype=np.int64)
+        slots = np.array(self.slots, dtype=np.int64)
+        toggles = np.array(self.toggles, dtype=np.int64)
+        np.add.at(activity.by_class, (classes[index], slots), toggles)
+
+        if self.windows is not None:
+            parts = np.zeros((n, len(PART_NAMES)), dtype=np.int64)
+            inside = activity.part[slots] >= 0
+            np.add.at(parts, (index[inside], activity.part[slots[inside]]), toggles[inside])
+            for i in range(n):
+                ops = self.operands[i]
+                operands = ("x", "x", "x") if ops is None else (f"{ops[0]:08x}", f"{ops[1]:08x}", ops[2])
+                self.windows.writerow([self.count + i, self.times[i], *operands, CLASSES[classes[i]], int(parts[i].sum()), *parts[i].tolist()])
+        self.count += n
+        self.clear()
+
+
+def print_summary(report):
+    print(f"{report['ops']} operations of {report['adder']}, toggles per operation:")
+    print(f"  {'class':<18} {'ops':>9} {'total':>8}" + "".join(f" {name:>9}" for name in PART_NAMES))
+    for name, c in sorted(report["classes"].items(), key=lambda item: -item[1]["toggles_per_op"]):
+        print(f"  {name:<18} {c['ops']:>9} {c['toggles_per_op']:>8.1f}" + "".join(f" {c['parts'][part]:>9.1f}" for part in PART_NAMES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dump", help="VCD file (.vcd, .vcd.gz, - for stdin) or FST file (needs fst2vcd)")
+    parser.add_argument("--scope", help="only count the signals below this scope, e.g. unit_tests.floating_point_adder")
+    parser.add_argument("--adder", help="scope of the fp_addsub instance that delimits operations (default: the first one found)")
+    parser.add_argument("--report", type=Path, default=Path(ACTIVITY_FILE), help=f"JSON report (default: {ACTIVITY_FILE})")
+    parser.add_argument("--saif", type=Path, help="also write the per-bit activity as SAIF")
+    parser.add_argument("--windows", type=Path, help="also write the toggles of every operation window per part as CSV")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open_dump(args.dump) as lines:
+        variables, slots, widths, timescale = read_header(lines, args.scope)
+        if not variables:
+            raise SystemExit(f"no signals in {args.dump}" + (f" below {args.scope}" if args.scope else ""))
+        adders = adder_scopes(variables)
+        adder = tuple(args.adder.split(".")) if args.adder else (adders[0] if adders else None)
+        if adder is not None and adder not in adders:
+            raise SystemExit(f"{args.adder} is not an fp_addsub instance, found: {', '.join('.'.join(s) for s in adders) or 'none'}")
+
+        activity = Activity(variables, widths, adder, saif=args.saif is not None)
+        if args.windows:
+            with open(args.windows, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["window", "time", "a", "b", "sub", "class", "toggles", *PART_NAMES])
+                activity.read(lines, slots, writer)
+        else:
+            activity.read(lines, slots)
+    elapsed = time.perf_counter() - start
+
+    report = {"dump": str(args.dump), "timescale": timescale, **activity.report()}
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.saif:
+        activity.write_saif(args.saif, timescale)
+
+    print(f"Read {len(variables)} signals over {report['duration']} x {timescale} in {elapsed:.1f} s, "
+          f"{int(activity.toggles.sum())} toggles")
+    if adder is None:
+        print("No fp_addsub instance in the dump, only per-signal and per-module toggles are reported")
+    else:
+        print_summary(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import numpy as np
+
+import fp_model
+
+
+# Cycle-accurate behavioral models of the clocked RTL blocks. clock() applies one rising edge
+# with the given inputs, the attributes hold the registered outputs after that edge. Results of
+# fp_addsub come from the bit-exact reference model in fp_model.py.
+
+IDLE, LOAD_A_0, LOAD_A_3, LOAD_B_0, LOAD_B_3, EXECUTE, OUTPUT_0, OUTPUT_3 = 0, 1, 4, 5, 8, 9, 10, 13
+FORMAT_FP32, FORMAT_FP16, FORMAT_BF16 = 0, 1, 2
+PACKED_FORMATS = {FORMAT_FP16: fp_model.FP16, FORMAT_BF16: fp_model.BF16}
+
+
+def addsub(a, b, sub, format=FORMAT_FP32) -> int:
+    if format in PACKED_FORMATS:
+        return int(fp_model.fp_addsub_packed(a, b, sub, PACKED_FORMATS[format]))
+    return int(fp_model.fp_addsub(a, b, sub))
+
+
+def addsub_lanes(a, b, sub, lanes) -> int:
+    """fp_addsub_lanes.v: a, b and result are packed buses of lanes 32-bit floats, sub has one bit per lane"""
+    def unpack(word):
+        return np.frombuffer(word.to_bytes(4 * lanes, "little"), dtype="<u4")
+    sub_bits = (sub >> np.arange(lanes)) & 1
+    return int.from_bytes(fp_model.fp_addsub(unpack(a), unpack(b), sub_bits).astype("<u4").tobytes(), "little")
+
+
+def addsub16(a, b, sub, bf16) -> int:
+    """fp_addsub16.v: one FP16 (bf16 == 0) or bfloat16 lane"""
+    return int(fp_model.fp_addsub(a, b, sub, fp_model.BF16 if bf16 else fp_model.FP16))
+
+
+class AluTop:
+    """alu_top.v: byte-serial FSM around fp_addsub, including streaming, accumulate operations and packed formats"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.state = IDLE
+        self.operand_a = 0
+        self.operand_b = 0
+        self.last_result = 0
+        self.accumulate = 0
+        self.sub = 0
+        self.pending = 0
+        self.format = FORMAT_FP32
+        self.out = 0
+        self.done = 0
+
+    def clock(self, in_, opcode, start):
+        state, done = self.state, self.done
+        byte = (state - LOAD_A_0) % 4        # Byte index in the LOAD_A_* and LOAD_B_* states
+
+        if state == IDLE:
+            self.done = 0
+            if start:
+                self.accumulate = opcode >> 1
+                self.format = in_ & 0b11
+                self.state = LOAD_B_0 if opcode & 0b10 else LOAD_A_0
+
+        elif LOAD_A_0 <= state <= LOAD_A_3 or LOAD_B_0 <= state < LOAD_B_3:
+            if byte == 0 and self.pending:
+                # Streaming: execute the previous operation before its operands are overwritten
+                self.last_result = addsub(self._operand_a(), self.operand_b, self.sub, self.format)
+                self.accumulate = int(state == LOAD_B_0)
+                self.pending = 0
+                self.done = 1
+                self.out = self.last_result & 0xFF
+            elif state == LOAD_B_0:
+                self.done = 0
+            elif done and byte:
+                self.out = (self.last_result >> 8 * byte) & 0xFF
+            if state <= LOAD_A_3:
+                self.operand_a = (self.operand_a & ~(0xFF << 8 * byte)) | (in_ << 8 * byte)
+            else:
+                self.operand_b = (self.operand_b & ~(0xFF << 8 * byte)) | (in_ << 8 * byte)
+            self.state = state + 1
+
+        elif state == LOAD_B_3:
+            self.operand_b = (self.operand_b & 0xFFFFFF) | (in_ << 24)
+            self.sub = opcode & 1
+            if done:
+                self.out = (self.last_result >> 24) & 0xFF
+            if start:
+                # Streaming: start the next operation, this one is executed in its first cycle
+                self.pending = 1
+                self.state = LOAD_B_0 if opcode & 0b10 else LOAD_A_0
+            else:
+                self.state = EXECUTE
+
+        elif state == EXECUTE:
+            self.last_result = addsub(self._operand_a(), self.operand_b, self.sub, self.format)
+            self.state = OUTPUT_0
+            self.done = 1
+            self.out = self.last_result & 0xFF
+
+        elif OUTPUT_0 <= state < OUTPUT_3:
+            self.out = (self.last_result >> 8 * (state - OUTPUT_0 + 1)) & 0xFF
+            self.state = state + 1
+
+        elif state == OUTPUT_3:
+            self.state = IDLE
+            self.done = 0
+
+        else:
+            self.state = IDLE
+
+    def _operand_a(self) -> int:
+        return self.last_result if self.accumulate else self.operand_a
+
+
+class PipelinedAdder:
+    """fp_addsub_pipe.v: results come out STAGES cycles after valid_in, one per cycle"""
+
+    def __init__(self, stages=3):
+        self.stages = stages
+        self.reset()
+
+    def reset(self):
+        self._stages = [(0, 0)] * self.stages  # (valid, result) in every stage, last one is the output register
+        self.valid_out = 0
+        self.result = 0
+
+    def clock(self, valid_in, a, b, sub):
+        # Only operations that are valid are computed, the result register holds on to the last one otherwise
+        entry = (1, addsub(a, b, sub)) if valid_in else (0, None)
+        self._stages = [entry] + self._stages[:-1]
+        self.valid_out, result = self._stages[-1]
+        if result is not None:
+            self.result = result
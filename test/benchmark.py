@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+
+"""Record and compare testbench speed.
+
+test_benchmark.py writes benchmark.json next to results.xml, with the throughput of every
+workload and the commit it was measured on. Compare two of these files with
+
+    python benchmark.py baseline.json benchmark.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from cocotb.utils import get_sim_time
+
+from git_info import git_commit
+
+
+BENCHMARK_FILE = "benchmark.json"
+DEFAULT_TOLERANCE = 0.25  # Fraction of the baseline rate a workload may lose before it counts as a regression
+
+
+class Benchmark:
+    """Throughput of named workloads, each one measured as count operations in some wall time"""
+
+    def __init__(self, commit=None, simulator=None):
+        self.commit = commit or git_commit()
+        self.simulator = simulator or os.environ.get("SIM", "icarus")
+        self.results = {}
+
+    def start(self):
+        return time.perf_counter(), get_sim_time("ns")
+
+    def stop(self, name, count, start, unit="ops") -> dict:
+        """Record count operations done since start (as returned by start())"""
+        wall = time.perf_counter() - start[0]
+        sim_ns = get_sim_time("ns") - start[1]
+        self.results[name] = {
+            "count": count,
+            "unit": unit,
+            "wall_s": wall,
+            "rate": count / max(wall, 1e-9),             # Operations per wall clock second
+            "us_per_op": 1e6 * wall / max(count, 1),
+            "sim_ns_per_s": sim_ns / max(wall, 1e-9),    # Simulated time per wall clock second
+        }
+        return self.results[name]
+
+    def to_dict(self) -> dict:
+        return {"commit": self.commit, "simulator": self.simulator, "python": sys.version.split()[0], "results": self.results}
+
+    @classmethod
+    def from_dict(cls, data):
+        bench = cls(commit=data.get("commit", "unknown"), simulator=data.get("simulator"))
+        bench.results = data["results"]
+        return bench
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def read(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def regressions(self, baseline, tolerance=DEFAULT_TOLERANCE, names=None) -> list:
+        """Describe every workload that got slower than the baseline by more than tolerance"""
+        slower = []
+        for name in names or self.results:
+            if name not in baseline.results or name not in self.results:
+                continue
+            rate, base = self.results[name]["rate"], baseline.results[name]["rate"]
+            if rate < base * (1 - tolerance):
+                slower.append(f"{name}: {rate:.0f} {self.results[name]['unit']}/s, "
+                              f"baseline {base:.0f} on {baseline.commit} ({rate / base - 1:+.0%})")
+        return slower
+
+    def summary(self, baseline=None) -> str:
+        lines = [f"Benchmark on {self.commit} ({self.simulator})"]
+        for name, r in self.results.items():
+            line = f"  {name:<24} {r['rate']:12.0f} {r['unit']}/s {r['us_per_op']:10.2f} us/{r['unit'][:-1]}"
+            if baseline is not None and name in baseline.results:
+                line += f"  {r['rate'] / baseline.results[name]['rate'] - 1:+7.1%}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+# Path of the benchmark report, written next to the cocotb results file
+def report_path() -> str:
+    results = os.environ.get("COCOTB_RESULTS_FILE", "results.xml")
+    return os.path.join(os.path.dirname(os.path.abspath(results)), BENCHMARK_FILE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="benchmark.json of the reference commit")
+    parser.add_argument("current", help="benchmark.json to check")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown as a fraction")
+    args = parser.parse_args()
+
+    baseline, current = Benchmark.read(args.baseline), Benchmark.read(args.current)
+    print(current.summary(baseline))
+    slower = current.regressions(baseline, args.tolerance)
+    for line in slower:
+        print(f"REGRESSION: {line}")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
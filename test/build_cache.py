@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+
+"""Run the cocotb modules incrementally, reusing simulator builds and the results of unchanged tests.
+
+Builds are kept in cache/build/<key>. The key is a hash of the compile inputs as make resolves them
+(make print-build: simulator, toplevel, compile arguments and the contents of every Verilog source), the
+Makefile, the make variables given on the command line and the cocotb version. Any change to a source or
+an option leads to another build directory, and going back to an earlier state finds its build again.
+
+A module is skipped when it passed before on the same build with the same inputs: the contents of the test
+module and of every local module it imports (transitively), TESTCASE, and the values of the environment
+variables these files read. A module that uses RANDOM_SEED draws a new random batch on every run unless
+the seed is set, so it is only cached (and skipped) for a given RANDOM_SEED. The cached results.xml of a
+skipped module is merged into --out/results.xml like a fresh one. Failing runs are never cached.
+
+    python build_cache.py
+    python build_cache.py test_fp_addsub FP_ADDSUB=fp_addsub_lza
+    python build_cache.py -j 4 --force
+"""
+
+import argparse
+import ast
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+from pathlib import Path
+
+from regress import Job, makefile_modules, merge_results, run_job
+
+
+TEST_DIR = Path(__file__).resolve().parent
+CACHE_DIR = TEST_DIR / "cache"
+COMPLETE = ".complete"  # Marks a build directory whose image was built successfully
+
+DATA = ["regressions/*.txt"]  # Files read by the tests besides their Python sources
+
+# Environment variables read by the tests, e.g. os.environ.get("FP_VECTORS", ...)
+_ENV_READ = re.compile(r"""(?:os\.environ\.get\(|os\.environ\[|os\.getenv\()\s*["'](\w+)["']""")
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def make_config(sim, make_vars) -> dict:
+    """Compile inputs of this configuration as resolved by the Makefile, {name: value}"""
+    output = subprocess.run(["make", "-s", "-f", str(TEST_DIR / "Makefile"), f"PWD={TEST_DIR}", f"SIM={sim}",
+                             *make_vars, "print-build"], cwd=TEST_DIR, capture_output=True, text=True, check=True).stdout
+    return dict(line.split("=", 1) for line in output.splitlines() if "=" in line)
+
+
+def build_key(sim, make_vars) -> str:
+    config = make_config(sim, make_vars)
+    try:
+        cocotb_version = metadata.version("cocotb")
+    except metadata.PackageNotFoundError:
+        cocotb_version = None
+    parts = [sorted(config.items()), sorted(make_vars), cocotb_version, (TEST_DIR / "Makefile").read_bytes()]
+    for source in config.get("VERILOG_SOURCES", "").split():
+        parts += [source, Path(source).read_bytes()]
+    return _digest(*parts)[:16]
+
+
+def local_imports(path) -> list:
+    """Modules of test/ imported by path, directly or through each other, path included"""
+    seen, todo = [], [Path(path)]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen.append(path)
+        for node in ast.walk(ast.parse(path.read_text())):
+            names = [alias.name for alias in node.names] if isinstance(node, ast.Import) else \
+                    [node.module] if isinstance(node, ast.ImportFrom) and node.module and not node.level else []
+            for name in names:
+                candidate = TEST_DIR / f"{name.split('.')[0]}.py"
+                if candidate.exists():
+                    todo.append(candidate)
+    return sorted(seen)
+
+
+def test_key(build, module, testcase=None):
+    """Key of one run of a test module on a build, None if the run can't be cached: the module uses
+    RANDOM_SEED and it is not set, so every run tests another random batch"""
+    files = local_imports(TEST_DIR / f"{module}.py")
+    texts = [path.read_text() for path in files]
+    random = any("RANDOM_SEED" in text for text in texts)
+    if random and not os.environ.get("RANDOM_SEED"):
+        return None
+    names = sorted(set(_ENV_READ.findall("\n".join(texts))) | ({"RANDOM_SEED"} if random else set()))
+    values = [os.environ.get(name) for name in names]
+
+    # Data files, including the ones named by the environment, e.g. FP_REPLAY=triage.txt
+    data = sorted(path for pattern in DATA for path in TEST_DIR.glob(pattern))
+    data += [Path(token) for value in values if value for token in value.split() if Path(token).is_file()]
+    return _digest(build, module, testcase, *(f"{path.name}\0{text}" for path, text in zip(files, texts)),
+                   *(f"{name}={value}" for name, value in zip(names, values)),
+                   *(part for path in data for part in (path, path.read_bytes())))
+
+
+def reuse_build(directory) -> bool:
+    """Whether directory holds a finished build. Its files are touched so that make finds them newer than
+    the sources, which a checkout may have touched without changing them"""
+    if not (directory / COMPLETE).exists():
+        return False
+    now = time.time()
+    for path in directory.rglob("*"):
+        os.utime(path, (now, now), follow_symlinks=False)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("args", nargs="*", help="cocotb modules to run (default: MODULE from the Makefile) and NAME=VALUE make variables")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="parallel simulator processes")
+    parser.add_argument("-f", "--force", action="store_true", help="rebuild and rerun everything")
+    parser.add_argument("--sim", default=os.environ.get("SIM", "icarus"))
+    parser.add_argument("--testcase", default=os.environ.get("TESTCASE") or None, help="only run this test of every module")
+    parser.add_argument("--cache", type=Path, default=CACHE_DIR, help="cache directory")
+    parser.add_argument("--out", type=Path, default=TEST_DIR / "incremental", help="output directory")
+    args = parser.parse_args()
+
+    make_vars = [arg for arg in args.args if "=" in arg]
+    modules = [arg for arg in args.args if "=" not in arg] or makefile_modules()
+    cache, out = args.cache.resolve(), args.out.resolve()
+    (cache / "results").mkdir(parents=True, exist_ok=True)
+
+    key = build_key(args.sim, make_vars)
+    build = cache / "build" / key
+    if args.force:
+        shutil.rmtree(build, ignore_errors=True)
+    built = reuse_build(build)
+    print(f"Build {key} ({'cached' if built else 'new'}) in {build}, output in {out}")
+
+    jobs, keys, cached, todo = [], {}, [], []
+    for module in modules:
+        job = Job(module, module, {}, args.testcase, sim_build=build, make_vars=make_vars)
+        keys[job.name] = test_key(key, module, args.testcase)
+        jobs.append(job)
+        result = cache / "results" / f"{keys[job.name]}.xml" if keys[job.name] else None
+        if result and result.exists() and not args.force:
+            (out / module).mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(result, out / module / "results.xml")
+            cached.append(job)
+        else:
+            todo.append(job)
+
+    start = time.perf_counter()
+    if todo and not built:
+        # Build with the first job alone, the others share its image
+        run_job(todo[0], out, args.sim)
+        built = (out / todo[0].name / "results.xml").exists()
+        if built:
+            (build / COMPLETE).touch()
+        todo = todo[1:] if built else []  # Without an image the other modules can't run either
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        list(pool.map(lambda job: run_job(job, out, args.sim), todo))
+    elapsed = time.perf_counter() - start
+
+    for job in jobs:
+        if job in cached:
+            print(f"  {job.name:<32} cached")
+            continue
+        path = out / job.name / "results.xml"
+        passed = job.returncode == 0 and path.exists() and "<failure" not in path.read_text()
+        if passed and keys[job.name]:
+            shutil.copyfile(path, cache / "results" / f"{keys[job.name]}.xml")
+        status = "ok" if passed else "failed" if path.exists() else "not run" if job.returncode is None else f"exit {job.returncode}"
+        print(f"  {job.name:<32} {status:<8} {job.elapsed:7.1f} s")
+
+    tests, failures, missing = merge_results(jobs, out)
+    print(f"{tests} tests, {failures} failures in {elapsed:.1f} s, {len(cached)} of {len(jobs)} modules cached")
+    for name in missing:
+        print(f"ERROR: module {name} did not write results.xml, see {out / name / 'sim.log'}")
+    return 1 if failures or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
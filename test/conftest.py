@@ -0,0 +1,38 @@
+import os
+import random
+import tempfile
+
+import cocotb
+import pytest
+
+import model_sim
+
+
+# Runs the cocotb tests of unit_tests.v under plain pytest, on the behavioral models instead of
+# a simulator (see model_sim.py):
+#   pytest -q
+# The RTL simulation stays the reference, test_model_diff.py checks the models against it.
+
+collect_ignore = ["test_gates.py", "test_benchmark.py", "test_model_diff.py", "test_fp_fuzz.py"]
+
+
+def pytest_configure(config):
+    # Runs before pytest imports the test modules. Not at import time: cocotb loads this file
+    # too when it sets up assertion rewriting inside the simulator.
+    # Smaller default batches so the whole suite runs in seconds
+    for name, value in {"FP_VECTORS": "2000", "FP_HALF_VECTORS": "2000", "FP_PIPE_VECTORS": "2000", "ALU_STREAM_OPS": "100", "TT_STREAM_OPS": "200"}.items():
+        os.environ.setdefault(name, value)
+    os.environ.setdefault("COCOTB_RESULTS_FILE", os.path.join(tempfile.mkdtemp(prefix="model_sim_"), "results.xml"))
+    model_sim.install(int(os.environ.get("RANDOM_SEED", random.randrange(1 << 31))))
+
+
+def pytest_pycollect_makeitem(collector, name, obj):
+    if isinstance(obj, cocotb.decorators.test):
+        item = pytest.Function.from_parent(collector, name=name, callobj=lambda: model_sim.run_test(obj))
+        if obj.skip:
+            item.add_marker(pytest.mark.skip(reason="skipped by @cocotb.test"))
+        return item
+
+
+def pytest_report_header(config):
+    return f"cocotb tests on the behavioral models, RANDOM_SEED={cocotb.RANDOM_SEED}"
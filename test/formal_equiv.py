@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+
+"""Prove that an implementation of fp_addsub is equivalent to the reference with the yosys SAT solver.
+
+The candidate has the a/b/sub/result ports of fp_addsub. A combinational candidate has to give the same
+result as the reference for all 2^65 inputs. A pipelined candidate also has the ports of fp_addsub_pipe
+(clk, rst_n, valid_in, valid_out) and is checked over latency + 1 cycles from an arbitrary state:
+valid_out has to follow valid_in after exactly --latency cycles (STAGES by default), and the result of
+every valid operation has to be the reference result for the inputs of that cycle, whatever the other
+cycles do.
+
+A counterexample is written as a replay file (one "a b sub" line per vector, see fp_fuzz.py), which
+test_replay_files of test_fp_addsub.py or test_pipe_replay_files of test_fp_addsub_pipe.py reruns:
+
+    python formal_equiv.py fp_addsub_dual
+    python formal_equiv.py fp_addsub_pipe --param STAGES=2
+    python formal_equiv.py my_adder --file my_adder.v
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+import fp_model
+from fp_fuzz import write_vectors
+from synth_metrics import find_yosys
+
+
+TEST_DIR = Path(__file__).resolve().parent
+SRC_DIR = TEST_DIR.parent / "src"
+CEX_FILE = "formal_cex.txt"
+
+# Row of the sat -show-inputs table: optional time step, signal name, decimal, hex and binary value
+_SAT_ROW = re.compile(r"^\s*(?:(\d+)\s+)?\\(\w+)\s+\S+\s+\S+\s+([01x]+)\s*$", re.MULTILINE)
+
+
+def harness(candidate, reference, params, latency) -> str:
+    """Top module that flags a mismatch between the candidate and the reference (latency None: combinational)"""
+    overrides = ", ".join(f".{name}({value})" for name, value in params.items())
+    instance = f"{candidate} #({overrides})" if overrides else candidate
+    lines = [
+        "module formal_equiv (",
+        "    input  wire        clk,",
+        "    input  wire        valid_in,",
+        "    input  wire [31:0] a,",
+        "    input  wire [31:0] b,",
+        "    input  wire        sub,",
+        "    output wire        mismatch",
+        ");",
+        "    wire [31:0] expected;",
+        "    wire [31:0] result;",
+        f"    {reference} reference (.a(a), .b(b), .sub(sub), .result(expected));",
+    ]
+    if latency is None:
+        lines += [
+            f"    {instance} candidate (.a(a), .b(b), .sub(sub), .result(result));",
+            "    assign mismatch = (result != expected);",
+        ]
+    else:
+        lines += [
+            "    wire valid_out;",
+            f"    {instance} candidate (.clk(clk), .rst_n(1'b1), .valid_in(valid_in), .a(a), .b(b), .sub(sub),",
+            "        .valid_out(valid_out), .result(result));",
+            "",
+            "    // {valid_in, expected} of the last cycles, the oldest one is due at the output",
+            f"    reg [33*{latency}-1:0] history;",
+            "    always @(posedge clk) history <= {history, valid_in, expected};",
+            f"    wire [32:0] due = history[33*{latency}-1 -: 33];",
+            "    assign mismatch = (valid_out != due[32]) | (due[32] & (result != due[31:0]));",
+        ]
+    lines.append("endmodule")
+    return "\n".join(lines) + "\n"
+
+
+def script(sources, latency) -> str:
+    commands = [
+        f"read_verilog {' '.join(str(path) for path in sources)}",
+        "hierarchy -top formal_equiv",
+        "proc",
+        "flatten",
+        "async2sync",  # rst_n is tied high, the asynchronous reset only has to be representable
+        "dffunmap",
+        "opt -fast",
+    ]
+    if latency is None:
+        commands.append("sat -verify -prove mismatch 0 -set-def-inputs -show-inputs formal_equiv")
+    else:
+        # Initial state unconstrained, the property is only checked in the last step
+        commands.append(f"sat -verify -seq {latency + 1} -prove-skip {latency} -prove mismatch 0 -set-def-inputs -show-inputs formal_equiv")
+    return "\n".join(commands) + "\n"
+
+
+def parse_counterexample(log) -> dict:
+    """Input values of the failing model, {name: [value per time step]}"""
+    steps = {}
+    for step, name, bits in _SAT_ROW.findall(log):
+        steps.setdefault(name, {})[int(step or 1)] = int(bits.replace("x", "0"), 2)
+    return {name: [values[t] for t in sorted(values)] for name, values in steps.items()}
+
+
+def check(candidate, files, reference="fp_addsub", params=None, latency=None, out=TEST_DIR / "formal", yosys=None):
+    """Run the proof and return (proved, counterexample vectors a, b, sub, valid_in or None)"""
+    out.mkdir(parents=True, exist_ok=True)
+    (out / "formal_equiv.v").write_text(harness(candidate, reference, params or {}, latency))
+    sources = [SRC_DIR / f"{reference}.v"] + [Path(f).resolve() for f in files] + [out / "formal_equiv.v"]
+    (out / "formal_equiv.ys").write_text(script(sources, latency))
+
+    subprocess.run((yosys or find_yosys()) + ["-q", "-l", "formal_equiv.log", "-s", "formal_equiv.ys"], cwd=out,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    log = (out / "formal_equiv.log").read_text()
+    if "SUCCESS!" in log:
+        return True, None
+    if "FAIL!" not in log:
+        raise RuntimeError(f"yosys did not finish the proof, see {out / 'formal_equiv.log'}")
+
+    inputs = parse_counterexample(log)
+    vectors = [np.array(inputs[name], dtype=np.uint32) for name in ("a", "b", "sub")]
+    valid = np.array(inputs["valid_in"] if latency else [1] * len(vectors[0]), dtype=np.uint32)
+    return False, (*vectors, valid)
+
+
+def parse_param(text):
+    name, _, value = text.partition("=")
+    if not value:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text}")
+    return name, value
+
+
+# Whether the candidate module has a clock input, i.e. is pipelined
+def is_clocked(module, files) -> bool:
+    for path in files:
+        match = re.search(rf"\bmodule\s+{re.escape(module)}\b(.*?)\bendmodule\b", Path(path).read_text(), re.DOTALL)
+        if match:
+            return re.search(r"\binput\s+(?:wire\s+)?clk\b", match.group(1)) is not None
+    raise SystemExit(f"module {module} not found in {', '.join(str(f) for f in files)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("candidate", help="module to check, e.g. fp_addsub_lza or fp_addsub_pipe")
+    parser.add_argument("--file", action="append", help="Verilog source of the candidate (default: src/<candidate>.v), repeatable")
+    parser.add_argument("--reference", default="fp_addsub", help="reference module in src/ (default: fp_addsub)")
+    parser.add_argument("--param", action="append", type=parse_param, default=[], help="parameter of the candidate, NAME=VALUE")
+    parser.add_argument("--latency", type=int, help="cycles from valid_in to valid_out of a pipelined candidate (default: STAGES)")
+    parser.add_argument("--out", type=Path, default=TEST_DIR / "formal", help="work directory")
+    parser.add_argument("--cex", type=Path, default=Path(CEX_FILE), help="replay file for a counterexample")
+    args = parser.parse_args()
+
+    files = args.file or [SRC_DIR / f"{args.candidate}.v"]
+    params = dict(args.param)
+    latency = None
+    if is_clocked(args.candidate, files):
+        latency = args.latency or int(params.get("STAGES", 0)) or parser.error("pipelined candidate needs --latency or --param STAGES=N")
+        if "STAGES" not in params and args.candidate == "fp_addsub_pipe":
+            params["STAGES"] = latency
+        if args.candidate == "fp_addsub_pipe" and int(params["STAGES"]) not in (1, 2, 3):
+            parser.error(f"fp_addsub_pipe supports STAGES 1 to 3, got {params['STAGES']}")
+
+    kind = f"pipelined, latency {latency}" if latency else "combinational"
+    print(f"Checking {args.candidate} ({kind}) against {args.reference}")
+    start = time.perf_counter()
+    proved, cex = check(args.candidate, files, args.reference, params, latency, args.out.resolve())
+    elapsed = time.perf_counter() - start
+
+    if proved:
+        print(f"Equivalent, proved in {elapsed:.1f} s")
+        return 0
+
+    a, b, sub, valid = cex
+    expected = fp_model.fp_addsub(a, b, sub)
+    comments = [f"formal counterexample, {args.candidate} vs {args.reference}" + (f", cycle {i + 1}, valid_in={valid[i]}" if latency else "")
+                for i in range(len(a))]
+    write_vectors(args.cex, a, b, sub, comments)
+    print(f"NOT equivalent, counterexample found in {elapsed:.1f} s:")
+    for i in range(len(a)):
+        cycle = f"cycle {i + 1}: " if latency else ""
+        print(f"  {cycle}{a[i]:08x} {'-' if sub[i] else '+'} {b[i]:08x} = {expected[i]:08x}" + ("" if valid[i] else " (valid_in low)"))
+
+    extra = "" if args.file is None else f" EXTRA_SOURCES=\"{' '.join(str(Path(f).resolve()) for f in files)}\""
+    if latency is None:
+        print(f"Replay with: make -B MODULE=test_fp_addsub TESTCASE=test_replay_files FP_ADDSUB={args.candidate}{extra} FP_REPLAY={args.cex.resolve()}")
+    elif args.candidate == "fp_addsub_pipe":
+        print(f"Replay with: make -B MODULE=test_fp_addsub_pipe TESTCASE=test_pipe_replay_files PIPE_STAGES={params['STAGES']} FP_REPLAY={args.cex.resolve()}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import json
+import os
+
+import numpy as np
+
+import fp_model
+import fp_stimulus
+
+
+# Functional coverage of fp_addsub.v. Every vector falls into exactly one bin, named after the
+# branch of the RTL that produces its result:
+#   nan, inf_minus_inf, inf_a, inf_b  - special cases
+#   zero_positive, zero_negative      - sum == 0
+#   overflow, overflow_to_inf         - sum[24] set, with and without exp_base + 1 == 8'hFF
+#   shift_0 .. shift_23               - each arm of the casez priority encoder, normalized result
+#   subnormal_result                  - exp_base <= shift, the result becomes subnormal
+
+BINS = (
+    ["nan", "inf_minus_inf", "inf_a", "inf_b", "zero_positive", "zero_negative", "overflow", "overflow_to_inf"]
+    + [f"shift_{k}" for k in range(24)]
+    + ["subnormal_result"]
+)
+BIN_INDEX = {name: i for i, name in enumerate(BINS)}
+
+COVERAGE_FILE = "coverage.json"
+
+
+def classify(a, b, sub) -> np.ndarray:
+    """Return the index (into BINS) of the bin hit by every vector"""
+    d = fp_model.datapath(a, b, sub)
+    shift_bins = BIN_INDEX["shift_0"] + np.clip(d.shift, 0, 23)
+    bins = np.select(
+        [
+            d.is_nan_a | d.is_nan_b,
+            fp_model.is_nan_result(d),
+            d.is_inf_a,
+            d.is_inf_b,
+            (d.sum == 0) & ~(d.sign_a & d.sign_b & d.is_zero_a & d.is_zero_b).astype(bool),
+            d.sum == 0,
+            ((d.sum >> 24) == 1) & (d.exp_base + 1 != fp_model.EXP_MASK),
+            (d.sum >> 24) == 1,
+            d.exp_base <= d.shift,
+        ],
+        [
+            BIN_INDEX["nan"],
+            BIN_INDEX["inf_minus_inf"],
+            BIN_INDEX["inf_a"],
+            BIN_INDEX["inf_b"],
+            BIN_INDEX["zero_positive"],
+            BIN_INDEX["zero_negative"],
+            BIN_INDEX["overflow"],
+            BIN_INDEX["overflow_to_inf"],
+            BIN_INDEX["subnormal_result"],
+        ],
+        default=shift_bins,
+    )
+    return bins.astype(np.int64)
+
+
+class Coverage:
+    """Hit counts for every bin, accumulated over any number of batches"""
+
+    def __init__(self, goal=1):
+        self.goal = goal  # Hits needed before a bin counts as covered
+        self.counts = np.zeros(len(BINS), dtype=np.int64)
+
+    def sample(self, a, b, sub) -> np.ndarray:
+        bins = classify(a, b, sub)
+        self.counts += np.bincount(bins, minlength=len(BINS))
+        return bins
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    @property
+    def vectors(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def holes(self) -> list:
+        return [name for name, count in zip(BINS, self.counts) if count < self.goal]
+
+    @property
+    def closed(self) -> bool:
+        return not self.holes
+
+    @property
+    def percent(self) -> float:
+        return 100.0 * np.count_nonzero(self.counts >= self.goal) / len(BINS)
+
+    def to_dict(self) -> dict:
+        return {
+            "vectors": self.vectors,
+            "goal": self.goal,
+            "covered": f"{self.percent:.1f}%",
+            "holes": self.holes,
+            "bins": {name: int(count) for name, count in zip(BINS, self.counts)},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        coverage = cls(goal=data.get("goal", 1))
+        for name, count in data["bins"].items():
+            coverage.counts[BIN_INDEX[name]] = count
+        return coverage
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def read(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def summary(self) -> str:
+        lines = [f"Coverage: {self.percent:.1f}% of {len(BINS)} bins over {self.vectors} vectors"]
+        lines += [f"  {name:<18} {count}" for name, count in zip(BINS, self.counts)]
+        if self.holes:
+            lines.append(f"  holes: {', '.join(self.holes)}")
+        return "\n".join(lines)
+
+
+# Path of the coverage report, written next to the cocotb results file
+def report_path() -> str:
+    results = os.environ.get("COCOTB_RESULTS_FILE", "results.xml")
+    return os.path.join(os.path.dirname(os.path.abspath(results)), COVERAGE_FILE)
+
+
+# Directed generators, each one produces n vectors landing in a single bin
+
+def _normal(rng, n, exp):
+    return fp_stimulus._pack(fp_stimulus._random_sign(rng, n), np.asarray(exp), fp_stimulus._random_man(rng, n))
+
+def _effective_sub(rng, a, b):
+    # Pick the opcode so that the operation subtracts magnitudes, whatever the signs of a and b
+    sub = rng.integers(0, 2, len(a), dtype=np.uint32)
+    b = b ^ ((((a ^ b) >> 31) ^ sub ^ 1) << 31)
+    return a, b.astype(np.uint32), sub
+
+def _effective_add(rng, a, b):
+    a, b, sub = _effective_sub(rng, a, b)
+    return a, b ^ np.uint32(0x80000000), sub
+
+def _directed(name, rng, n):
+    sign = fp_stimulus._random_sign(rng, n)
+    if name == "nan":
+        a = fp_stimulus._pack(sign, np.full(n, 0xFF), rng.integers(1, 1 << 23, n))
+        b = rng.integers(0, 1 << 32, n, dtype=np.uint64).astype(np.uint32)
+        swap = rng.integers(0, 2, n).astype(bool)
+        return np.where(swap, b, a), np.where(swap, a, b), fp_stimulus._random_sub(rng, n)
+    if name == "inf_minus_inf":
+        inf = fp_stimulus._pack(sign, np.full(n, 0xFF), np.zeros(n))
+        return _effective_sub(rng, inf, inf)
+    if name in ("inf_a", "inf_b"):
+        inf = fp_stimulus._pack(sign, np.full(n, 0xFF), np.zeros(n))
+        finite = _normal(rng, n, rng.integers(0, 0xFF, n))
+        a, b = (inf, finite) if name == "inf_a" else (finite, inf)
+        return a, b, fp_stimulus._random_sub(rng, n)
+    if name == "zero_positive":
+        a = _normal(rng, n, rng.integers(0, 0xFF, n))
+        return _effective_sub(rng, a, a)
+    if name == "zero_negative":
+        zero = np.full(n, 0x80000000, dtype=np.uint32)
+        return _effective_add(rng, zero, zero)
+    if name in ("overflow", "overflow_to_inf"):
+        # Two normal numbers with the same exponent always carry into sum[24] when added
+        exp = np.full(n, 0xFE) if name == "overflow_to_inf" else rng.integers(1, 0xFE, n)
+        return _effective_add(rng, _normal(rng, n, exp), _normal(rng, n, exp))
+    if name == "shift_0":
+        # Add a much smaller number without carrying out
+        exp = rng.integers(3, 0xFF, n)
+        a = fp_stimulus._pack(sign, exp, rng.integers(0, 1 << 22, n))
+        return _effective_add(rng, a, _normal(rng, n, exp - 2))
+    if name.startswith("shift_"):
+        # Subtract two numbers with the same exponent whose mantissas differ by exactly 23 - k significant bits
+        k = int(name.split("_")[1])
+        diff = rng.integers(1 << (23 - k), 1 << (24 - k), n)
+        man_a = rng.integers((1 << 23) + diff, 1 << 24, n)
+        exp = rng.integers(k + 1, 0xFF, n)
+        a = fp_stimulus._pack(sign, exp, man_a & fp_model.MAN_MASK)
+        b = fp_stimulus._pack(sign, exp, (man_a - diff) & fp_model.MAN_MASK)
+        return _effective_sub(rng, a, b)
+    if name == "subnormal_result":
+        a = fp_stimulus._pack(sign, np.zeros(n), rng.integers(1, 1 << 23, n))
+        b = fp_stimulus._pack(sign, np.zeros(n), rng.integers(1, 1 << 23, n))
+        return _effective_sub(rng, a, b)
+    raise ValueError(f"Unknown coverage bin: {name}")
+
+
+def _split(names, n, rng):
+    # n directed vectors shared evenly between the given bins
+    parts = []
+    for i, name in enumerate(names):
+        count = n // len(names) + (i < n % len(names))
+        if count:
+            parts.append(_directed(name, rng, count))
+    return parts
+
+
+def steer(coverage, n, seed=None, directed_share=0.5):
+    """Generate n vectors, spending directed_share of them on the bins that are still holes"""
+    rng = np.random.default_rng(seed)
+    holes = coverage.holes
+    n_directed = int(n * directed_share) if holes else 0
+
+    parts = [fp_stimulus.generate(n - n_directed, seed=rng)] + _split(holes, n_directed, rng)
+    a, b, sub = (np.concatenate(column).astype(np.uint32) for column in zip(*parts))
+
+    order = rng.permutation(n)
+    return a[order], b[order], sub[order]
+
+
+def balanced(n, seed=None):
+    """Generate n vectors spread evenly over every bin, in random order"""
+    rng = np.random.default_rng(seed)
+    a, b, sub = (np.concatenate(column).astype(np.uint32) for column in zip(*_split(BINS, n, rng)))
+
+    order = rng.permutation(len(a))
+    return a[order], b[order], sub[order]
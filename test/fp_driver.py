@@ -0,0 +1,110 @@
+import os
+import time
+
+import numpy as np
+from cocotb.triggers import Timer
+
+import fp_model
+import waves
+
+
+# Batched drivers for the combinational fp_addsub instance (dut.a / dut.b / dut.sub / dut.result),
+# the multi-lane adder (dut.lanes_*) and the 16-bit lane (dut.half_*).
+# Vectors are applied back to back with a single simulator step in between, which is all the
+# settle time a zero-delay combinational block needs, and the results are only checked once the
+# whole batch has been collected.
+
+LANES = int(os.environ.get("FP_LANES", 16))  # Lanes of the multi-lane adder, set by the Makefile
+
+
+async def _drive(a_handle, b_handle, sub_handle, result_handle, a, b, sub) -> np.ndarray:
+    settle = Timer(1, units="step")
+
+    results = []
+    append = results.append
+    for a_bits, b_bits, sub_bit in zip(np.asarray(a).tolist(), np.asarray(b).tolist(), np.asarray(sub).tolist()):
+        a_handle.value = a_bits
+        b_handle.value = b_bits
+        sub_handle.value = sub_bit
+        await settle
+        append(int(result_handle.value))
+
+    return np.array(results, dtype=np.uint32)
+
+
+async def drive_fp_addsub(dut, a, b, sub) -> np.ndarray:
+    """Apply every (a, b, sub) vector to the DUT and return the results as a uint32 array"""
+    return await _drive(dut.a, dut.b, dut.sub, dut.result, a, b, sub)
+
+
+async def drive_fp_addsub_lanes(dut, a, b, sub) -> np.ndarray:
+    """Same as drive_fp_addsub, LANES vectors per simulator step through the multi-lane adder.
+
+    The packed bus values are built with NumPy for the whole batch up front, and the results are
+    unpacked the same way, so Python only handles one integer per bus and step.
+    """
+    n = len(a)
+    steps = -(-n // LANES)
+    width = 4 * LANES
+
+    def words(x) -> list:
+        padded = np.zeros(steps * LANES, dtype="<u4")
+        padded[:n] = x
+        raw = padded.tobytes()
+        return [int.from_bytes(raw[i:i + width], "little") for i in range(0, len(raw), width)]
+
+    sub_bits = np.zeros(steps * LANES, dtype=np.uint8)
+    sub_bits[:n] = sub
+    sub_words = [int.from_bytes(row.tobytes(), "little") for row in np.packbits(sub_bits.reshape(steps, LANES), axis=1, bitorder="little")]
+
+    a_handle, b_handle, sub_handle, result_handle = dut.lanes_a, dut.lanes_b, dut.lanes_sub, dut.lanes_result
+    settle = Timer(1, units="step")
+    results = bytearray()
+    for a_word, b_word, sub_word in zip(words(a), words(b), sub_words):
+        a_handle.value = a_word
+        b_handle.value = b_word
+        sub_handle.value = sub_word
+        await settle
+        results += int(result_handle.value).to_bytes(width, "little")
+
+    return np.frombuffer(results, dtype="<u4")[:n].astype(np.uint32)
+
+
+async def drive_fp_addsub16(dut, a, b, sub, bf16) -> np.ndarray:
+    """Same for the 16-bit lane (dut.half_*), in FP16 (bf16 == 0) or bfloat16"""
+    dut.half_bf16.value = int(bf16)
+    return await _drive(dut.half_a, dut.half_b, dut.half_sub, dut.half_result, a, b, sub)
+
+
+def format_mismatches(a, b, sub, result, expected, limit=10) -> str:
+    """Describe the first few mismatching vectors for an assertion message"""
+    bad = np.flatnonzero(result != expected)
+    lines = [f"{len(bad)} of {len(result)} vectors mismatched"]
+    for i in bad[:limit]:
+        op = "-" if sub[i] else "+"
+        lines.append(f"  {a[i]:08x} {op} {b[i]:08x} = {result[i]:08x}, expected {expected[i]:08x}")
+    return "\n".join(lines)
+
+
+async def run_regression(dut, a, b, sub, triage=None, drive=drive_fp_addsub):
+    """Drive a batch, check it bit-exactly against the reference model and log the throughput.
+
+    With a fp_triage.Triage, mismatches are collected into it instead of failing right away.
+    drive is drive_fp_addsub or drive_fp_addsub_lanes.
+    """
+    start = time.perf_counter()
+    result = await drive(dut, a, b, sub)
+    elapsed = time.perf_counter() - start
+
+    expected = fp_model.fp_addsub(a, b, sub)
+    dut._log.info(f"{len(result)} vectors in {elapsed:.2f} s ({len(result) / max(elapsed, 1e-9):.0f} vectors/s)")
+    if waves.WINDOWED and not np.array_equal(result, expected):
+        # Replay the first failing vectors with dumping on, so the waveform holds nothing else
+        bad = np.flatnonzero(result != expected)[:10]
+        with waves.window(dut):
+            await drive_fp_addsub(dut, a[bad], b[bad], sub[bad])
+    if triage is not None:
+        triage.add(a, b, sub, result, expected)
+    else:
+        assert np.array_equal(result, expected), format_mismatches(a, b, sub, result, expected)
+    return result
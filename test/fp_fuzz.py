@@ -0,0 +1,169 @@
+import numpy as np
+
+import fp_coverage
+import fp_model
+
+
+# Coverage-guided fuzzing of fp_addsub.v. Candidates are made by mutating the sign, exponent and
+# mantissa fields of vectors from a corpus, and a candidate is kept in the corpus when it reaches a
+# feature no earlier vector has. A feature is the coverage bin of fp_coverage.py combined with the
+# class of the result and the exponent difference of the operands, so the fuzzer keeps pushing into
+# the deep cancellation arms and overflow edges that random patterns almost never reach.
+#
+# Corpus and failure files hold one vector per line, which makes them replayable by hand:
+#   3f800000 3f7fffff 1  # optional comment
+
+SIGN_BIT = np.uint32(0x80000000)
+EXP_FIELD = np.uint32(0x7F800000)
+MAN_FIELD = np.uint32(fp_model.MAN_MASK)
+
+RESULT_CLASSES = ["+normal", "+subnormal", "+zero", "+inf", "nan", "-normal", "-subnormal", "-zero", "-inf"]
+DIFF_BUCKETS = 26  # Exponent differences 0 .. 24, and 25 for everything that shifts the mantissa out
+N_FEATURES = len(fp_coverage.BINS) * len(RESULT_CLASSES) * DIFF_BUCKETS
+
+# Exponents and mantissas that sit on the edges of the datapath
+EXPONENTS = np.array([0x00, 0x01, 0x02, 0x17, 0x18, 0x19, 0x7E, 0x7F, 0x80, 0xFD, 0xFE, 0xFF], dtype=np.uint32)
+MANTISSAS = np.array([0x000000, 0x000001, 0x000002, 0x400000, 0x7FFFFE, 0x7FFFFF, 0x555555, 0x2AAAAA], dtype=np.uint32)
+
+
+def result_class(result) -> np.ndarray:
+    """Return the index (into RESULT_CLASSES) of the class of every result"""
+    result = np.asarray(result, dtype=np.uint32)
+    exp = (result >> 23) & fp_model.EXP_MASK
+    man = result & fp_model.MAN_MASK
+    classes = np.select([(exp == fp_model.EXP_MASK) & (man != 0), exp == fp_model.EXP_MASK, (exp == 0) & (man == 0), exp == 0],
+                        [4, 3, 2, 1], default=0)
+    return np.where((result >> 31) & (classes != 4), classes + 5, classes).astype(np.int64)
+
+
+def features(a, b, sub) -> np.ndarray:
+    """Return the feature index (bin, result class, exponent difference) of every vector"""
+    bins = fp_coverage.classify(a, b, sub)
+    classes = result_class(fp_model.fp_addsub(a, b, sub))
+    diff = np.minimum(fp_model.datapath(a, b, sub).exp_diff, DIFF_BUCKETS - 1)
+    return (bins * len(RESULT_CLASSES) + classes) * DIFF_BUCKETS + diff
+
+
+def read_vectors(path):
+    """Read (a, b, sub) uint32 arrays from a corpus or failure file, a missing file is empty"""
+    rows = []
+    try:
+        with open(path) as f:
+            for line in f:
+                fields = line.split("#", 1)[0].split()
+                if fields:
+                    rows.append((int(fields[0], 16), int(fields[1], 16), int(fields[2])))
+    except FileNotFoundError:
+        pass
+    a, b, sub = np.array(rows, dtype=np.uint32).reshape(-1, 3).T
+    return a, b, sub
+
+
+def write_vectors(path, a, b, sub, comments=None):
+    with open(path, "w") as f:
+        for i, (a_bits, b_bits, sub_bit) in enumerate(zip(np.asarray(a).tolist(), np.asarray(b).tolist(), np.asarray(sub).tolist())):
+            comment = f"  # {comments[i]}" if comments else ""
+            f.write(f"{a_bits:08x} {b_bits:08x} {sub_bit}{comment}\n")
+
+
+class Corpus:
+    """Vectors that each reached at least one new feature, and the features reached so far"""
+
+    def __init__(self):
+        self.a = np.zeros(0, dtype=np.uint32)
+        self.b = np.zeros(0, dtype=np.uint32)
+        self.sub = np.zeros(0, dtype=np.uint32)
+        self.seen = np.zeros(N_FEATURES, dtype=bool)
+
+    def __len__(self):
+        return len(self.a)
+
+    def add(self, a, b, sub) -> int:
+        """Keep the first vector reaching every feature not seen yet, return the number kept"""
+        found, first = np.unique(features(a, b, sub), return_index=True)
+        new = ~self.seen[found]
+        self.seen[found[new]] = True
+        keep = np.sort(first[new])
+        self.a = np.concatenate([self.a, np.asarray(a, dtype=np.uint32)[keep]])
+        self.b = np.concatenate([self.b, np.asarray(b, dtype=np.uint32)[keep]])
+        self.sub = np.concatenate([self.sub, np.asarray(sub, dtype=np.uint32)[keep]])
+        return len(keep)
+
+    @property
+    def coverage(self) -> fp_coverage.Coverage:
+        coverage = fp_coverage.Coverage()
+        coverage.sample(self.a, self.b, self.sub)
+        return coverage
+
+    def summary(self) -> str:
+        return (f"Corpus: {len(self)} vectors, {np.count_nonzero(self.seen)} of {N_FEATURES} features, "
+                f"{self.coverage.percent:.1f}% of {len(fp_coverage.BINS)} bins")
+
+    def write(self, path):
+        write_vectors(path, self.a, self.b, self.sub)
+
+    @classmethod
+    def read(cls, path):
+        corpus = cls()
+        corpus.add(*read_vectors(path))
+        return corpus
+
+
+def _field(rng, n, values):
+    return rng.choice(values, n)
+
+
+def _mutate_once(rng, a, b, sub, parents_a, parents_b):
+    n = len(a)
+    on_a = rng.integers(0, 2, n).astype(bool)
+    x, y = np.where(on_a, a, b), np.where(on_a, b, a)  # Operand to mutate and the other one
+    exp = (x >> 23) & 0xFF
+    low_bits = (np.uint32(1) << rng.integers(1, 24, n).astype(np.uint32)) - np.uint32(1)
+    random_man = rng.integers(0, 1 << 23, n, dtype=np.uint32)
+    step = rng.choice(np.array([-3, -2, -1, 1, 2, 3]), n)
+
+    mutations = [
+        x ^ (np.uint32(1) << rng.integers(0, 32, n).astype(np.uint32)),                  # Flip one bit
+        x ^ SIGN_BIT,                                                                     # Flip the sign
+        (x & ~EXP_FIELD) | (_field(rng, n, EXPONENTS) << 23),                             # Edge exponent
+        (x & ~EXP_FIELD) | (((exp.astype(np.int64) + step) & 0xFF).astype(np.uint32) << 23),  # Step the exponent
+        (x & ~MAN_FIELD) | _field(rng, n, MANTISSAS),                                    # Edge mantissa
+        (x & ~low_bits) | (random_man & low_bits),                                        # Randomize the low mantissa bits
+        (x & ~EXP_FIELD) | (y & EXP_FIELD),                                               # Same exponent as the other operand
+        (y ^ (random_man & low_bits)) | (x & SIGN_BIT),                                   # Close to the other operand
+        np.where(on_a, parents_a, parents_b),                                             # Splice in another corpus vector
+    ]
+    choice = rng.integers(0, len(mutations) + 2, n)
+    x = np.select([choice == k for k in range(len(mutations))], mutations, default=x).astype(np.uint32)
+    a, b = np.where(on_a, x, a), np.where(on_a, b, x)
+
+    swap = choice == len(mutations)
+    a, b = np.where(swap, b, a), np.where(swap, a, b)
+    sub = np.where(choice == len(mutations) + 1, sub ^ 1, sub)
+    return a.astype(np.uint32), b.astype(np.uint32), sub.astype(np.uint32)
+
+
+class Fuzzer:
+    """Generate candidates from a corpus, seeded with one vector per coverage bin when it is empty"""
+
+    def __init__(self, corpus, seed=None, max_mutations=4):
+        self.corpus = corpus
+        self.rng = np.random.default_rng(seed)
+        self.max_mutations = max_mutations
+        if not len(corpus):
+            corpus.add(*fp_coverage.balanced(len(fp_coverage.BINS), seed=self.rng))
+
+    def candidates(self, n):
+        """Return n (a, b, sub) vectors, each a corpus vector with one or more mutations stacked"""
+        rng, corpus = self.rng, self.corpus
+        pick = rng.integers(0, len(corpus), n)
+        splice = rng.integers(0, len(corpus), n)
+        a, b, sub = corpus.a[pick], corpus.b[pick], corpus.sub[pick]
+
+        rounds = rng.integers(1, self.max_mutations + 1, n)
+        for k in range(self.max_mutations):
+            mutated = _mutate_once(rng, a, b, sub, corpus.a[splice], corpus.b[splice])
+            active = rounds > k
+            a, b, sub = (np.where(active, new, old) for new, old in zip(mutated, (a, b, sub)))
+        return a, b, sub
+
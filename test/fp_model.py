@@ -0,0 +1,215 @@
+from types import SimpleNamespace
+from typing import NamedTuple
+
+import numpy as np
+
+
+# Bit-exact reference model of src/fp_addsub.v, vectorized over uint32 NumPy arrays.
+# It mirrors the RTL step by step (truncate-on-align, no rounding, subnormal handling,
+# signed zeros and the canonical quiet NaN), so DUT results can be compared bit for bit
+# instead of through Python double arithmetic.
+#
+# The model is written for any field widths, which also makes it the reference of the 16-bit packed
+# lanes (FP16 and bfloat16, src/fp_addsub16.v): two lanes per 32-bit word, lane 0 in the low half.
+
+QNAN = 0x7FC00000  # The only NaN the adder ever returns (+qNaN)
+
+MAN_MASK = 0x007FFFFF  # 23-bit stored mantissa
+EXP_MASK = 0xFF        # 8-bit exponent field
+HIDDEN_BIT = 0x00800000
+
+
+class Format(NamedTuple):
+    """Field widths of a binary floating point format"""
+    name: str
+    exp_bits: int
+    man_bits: int
+
+    @property
+    def exp_mask(self) -> int:
+        return (1 << self.exp_bits) - 1
+
+    @property
+    def man_mask(self) -> int:
+        return (1 << self.man_bits) - 1
+
+    @property
+    def qnan(self) -> int:
+        return (self.exp_mask << self.man_bits) | (1 << (self.man_bits - 1))
+
+
+FP32 = Format("fp32", 8, 23)
+FP16 = Format("fp16", 5, 10)
+BF16 = Format("bf16", 8, 7)
+
+
+# Convert floats (scalar or array) to their 32-bit IEEE 754 bit patterns
+def float_to_bits(f) -> np.ndarray:
+    return np.asarray(f, dtype=np.float32).view(np.uint32)
+
+# Convert 32-bit IEEE 754 bit patterns (scalar or array) back to float32 values
+def bits_to_float(b) -> np.ndarray:
+    return np.asarray(b, dtype=np.uint32).view(np.float32)
+
+
+# Convert floats (scalar or array) to FP16 or bfloat16 bit patterns, FP16 rounds to nearest even and bfloat16 truncates
+def float_to_half_bits(f, fmt=FP16) -> np.ndarray:
+    if fmt == FP16:
+        return np.asarray(f, dtype=np.float16).view(np.uint16)
+    return (float_to_bits(f) >> 16).astype(np.uint16)
+
+# Convert FP16 or bfloat16 bit patterns (scalar or array) back to float32 values
+def half_bits_to_float(b, fmt=FP16) -> np.ndarray:
+    if fmt == FP16:
+        return np.asarray(b, dtype=np.uint16).view(np.float16).astype(np.float32)
+    return bits_to_float(np.asarray(b, dtype=np.uint32) << 16)
+
+
+# Pack two 16-bit lanes into 32-bit words, lane 0 in the low half
+def pack_halves(lane0, lane1) -> np.ndarray:
+    return (np.asarray(lane1, dtype=np.uint32) << 16) | np.asarray(lane0, dtype=np.uint32)
+
+# Split 32-bit words into their (lane 0, lane 1) halves
+def unpack_halves(x):
+    x = np.asarray(x, dtype=np.uint32)
+    return (x & 0xFFFF).astype(np.uint16), (x >> 16).astype(np.uint16)
+
+
+def _unpack(x, fmt=FP32):
+    """Split bit patterns into (sign, raw exponent, stored mantissa) as int64 arrays"""
+    x = np.asarray(x, dtype=np.uint32).astype(np.int64)
+    return x >> (fmt.exp_bits + fmt.man_bits), (x >> fmt.man_bits) & fmt.exp_mask, x & fmt.man_mask
+
+
+def datapath(a, b, sub=0, fmt=FP32) -> SimpleNamespace:
+    """Evaluate the internal signals of fp_addsub.v (exponents, aligned mantissas, sum, shift, ...) for every vector"""
+    sign_a, raw_exp_a, frac_a = _unpack(a, fmt)
+    sign_b, raw_exp_b, frac_b = _unpack(b, fmt)
+    sign_b = sign_b ^ (np.asarray(sub).astype(np.int64) & 1)  # Flip B's sign if subtracting
+
+    # Step 1: Unpack inputs
+    is_subnormal_a = raw_exp_a == 0
+    is_subnormal_b = raw_exp_b == 0
+
+    exp_a = np.where(is_subnormal_a, 1, raw_exp_a)
+    exp_b = np.where(is_subnormal_b, 1, raw_exp_b)
+
+    man_a = np.where(is_subnormal_a, frac_a, frac_a | (1 << fmt.man_bits))
+    man_b = np.where(is_subnormal_b, frac_b, frac_b | (1 << fmt.man_bits))
+
+    # Step 1.5: Special cases (NaN, infinity, zero)
+    is_special_a = raw_exp_a == fmt.exp_mask
+    is_special_b = raw_exp_b == fmt.exp_mask
+
+    is_nan_a = is_special_a & (frac_a != 0)
+    is_nan_b = is_special_b & (frac_b != 0)
+
+    is_inf_a = is_special_a & (frac_a == 0)
+    is_inf_b = is_special_b & (frac_b == 0)
+
+    is_zero_a = is_subnormal_a & (frac_a == 0)
+    is_zero_b = is_subnormal_b & (frac_b == 0)
+
+    # Step 2: Align exponents, the smaller mantissa is shifted right and the shifted-out bits are dropped
+    exp_a_greater = exp_a >= exp_b
+    exp_diff = np.abs(exp_a - exp_b)
+    clipped_diff = np.minimum(exp_diff, 63)  # Anything > man_bits shifts the mantissa out completely
+
+    man_a_shifted = np.where(exp_a_greater, man_a, man_a >> clipped_diff)
+    man_b_shifted = np.where(exp_a_greater, man_b >> clipped_diff, man_b)
+
+    exp_base = np.where(exp_a_greater, exp_a, exp_b)
+
+    # Step 3: Add/Sub aligned mantissas
+    extended_a_greater = man_a_shifted >= man_b_shifted
+    sign_equal = sign_a == sign_b
+
+    total = np.where(sign_equal, man_a_shifted + man_b_shifted,
+                     np.abs(man_a_shifted - man_b_shifted))
+
+    sign_res = np.where(extended_a_greater, sign_a, sign_b)
+
+    # Step 4: Priority encoder, shift = number of leading zeros of sum[23:0]
+    _, bit_length = np.frexp(total.astype(np.float64))  # Exact, sum < 2^25
+    shift = fmt.man_bits + 1 - bit_length.astype(np.int64)
+
+    return SimpleNamespace(
+        sign_a=sign_a, sign_b=sign_b, exp_a=exp_a, exp_b=exp_b, man_a=man_a, man_b=man_b,
+        is_nan_a=is_nan_a, is_nan_b=is_nan_b, is_inf_a=is_inf_a, is_inf_b=is_inf_b,
+        is_zero_a=is_zero_a, is_zero_b=is_zero_b,
+        exp_diff=exp_diff, exp_base=exp_base, man_a_shifted=man_a_shifted, man_b_shifted=man_b_shifted,
+        sign_equal=sign_equal, sum=total, sign_res=sign_res, shift=shift,
+    )
+
+
+def fp_addsub(a, b, sub=0, fmt=FP32) -> np.ndarray:
+    """Compute a + b (sub == 0) or a - b (sub == 1) exactly as fp_addsub.v does.
+
+    a, b and sub can be scalars or arrays of any broadcastable shape, the result is a uint32 array.
+    fmt gives the field widths, results in FP16 or BF16 are what fp_addsub16.v computes
+    """
+    d = datapath(a, b, sub, fmt)
+    sign_pos, man_bits, man_mask, exp_mask = fmt.exp_bits + fmt.man_bits, fmt.man_bits, fmt.man_mask, fmt.exp_mask
+
+    # Overflow (sum[24] set): shift right by one and increment the exponent, saturating to infinity
+    exp_inc = d.exp_base + 1
+    overflow_result = ((d.sign_res << sign_pos) | (exp_inc << man_bits)
+                       | np.where(exp_inc == exp_mask, 0, (d.sum >> 1) & man_mask))
+
+    # Result would need an exponent <= 0, keep the unshifted mantissa as a subnormal
+    subnormal_result = (d.sign_res << sign_pos) | (d.sum & man_mask)
+    normal_result = ((d.sign_res << sign_pos) | ((d.exp_base - d.shift) << man_bits)
+                     | ((d.sum << np.clip(d.shift, 0, man_bits + 1)) & man_mask))
+
+    # -0 + -0 is the only operation producing -0, every other zero result is +0
+    zero_result = np.where(d.sign_a & d.sign_b & d.is_zero_a & d.is_zero_b, 1 << sign_pos, 0)
+
+    result = np.select(
+        [
+            is_nan_result(d),
+            d.is_inf_a,
+            d.is_inf_b,
+            d.sum == 0,
+            (d.sum >> (man_bits + 1)) == 1,
+            d.exp_base <= d.shift,
+        ],
+        [
+            fmt.qnan,
+            (d.sign_a << sign_pos) | (exp_mask << man_bits),
+            (d.sign_b << sign_pos) | (exp_mask << man_bits),
+            zero_result,
+            overflow_result,
+            subnormal_result,
+        ],
+        default=normal_result,
+    )
+    return result.astype(np.uint32)
+
+
+def fp_addsub_packed(a, b, sub=0, fmt=FP16) -> np.ndarray:
+    """Two FP16 or BF16 additions per 32-bit word, as alu_top.v computes them in packed mode"""
+    a, b = np.asarray(a, dtype=np.uint32), np.asarray(b, dtype=np.uint32)
+    lane0 = fp_addsub(a & 0xFFFF, b & 0xFFFF, sub, fmt)
+    lane1 = fp_addsub(a >> 16, b >> 16, sub, fmt)
+    return pack_halves(lane0, lane1)
+
+
+# NaN input, or infinities of opposite (effective) sign
+def is_nan_result(d) -> np.ndarray:
+    return d.is_nan_a | d.is_nan_b | (d.is_inf_a & d.is_inf_b & (d.sign_a != d.sign_b))
+
+
+def mismatches(a, b, sub, result) -> np.ndarray:
+    """Return the indices where result differs from the reference model"""
+    expected = fp_addsub(a, b, sub)
+    return np.flatnonzero(np.asarray(result, dtype=np.uint32) != expected)
+
+
+def running_sum(values) -> np.ndarray:
+    """Prefix sums of float32 bit patterns, accumulated one addition at a time as the ALU's accumulate mode does"""
+    values = np.asarray(values, dtype=np.uint32)
+    sums = np.empty(len(values) - 1, dtype=np.uint32)
+    acc = values[0]
+    for i, value in enumerate(values[1:]):
+        acc = sums[i] = fp_addsub(acc, value)
+    return sums
@@ -0,0 +1,142 @@
+import numpy as np
+
+
+# Stimulus generators for fp_addsub.v. Every generator returns (a, b, sub) as uint32 arrays
+# of length n, built from random bit fields so that each class of operation is hit often,
+# instead of relying on uniform random patterns (which are mostly large, unrelated numbers).
+# generate_half() does the same for the 16-bit formats of the packed lanes.
+
+MAX_EXP = 0xFE  # Largest exponent of a finite number
+
+
+def _pack(sign, exp, man) -> np.ndarray:
+    return ((sign.astype(np.uint32) << 31) | (exp.astype(np.uint32) << 23) | man.astype(np.uint32)).astype(np.uint32)
+
+def _random_man(rng, n) -> np.ndarray:
+    return rng.integers(0, 1 << 23, n, dtype=np.uint32)
+
+def _random_sign(rng, n) -> np.ndarray:
+    return rng.integers(0, 2, n, dtype=np.uint32)
+
+def _random_sub(rng, n) -> np.ndarray:
+    return rng.integers(0, 2, n, dtype=np.uint32)
+
+
+# Uniformly random bit patterns (any class, mostly normal numbers far apart)
+def uniform(rng, n):
+    a = rng.integers(0, 1 << 32, n, dtype=np.uint64).astype(np.uint32)
+    b = rng.integers(0, 1 << 32, n, dtype=np.uint64).astype(np.uint32)
+    return a, b, _random_sub(rng, n)
+
+# Normal operands with every exponent difference from 0 to 30, in both orders
+def exponent_sweep(rng, n):
+    diff = np.arange(n) % 31
+    exp_big = rng.integers(31, MAX_EXP + 1, n)
+    big = _pack(_random_sign(rng, n), exp_big, _random_man(rng, n))
+    small = _pack(_random_sign(rng, n), exp_big - diff, _random_man(rng, n))
+    swap = rng.integers(0, 2, n).astype(bool)
+    return np.where(swap, small, big), np.where(swap, big, small), _random_sub(rng, n)
+
+# Effective subtraction of nearly equal numbers, exercising every normalization shift
+def cancellation(rng, n):
+    a = _pack(_random_sign(rng, n), rng.integers(1, MAX_EXP + 1, n), _random_man(rng, n))
+    # Flip a random number of low mantissa bits and sometimes move into the neighbouring binade
+    flip = rng.integers(0, 1 << 23, n, dtype=np.uint32) >> rng.integers(0, 24, n).astype(np.uint32)
+    step = rng.integers(-1, 2, n).astype(np.int64) << 23
+    b = np.clip((a & 0x7FFFFFFF).astype(np.int64) + step, 1 << 23, MAX_EXP << 23).astype(np.uint32)
+    b = (b ^ flip) | (a & 0x80000000)
+    # Make the operation an effective subtraction: add with opposite signs or subtract with equal signs
+    sub = _random_sub(rng, n)
+    b ^= (sub ^ 1) << 31
+    return a, b.astype(np.uint32), sub
+
+# Subnormal operands, mixed with other subnormals and the smallest normal numbers
+def subnormal(rng, n):
+    a = _pack(_random_sign(rng, n), np.zeros(n, dtype=np.uint32), _random_man(rng, n))
+    exp_b = rng.choice(np.array([0, 0, 1, 2, 3], dtype=np.uint32), n)
+    b = _pack(_random_sign(rng, n), exp_b, _random_man(rng, n))
+    swap = rng.integers(0, 2, n).astype(bool)
+    return np.where(swap, b, a), np.where(swap, a, b), _random_sub(rng, n)
+
+# Largest exponents, where the result overflows to infinity
+def overflow(rng, n):
+    a = _pack(_random_sign(rng, n), rng.integers(MAX_EXP - 2, MAX_EXP + 1, n), _random_man(rng, n))
+    b = _pack(_random_sign(rng, n), rng.integers(MAX_EXP - 2, MAX_EXP + 1, n), _random_man(rng, n))
+    return a, b, _random_sub(rng, n)
+
+# Zeros, infinities and NaNs against each other and against random numbers
+def special(rng, n):
+    values = np.array([
+        0x00000000, 0x80000000,  # Zeros
+        0x7F800000, 0xFF800000,  # Infinities
+        0x7FC00000, 0xFFC00000,  # Quiet NaNs
+        0x7F800001, 0x7FBFFFFF,  # Signalling NaNs
+    ], dtype=np.uint32)
+    a = rng.choice(values, n)
+    b = rng.integers(0, 1 << 32, n, dtype=np.uint64).astype(np.uint32)
+    both = rng.integers(0, 2, n).astype(bool)
+    b = np.where(both, rng.choice(values, n), b)
+    swap = rng.integers(0, 2, n).astype(bool)
+    return np.where(swap, b, a), np.where(swap, a, b), _random_sub(rng, n)
+
+
+# Share of each class in a generated batch
+DEFAULT_MIX = {
+    uniform: 0.3,
+    exponent_sweep: 0.2,
+    cancellation: 0.2,
+    subnormal: 0.1,
+    overflow: 0.1,
+    special: 0.1,
+}
+
+
+def generate(n, seed=None, mix=None):
+    """Generate n shuffled (a, b, sub) vectors drawn from the classes in mix"""
+    rng = np.random.default_rng(seed)
+    mix = DEFAULT_MIX if mix is None else mix
+    weights = np.array(list(mix.values()), dtype=np.float64)
+    counts = np.floor(weights / weights.sum() * n).astype(int)
+    counts[0] += n - counts.sum()  # Give the remainder to the first class
+
+    parts = [generator(rng, count) for generator, count in zip(mix, counts)]
+    a, b, sub = (np.concatenate(column) for column in zip(*parts))
+
+    order = rng.permutation(n)
+    return a[order], b[order], sub[order]
+
+
+def generate_half(n, fmt, seed=None):
+    """Generate n (a, b, sub) vectors of 16-bit floats in fmt (fp_model.FP16 or BF16): uniform patterns,
+    operands at most 2 binades apart (carries and cancellation) and edge values against anything"""
+    rng = np.random.default_rng(seed)
+    man_bits, exp_max = fmt.man_bits, fmt.exp_mask
+    sign = np.uint32(1 << 15)
+
+    def pack(sign_bits, exp, man):
+        return ((sign_bits.astype(np.uint32) << 15) | (exp.astype(np.uint32) << man_bits) | man.astype(np.uint32)).astype(np.uint32)
+
+    edges = np.array([
+        0, 1, fmt.man_mask,                              # Zero, smallest and largest subnormal
+        1 << man_bits, (exp_max - 1) << man_bits | fmt.man_mask,  # Smallest and largest normal
+        (exp_max >> 1) << man_bits,                      # One
+        exp_max << man_bits, fmt.qnan, exp_max << man_bits | 1,  # Infinity, quiet and signalling NaN
+    ], dtype=np.uint32)
+
+    kind = rng.integers(0, 3, n)
+    a = rng.integers(0, 1 << 16, n, dtype=np.uint32)
+    b = rng.integers(0, 1 << 16, n, dtype=np.uint32)
+
+    # Same, neighbouring or next but one binade, with a random number of low mantissa bits changed
+    exp = rng.integers(0, exp_max, n)
+    close_a = pack(rng.integers(0, 2, n), exp, rng.integers(0, 1 << man_bits, n))
+    flip = rng.integers(0, 1 << man_bits, n, dtype=np.uint32) >> rng.integers(0, man_bits + 1, n).astype(np.uint32)
+    close_b = pack(rng.integers(0, 2, n), np.clip(exp + rng.integers(-2, 3, n), 0, exp_max - 1), (close_a & fmt.man_mask) ^ flip)
+    a, b = np.where(kind == 1, close_a, a), np.where(kind == 1, close_b, b)
+
+    edge_a = rng.choice(edges, n) ^ np.where(rng.integers(0, 2, n), sign, 0)
+    edge_b = np.where(rng.integers(0, 2, n), rng.choice(edges, n) ^ np.where(rng.integers(0, 2, n), sign, 0), b)
+    a, b = np.where(kind == 2, edge_a, a), np.where(kind == 2, edge_b, b)
+
+    swap = rng.integers(0, 2, n).astype(bool)
+    return np.where(swap, b, a).astype(np.uint32), np.where(swap, a, b).astype(np.uint32), _random_sub(rng, n)
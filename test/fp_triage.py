@@ -0,0 +1,211 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+import fp_coverage
+import fp_model
+from fp_fuzz import write_vectors
+
+
+# Failure triage for fp_addsub. Mismatches are collected instead of failing on the first one and
+# bucketed by a signature that points at the root cause:
+#   operand classes of a and b, effective operation (add or subtract magnitudes), exponent
+#   difference, branch of the RTL (the coverage bin, which names the normalize shift) and the
+#   fields of the result that are wrong.
+# Every bucket is shrunk to a minimal vector that still fails with the same signature, and the
+# representatives are written as a replay file (the format of fp_fuzz.py) that test_fp_addsub.py reruns.
+
+TRIAGE_FILE = "triage.json"
+REPLAY_FILE = "triage.txt"
+
+OPERAND_CLASSES = ["zero", "subnormal", "normal", "inf", "nan"]
+OPERATIONS = ["add", "sub"]
+DIFF_BUCKETS = ["diff=0", "diff=1", "diff=2..23", "diff>=24"]
+FIELDS = ["sign", "exponent", "mantissa"]
+
+# Mixed-radix signature: ((((class_a * 5 + class_b) * 2 + op) * 4 + diff) * BINS + bin) * 8 + fields
+_RADIX = [len(OPERAND_CLASSES), len(OPERAND_CLASSES), len(OPERATIONS), len(DIFF_BUCKETS), len(fp_coverage.BINS), 1 << len(FIELDS)]
+
+
+def _operand_class(x) -> np.ndarray:
+    x = np.asarray(x, dtype=np.uint32)
+    exp, man = (x >> 23) & fp_model.EXP_MASK, x & fp_model.MAN_MASK
+    return np.select([(exp == 0) & (man == 0), exp == 0, exp < fp_model.EXP_MASK, man == 0], [0, 1, 2, 3], default=4)
+
+
+def signature(a, b, sub, result, expected=None) -> np.ndarray:
+    """Return the signature of every vector as an integer, see describe()"""
+    if expected is None:
+        expected = fp_model.fp_addsub(a, b, sub)
+    d = fp_model.datapath(a, b, sub)
+    wrong = np.asarray(result, dtype=np.uint32) ^ np.asarray(expected, dtype=np.uint32)
+    fields = ((wrong >> 31) & 1) | ((((wrong >> 23) & fp_model.EXP_MASK) != 0) << 1) | (((wrong & fp_model.MAN_MASK) != 0) << 2)
+    diff = np.select([d.exp_diff == 0, d.exp_diff == 1, d.exp_diff < 24], [0, 1, 2], default=3)
+
+    code = np.zeros(len(np.atleast_1d(wrong)), dtype=np.int64)
+    for digit, radix in zip([_operand_class(a), _operand_class(b), (~d.sign_equal).astype(np.int64), diff,
+                             fp_coverage.classify(a, b, sub), fields], _RADIX):
+        code = code * radix + digit
+    return code
+
+
+def describe(code) -> str:
+    """Readable form of a signature, e.g. 'normal - normal, diff=0, shift_19, wrong exponent+mantissa'"""
+    digits = []
+    for radix in reversed(_RADIX):
+        code, digit = divmod(int(code), radix)
+        digits.append(digit)
+    class_a, class_b, op, diff, branch, fields = reversed(digits)
+    wrong = "+".join(name for k, name in enumerate(FIELDS) if fields >> k & 1)
+    return (f"{OPERAND_CLASSES[class_a]} {'-' if op else '+'} {OPERAND_CLASSES[class_b]}, {DIFF_BUCKETS[diff]}, "
+            f"{fp_coverage.BINS[branch]}, {f'wrong {wrong}' if wrong else 'passes'}")
+
+
+async def minimize(run, vectors, keep):
+    """Shrink failing vectors by clearing bits for as long as they keep failing the same way.
+
+    run is an async callable returning the DUT results for (a, b, sub) arrays, and keep(i, a, b, sub, result)
+    tells which candidates still reproduce the failure of vector i. Every round tries every single-bit
+    reduction of every vector in one batch, so the number of runs is at most 65 whatever the count.
+    """
+    bits = [int(a) << 33 | int(b) << 1 | int(sub) for a, b, sub in vectors]
+    active = list(range(len(bits)))
+    while active:
+        owners, candidates = [], []
+        for i in active:
+            reductions = [bits[i] & ~(1 << k) for k in range(65) if bits[i] >> k & 1]
+            owners += [i] * len(reductions)
+            candidates += reductions
+        if not candidates:
+            break
+
+        owners = np.array(owners)
+        a = np.array([c >> 33 for c in candidates], dtype=np.uint32)
+        b = np.array([(c >> 1) & 0xFFFFFFFF for c in candidates], dtype=np.uint32)
+        sub = np.array([c & 1 for c in candidates], dtype=np.uint32)
+        result = await run(a, b, sub)
+
+        still = np.zeros(len(candidates), dtype=bool)
+        for i in active:
+            mine = owners == i
+            still[mine] = keep(i, a[mine], b[mine], sub[mine], result[mine])
+        active = []
+        for i in np.unique(owners[still]).tolist():
+            bits[i] = candidates[np.flatnonzero(still & (owners == i))[0]]
+            active.append(i)
+    return [(x >> 33, (x >> 1) & 0xFFFFFFFF, x & 1) for x in bits]
+
+
+class Triage:
+    """Mismatches bucketed by signature, with the first few examples of every bucket"""
+
+    def __init__(self, examples=8):
+        self.examples = examples  # Examples kept per bucket
+        self.vectors = 0
+        self.counts = {}          # signature -> number of mismatches
+        self.samples = {}         # signature -> [(a, b, sub, result)]
+        self.minimized = {}       # signature -> (a, b, sub)
+
+    @property
+    def failures(self) -> int:
+        return sum(self.counts.values())
+
+    def add(self, a, b, sub, result, expected=None) -> int:
+        """Record a checked batch, return the number of mismatches in it"""
+        if expected is None:
+            expected = fp_model.fp_addsub(a, b, sub)
+        self.vectors += len(result)
+        bad = np.flatnonzero(np.asarray(result) != expected)
+        if not len(bad):
+            return 0
+
+        a, b, sub, result, expected = (np.asarray(x, dtype=np.uint32)[bad] for x in (a, b, sub, result, expected))
+        codes = signature(a, b, sub, result, expected)
+        found, count = np.unique(codes, return_counts=True)
+        for code, n in zip(found.tolist(), count.tolist()):
+            self.counts[code] = self.counts.get(code, 0) + n
+            samples = self.samples.setdefault(code, [])
+            for i in np.flatnonzero(codes == code)[:self.examples - len(samples)].tolist():
+                samples.append((int(a[i]), int(b[i]), int(sub[i]), int(result[i])))
+        return len(bad)
+
+    def buckets(self) -> list:
+        """Signatures, most frequent first"""
+        return sorted(self.counts, key=lambda code: (-self.counts[code], code))
+
+    async def minimize(self, run):
+        """Shrink the first example of every bucket, run drives (a, b, sub) arrays through the DUT"""
+        codes = self.buckets()
+        def keep(i, a, b, sub, result):
+            return (result != fp_model.fp_addsub(a, b, sub)) & (signature(a, b, sub, result) == codes[i])
+        shrunk = await minimize(run, [self.samples[code][0][:3] for code in codes], keep)
+        self.minimized = dict(zip(codes, shrunk))
+
+    def representatives(self):
+        """One (a, b, sub) vector per bucket, minimized where possible"""
+        return [self.minimized.get(code, self.samples[code][0][:3]) for code in self.buckets()]
+
+    def merge(self, other):
+        self.vectors += other.vectors
+        for code, count in other.counts.items():
+            self.counts[code] = self.counts.get(code, 0) + count
+            self.samples[code] = (self.samples.get(code, []) + other.samples.get(code, []))[:self.examples]
+            if code in other.minimized:
+                self.minimized.setdefault(code, other.minimized[code])
+
+    def summary(self, limit=20) -> str:
+        lines = [f"{self.failures} of {self.vectors} vectors mismatched in {len(self.counts)} buckets"]
+        for code, (a, b, sub) in list(zip(self.buckets(), self.representatives()))[:limit]:
+            lines.append(f"  {self.counts[code]:>9}  {describe(code):<60} {a:08x} {'-' if sub else '+'} {b:08x}")
+        if len(self.counts) > limit:
+            lines.append(f"  ... {len(self.counts) - limit} more buckets")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "vectors": self.vectors,
+            "failures": self.failures,
+            "buckets": [
+                {
+                    "signature": code,
+                    "description": describe(code),
+                    "count": self.counts[code],
+                    "samples": [[f"{a:08x}", f"{b:08x}", sub, f"{result:08x}"] for a, b, sub, result in self.samples[code]],
+                    "minimized": ([f"{x:08x}" for x in self.minimized[code][:2]] + [self.minimized[code][2]]) if code in self.minimized else None,
+                }
+                for code in self.buckets()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        triage = cls()
+        triage.vectors = data["vectors"]
+        for bucket in data["buckets"]:
+            code = bucket["signature"]
+            triage.counts[code] = bucket["count"]
+            triage.samples[code] = [(int(a, 16), int(b, 16), sub, int(result, 16)) for a, b, sub, result in bucket["samples"]]
+            if bucket["minimized"]:
+                a, b, sub = bucket["minimized"]
+                triage.minimized[code] = (int(a, 16), int(b, 16), sub)
+        return triage
+
+    def write(self, directory):
+        """Write the report and the replay file with one vector per bucket"""
+        directory = Path(directory)
+        with open(directory / TRIAGE_FILE, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        a, b, sub = np.array(self.representatives(), dtype=np.uint32).reshape(-1, 3).T
+        write_vectors(directory / REPLAY_FILE, a, b, sub, [f"{self.counts[code]} x {describe(code)}" for code in self.buckets()])
+
+    @classmethod
+    def read(cls, directory):
+        with open(Path(directory) / TRIAGE_FILE) as f:
+            return cls.from_dict(json.load(f))
+
+
+# Directory of the triage report, next to the cocotb results file
+def report_dir() -> str:
+    return os.path.dirname(os.path.abspath(os.environ.get("COCOTB_RESULTS_FILE", "results.xml")))
@@ -0,0 +1,15 @@
+# SPDX-License-Identifier: Apache-2.0
+
+"""Identify the checked out commit, for the reports of benchmark.py and synth_metrics.py (no cocotb needed)"""
+
+import subprocess
+
+
+def git_commit() -> str:
+    """Short hash of the checked out commit, with a + suffix if the tree has local changes"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("+" if dirty else "")
@@ -6,13 +6,35 @@ that can be driven / tested by the cocotb test.py.
 */
 module integration_tests ();
 
-    // Dump the signals to a VCD file. You can view it with gtkwave or surfer.
+    // Dump the signals to a VCD or FST file. You can view it with gtkwave or surfer.
+    // Dumping is off unless the Makefile passes +dumpfile=<file> (DUMP=1 or DUMP=window):
+    //   +dumpscope=user_project  only dump the netlist, without the testbench signals
+    //   +dumpall                 dump from the start, otherwise only while dump_on is set from Python
+    reg dump_on;                // Switches dumping on and off, see waves.py
+    reg [8*256-1:0] dump_file;
+    reg [8*64-1:0]  dump_scope;
+
     initial begin
-    $dumpfile("integration_tests.vcd");
-    $dumpvars(0, integration_tests);
+    if ($value$plusargs("dumpfile=%s", dump_file)) begin
+        if (!$value$plusargs("dumpscope=%s", dump_scope)) dump_scope = "integration_tests";
+        $dumpfile(dump_file);
+        if (dump_scope == "user_project") $dumpvars(0, user_project);
+        else                              $dumpvars(0, integration_tests);
+        if (!$test$plusargs("dumpall")) $dumpoff;
+    end
     #1;
     end
 
+    // Delays of the hardened design, see GL_SDF in the Makefile
+`ifdef SDF_FILE
+    initial $sdf_annotate(`SDF_FILE, user_project);
+`endif
+
+    always @(dump_on) begin
+        if (dump_on) $dumpon;
+        else         $dumpoff;
+    end
+
     // Test the whole system
     // Wire up the inputs and outputs:
     reg clk;
@@ -0,0 +1,369 @@
+import heapq
+import logging
+import os
+from collections import deque
+
+import cocotb
+import cocotb.clock
+import cocotb.triggers
+from cocotb.binary import BinaryValue
+
+import alu_model
+
+
+# Simulator-free backend: runs the cocotb tests of unit_tests.v on the behavioral models in
+# alu_model.py (see conftest.py). It provides the handles of the unit_tests toplevel and a small
+# event scheduler behind the cocotb triggers the tests use. Writes are applied at the end of the
+# current time step, the clocked models update on the rising edge of clk (before any coroutine
+# woken by that edge runs) and combinational outputs are computed when they are read.
+
+UNITS = {"step": 1, "fs": 1e-3, "ps": 1, "ns": 1e3, "us": 1e6, "ms": 1e9, "sec": 1e12}  # Time step is 1 ps
+
+_scheduler = None  # Scheduler of the test that is running
+
+
+def _to_int(value) -> int:
+    if isinstance(value, BinaryValue):
+        # x and z read as 0, as in a two-state simulator
+        return int(value.binstr.lower().replace("x", "0").replace("z", "0") or "0", 2)
+    return int(value)
+
+
+class Signal:
+    """Handle of a testbench signal, driven from Python"""
+
+    def __init__(self, scheduler, name, width=1):
+        self._scheduler = scheduler
+        self._name = name
+        self._width = width
+        self._mask = (1 << width) - 1
+        self._value = 0
+
+    @property
+    def value(self) -> BinaryValue:
+        return BinaryValue(self._get(), n_bits=self._width, bigEndian=False)
+
+    @value.setter
+    def value(self, value):
+        self._scheduler.write(self, _to_int(value) & self._mask)
+
+    def _get(self) -> int:
+        return self._value
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._name})"
+
+
+class Output(Signal):
+    """Handle of a signal driven by the design, its value comes from the models"""
+
+    def __init__(self, scheduler, name, width, get):
+        super().__init__(scheduler, name, width)
+        self._get = get
+
+    @Signal.value.setter
+    def value(self, value):
+        raise AttributeError(f"{self._name} is driven by the design")
+
+
+class UnitTests:
+    """The unit_tests toplevel: project pins, fp_addsub, fp_addsub_lanes, fp_addsub16, fp_addsub_pipe and alu_top on their own"""
+
+    def __init__(self, scheduler, stages, lanes):
+        self._log = logging.getLogger("cocotb.unit_tests")
+        self._project = alu_model.AluTop()
+        self._state_machine = alu_model.AluTop()
+        self._pipelined_adder = alu_model.PipelinedAdder(stages)
+
+        def signal(name, width=1):
+            return Signal(scheduler, name, width)
+
+        def output(name, width, get):
+            return Output(scheduler, name, width, get)
+
+        self.clk, self.rst_n, self.ena, self.dump_on = signal("clk"), signal("rst_n"), signal("ena"), signal("dump_on")
+
+        # tt_um_32_bit_fp_ALU_S_M
+        project = self._project
+        self.ui_in, self.uio_in = signal("ui_in", 8), signal("uio_in", 8)
+        self.uo_out = output("uo_out", 8, lambda: project.out)
+        self.uio_out = output("uio_out", 8, lambda: project.state << 4 | project.done << 3)
+        self.uio_oe = output("uio_oe", 8, lambda: 0b1111_1000)
+
+        # fp_addsub
+        self.a, self.b, self.sub = signal("a", 32), signal("b", 32), signal("sub")
+        self.result = output("result", 32, lambda: alu_model.addsub(self.a._value, self.b._value, self.sub._value))
+
+        # fp_addsub_lanes
+        self.lanes_a, self.lanes_b, self.lanes_sub = signal("lanes_a", 32 * lanes), signal("lanes_b", 32 * lanes), signal("lanes_sub", lanes)
+        self.lanes_result = output("lanes_result", 32 * lanes, lambda: alu_model.addsub_lanes(self.lanes_a._value, self.lanes_b._value,
+                                                                                            self.lanes_sub._value, lanes))
+
+        # fp_addsub16
+        self.half_a, self.half_b, self.half_sub, self.half_bf16 = signal("half_a", 16), signal("half_b", 16), signal("half_sub"), signal("half_bf16")
+        self.half_result = output("half_result", 16, lambda: alu_model.addsub16(self.half_a._value, self.half_b._value,
+                                                                               self.half_sub._value, self.half_bf16._value))
+
+        # fp_addsub_pipe
+        pipe = self._pipelined_adder
+        self.pipe_valid_in, self.pipe_sub = signal("pipe_valid_in"), signal("pipe_sub")
+        self.pipe_a, self.pipe_b = signal("pipe_a", 32), signal("pipe_b", 32)
+        self.pipe_valid_out = output("pipe_valid_out", 1, lambda: pipe.valid_out)
+        self.pipe_result = output("pipe_result", 32, lambda: pipe.result)
+
+        # alu_top
+        alu = self._state_machine
+        self.in_, self.opcode, self.start = signal("in_", 8), signal("opcode", 2), signal("start")
+        self.out = output("out", 8, lambda: alu.out)
+        self.done = output("done", 1, lambda: alu.done)
+        self.state_out = output("state_out", 4, lambda: alu.state)
+
+    def _reset(self):
+        self._project.reset()
+        self._state_machine.reset()
+        self._pipelined_adder.reset()
+
+    def changed(self, signal, value):
+        """Update the models after signal changed to value"""
+        if signal is self.rst_n and not value:
+            self._reset()
+        elif signal is self.clk and value:
+            if not self.rst_n._value:
+                self._reset()
+                return
+            uio_in = self.uio_in._value
+            self._project.clock(self.ui_in._value, uio_in & 0b11, (uio_in >> 2) & 1)
+            self._state_machine.clock(self.in_._value, self.opcode._value, self.start._value)
+            self._pipelined_adder.clock(self.pipe_valid_in._value, self.pipe_a._value, self.pipe_b._value, self.pipe_sub._value)
+
+
+class Task:
+    def __init__(self, scheduler, coro):
+        self._scheduler = scheduler
+        self._coro = coro
+        self.done = False
+
+    def kill(self):
+        self.done = True
+
+    def _step(self, value=None):
+        if self.done:
+            return
+        try:
+            trigger = self._coro.send(value)
+        except StopIteration:
+            self.done = True
+        except BaseException as e:
+            self.done = True
+            self._scheduler.error = self._scheduler.error or e
+        else:
+            trigger._register(self._scheduler, self)
+
+
+class Scheduler:
+    def __init__(self):
+        self.now = 0         # Simulation time in steps
+        self.error = None    # First exception raised by any task
+        self.dut = None
+        self._seq = 0
+        self._timers = []    # Heap of (time, sequence, task)
+        self._ready = deque()
+        self._edges = {}     # signal -> [(task, 1 for rising, 0 for falling, None for any change)]
+        self._read_write = []
+        self._writes = {}
+
+    def start_soon(self, coro) -> Task:
+        task = Task(self, coro)
+        self._ready.append(task)
+        return task
+
+    def write(self, signal, value):
+        self._writes[signal] = value
+
+    def wake(self, task):
+        self._ready.append(task)
+
+    def after(self, delay, task):
+        self._seq += 1
+        heapq.heappush(self._timers, (self.now + max(delay, 1), self._seq, task))
+
+    def on_edge(self, signal, edge, task):
+        self._edges.setdefault(signal, []).append((task, edge))
+
+    def on_read_write(self, task):
+        self._read_write.append(task)
+
+    def run(self, coro):
+        """Run the test coroutine until it returns, raising the first exception of any task"""
+        test = self.start_soon(coro)
+        while True:
+            self._settle()
+            if self.error is not None:
+                raise self.error
+            if test.done:
+                return
+            if not self._timers:
+                raise RuntimeError(f"Test is waiting for a trigger that can never fire (at {self.now} steps)")
+            self.now = self._timers[0][0]
+            while self._timers and self._timers[0][0] == self.now:
+                self._ready.append(heapq.heappop(self._timers)[2])
+
+    def _run_ready(self):
+        while self._ready and self.error is None:
+            self._ready.popleft()._step()
+
+    def _apply_writes(self):
+        writes, self._writes = self._writes, {}
+        for signal, value in writes.items():
+            if signal._value == value:
+                continue
+            signal._value = value
+            self.dut.changed(signal, value)
+            waiters = self._edges.pop(signal, [])
+            keep = []
+            for task, edge in waiters:
+                if edge is None or edge == (value & 1):
+                    self._ready.append(task)
+                else:
+                    keep.append((task, edge))
+            if keep:
+                self._edges[signal] = keep
+
+    def _settle(self):
+        # Run everything that happens in the current time step
+        while self.error is None:
+            self._run_ready()
+            if self._writes:
+                self._apply_writes()
+            elif self._read_write:
+                self._ready.extend(self._read_write)
+                self._read_write = []
+            elif not self._ready:
+                break
+
+
+# Triggers with the interface of cocotb.triggers
+
+class _Trigger:
+    def __await__(self):
+        yield self
+        return self
+
+
+class Timer(_Trigger):
+    def __init__(self, time, units="step"):
+        self._delay = round(time * UNITS[units])
+
+    def _register(self, scheduler, task):
+        scheduler.after(self._delay, task)
+
+
+class RisingEdge(_Trigger):
+    _edge = 1
+
+    def __init__(self, signal):
+        self.signal = signal
+
+    def _register(self, scheduler, task):
+        scheduler.on_edge(self.signal, self._edge, task)
+
+
+class FallingEdge(RisingEdge):
+    _edge = 0
+
+
+class Edge(RisingEdge):
+    _edge = None
+
+
+class ReadWrite(_Trigger):
+    def _register(self, scheduler, task):
+        scheduler.on_read_write(task)
+
+
+class ClockCycles:
+    def __init__(self, signal, num_cycles, rising=True):
+        self.signal = signal
+        self.num_cycles = num_cycles
+        self._edge = RisingEdge(signal) if rising else FallingEdge(signal)
+
+    def __await__(self):
+        for _ in range(self.num_cycles):
+            yield self._edge
+        return self
+
+
+class _EventTrigger(_Trigger):
+    def __init__(self, event):
+        self._event = event
+
+    def _register(self, scheduler, task):
+        if self._event.is_set():
+            scheduler.wake(task)
+        else:
+            self._event._waiters.append(task)
+
+
+class Event:
+    def __init__(self, name=None):
+        self.name = name
+        self.data = None
+        self._fired = False
+        self._waiters = []
+
+    def set(self, data=None):
+        self._fired = True
+        self.data = data
+        waiters, self._waiters = self._waiters, []
+        for task in waiters:
+            _scheduler.wake(task)
+
+    def clear(self):
+        self._fired = False
+
+    def is_set(self) -> bool:
+        return self._fired
+
+    def wait(self) -> _EventTrigger:
+        return _EventTrigger(self)
+
+
+class Clock:
+    def __init__(self, signal, period, units="step"):
+        self.signal = signal
+        self._half = round(period * UNITS[units] / 2)
+
+    async def start(self, start_high=True):
+        high, low = Timer(self._half), Timer(self._half)
+        level = int(start_high)
+        while True:
+            self.signal.value = level
+            await (high if level else low)
+            level ^= 1
+
+
+def start_soon(coro) -> Task:
+    return _scheduler.start_soon(coro)
+
+
+def install(seed):
+    """Replace the cocotb triggers, Clock and start_soon with the model versions.
+
+    Must run before the test modules are imported, as they import the trigger names directly.
+    """
+    for trigger in (Timer, RisingEdge, FallingEdge, Edge, ReadWrite, ClockCycles, Event):
+        setattr(cocotb.triggers, trigger.__name__, trigger)
+    cocotb.clock.Clock = Clock
+    cocotb.start_soon = start_soon
+    cocotb.RANDOM_SEED = seed
+
+
+def run_test(test):
+    """Run a @cocotb.test() function on a fresh instance of the models"""
+    global _scheduler
+    _scheduler = Scheduler()
+    _scheduler.dut = UnitTests(_scheduler, int(os.environ.get("PIPE_STAGES", 3)), int(os.environ.get("FP_LANES", 16)))
+    try:
+        _scheduler.run(test._func(_scheduler.dut))
+    finally:
+        _scheduler = None
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+
+"""Run the RTL regression as several parallel simulator processes.
+
+Every cocotb module in the Makefile runs as its own job, and the random fp_addsub
+regression is split into shards with distinct seeds. Each job gets its own build and
+output directory under --out, and the per-job results.xml, coverage.json and triage.json
+files are merged into a single report once all jobs have finished.
+
+    python regress.py -j 8 --vectors 4000000
+"""
+
+import argparse
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fp_coverage import COVERAGE_FILE, Coverage
+from fp_triage import TRIAGE_FILE, Triage
+
+
+TEST_DIR = Path(__file__).resolve().parent
+REGRESSION_MODULE = "test_fp_addsub"
+REGRESSION_TEST = "test_random_regression"
+
+
+class Job:
+    def __init__(self, name, module, env, testcase=None, sim_build=None, make_vars=()):
+        self.name = name
+        self.module = module
+        self.testcase = testcase
+        self.env = env
+        self.sim_build = sim_build  # Shared build directory, by default every job builds in its own
+        self.make_vars = list(make_vars)  # Further NAME=VALUE arguments of make
+        self.returncode = None
+        self.elapsed = 0.0
+
+    def make_args(self, out_dir, sim):
+        args = ["make", "-f", str(TEST_DIR / "Makefile"),
+                # Passed on the command line so that sub-makes keep resolving sources relative to test/
+                f"PWD={TEST_DIR}",
+                f"SIM={sim}",
+                f"MODULE={self.module}",
+                f"SIM_BUILD={self.sim_build or out_dir / 'sim_build'}",
+                f"COCOTB_RESULTS_FILE={out_dir / 'results.xml'}"] + self.make_vars
+        if self.testcase:
+            args.append(f"TESTCASE={self.testcase}")
+        return args
+
+
+# Read the list of RTL test modules from the Makefile
+def makefile_modules():
+    text = (TEST_DIR / "Makefile").read_text()
+    return re.search(r"^MODULE\s*=\s*(\S+)", text, re.MULTILINE).group(1).split(",")
+
+
+def plan_jobs(modules, vectors, shards, seed):
+    jobs = []
+    for module in modules:
+        env = {"RANDOM_SEED": str(seed)}
+        if module == REGRESSION_MODULE:
+            env["FP_VECTORS"] = "0"  # The random batch runs in the shards below
+        jobs.append(Job(module, module, env))
+
+    if REGRESSION_MODULE in modules:
+        for shard in range(shards):
+            count = vectors // shards + (shard < vectors % shards)
+            env = {"RANDOM_SEED": str(seed + 1 + shard), "FP_VECTORS": str(count)}
+            jobs.append(Job(f"{REGRESSION_TEST}_{shard}", REGRESSION_MODULE, env, testcase=REGRESSION_TEST))
+    return jobs
+
+
+def run_job(job, out, sim):
+    out_dir = out / job.name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "results.xml").unlink(missing_ok=True)
+    (out_dir / TRIAGE_FILE).unlink(missing_ok=True)  # Only written when the job had mismatches
+
+    env = dict(os.environ, **job.env)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(TEST_DIR), env.get("PYTHONPATH")]))
+
+    start = time.perf_counter()
+    with open(out_dir / "sim.log", "w") as log:
+        # Run inside the job directory so waveform dumps don't collide between jobs
+        job.returncode = subprocess.call(job.make_args(out_dir, sim), cwd=out_dir, env=env,
+                                         stdout=log, stderr=subprocess.STDOUT)
+    job.elapsed = time.perf_counter() - start
+    return job
+
+
+def merge_results(jobs, out):
+    """Merge the per-job junit files into out/results.xml and return (tests, failures, missing jobs)"""
+    merged = ET.Element("testsuites", name="results")
+    suite = ET.SubElement(merged, "testsuite", name="all", package="all")
+    tests = failures = 0
+    missing = []
+    for job in jobs:
+        path = out / job.name / "results.xml"
+        if not path.exists():
+            missing.append(job.name)
+            continue
+        for case in ET.parse(path).getroot().iter("testcase"):
+            if job.testcase:
+                case.set("name", f"{case.get('name')}[{job.name}]")
+            tests += 1
+            failures += case.find("failure") is not None
+            suite.append(case)
+    ET.ElementTree(merged).write(out / "results.xml", encoding="UTF-8", xml_declaration=True)
+    return tests, failures, missing
+
+
+def merge_coverage(jobs, out):
+    coverage = Coverage()
+    for job in jobs:
+        path = out / job.name / COVERAGE_FILE
+        if path.exists():
+            coverage.merge(Coverage.read(path))
+    coverage.write(out / COVERAGE_FILE)
+    return coverage
+
+
+def merge_triage(jobs, out):
+    """Merge the triage reports of the jobs that had mismatches, None if there were none"""
+    triage = None
+    for job in jobs:
+        if (out / job.name / TRIAGE_FILE).exists():
+            triage = triage or Triage()
+            triage.merge(Triage.read(out / job.name))
+    if triage:
+        triage.write(out)
+    return triage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", help="cocotb modules to run (default: MODULE from the Makefile)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="parallel simulator processes")
+    parser.add_argument("--shards", type=int, help="shards of the random regression (default: --jobs)")
+    parser.add_argument("--vectors", type=int, default=int(os.environ.get("FP_VECTORS", 100000)),
+                        help="total vectors of the random regression, split across the shards")
+    parser.add_argument("--seed", type=int, default=int(os.environ.get("RANDOM_SEED", random.randrange(1 << 31))))
+    parser.add_argument("--sim", default=os.environ.get("SIM", "icarus"))
+    parser.add_argument("--out", type=Path, default=TEST_DIR / "regress", help="output directory")
+    args = parser.parse_args()
+
+    out = args.out.resolve()
+    jobs = plan_jobs(args.modules or makefile_modules(), args.vectors, args.shards or args.jobs, args.seed)
+    print(f"Running {len(jobs)} jobs on {args.jobs} processes, seed {args.seed}, output in {out}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        for job in pool.map(lambda job: run_job(job, out, args.sim), jobs):
+            status = "ok" if job.returncode == 0 else f"exit {job.returncode}"
+            print(f"  {job.name:<32} {status:<8} {job.elapsed:7.1f} s")
+    elapsed = time.perf_counter() - start
+
+    tests, failures, missing = merge_results(jobs, out)
+    coverage = merge_coverage(jobs, out)
+    triage = merge_triage(jobs, out)
+
+    print(f"{tests} tests, {failures} failures in {elapsed:.1f} s")
+    print(coverage.summary().splitlines()[0])
+    if triage:
+        print(triage.summary())
+    for name in missing:
+        print(f"ERROR: job {name} did not write results.xml, see {out / name / 'sim.log'}")
+    return 1 if failures or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+
+"""Replay large vector batches through fp_addsub and alu_top without cocotb.
+
+Vectors are written to a binary file, replayed by the pure-HDL testbenches in replay_tb.v and the
+results file is checked in bulk against the reference model through a memory-mapped array. No
+Python code runs per vector, so this reaches far higher rates than the cocotb tests.
+
+    python replay.py --vectors 10000000 --ops 1000000 --sim icarus
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+import fp_stimulus
+from fp_triage import Triage
+from tt_protocol import OP_ACCUMULATE, reference, schedule
+
+
+TEST_DIR = Path(__file__).resolve().parent
+SRC_DIR = TEST_DIR.parent / "src"
+TOPS = {
+    "replay_fp_addsub": ["fp_addsub.v"],
+    "replay_alu_top": ["alu_top.v", "fp_addsub.v", "fp_addsub16.v"],
+}
+
+
+def build(top, sim, out, adder="fp_addsub") -> list:
+    """Compile one replay testbench and return the command that runs it"""
+    sources = [str(SRC_DIR / name) for name in TOPS[top]] + [str(TEST_DIR / "replay_tb.v")]
+    if top == "replay_fp_addsub":
+        sources[0] = str(SRC_DIR / f"{adder}.v")  # Variant of fp_addsub under test
+    if sim == "icarus":
+        image = out / f"{top}.vvp"
+        subprocess.run(["iverilog", "-g2012", f"-DFP_ADDSUB={adder}", "-s", top, "-o", str(image)] + sources, check=True)
+        return ["vvp", "-n", str(image)]
+    if sim == "verilator":
+        mdir = out / f"obj_{top}"
+        subprocess.run(["verilator", "--binary", "--timing", "--timescale", "1ns/1ps", "-O3", f"-DFP_ADDSUB={adder}",
+                        "--top-module", top, "-Mdir", str(mdir), "-o", top] + sources, check=True, stdout=subprocess.DEVNULL)
+        return [str(mdir / top)]
+    raise ValueError(f"Unsupported simulator: {sim}")
+
+
+def replay(command, vectors, results) -> float:
+    """Run a replay testbench and return the time it took"""
+    results.unlink(missing_ok=True)
+    start = time.perf_counter()
+    subprocess.run(command + [f"+vectors={vectors}", f"+results={results}"], check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def check(name, result, expected, elapsed, describe) -> bool:
+    ok = len(result) == len(expected) and np.array_equal(result, expected)
+    print(f"{name}: {len(expected)} in {elapsed:.2f} s ({len(expected) / max(elapsed, 1e-9):.0f}/s) "
+          f"{'ok' if ok else 'FAILED'}")
+    if not ok:
+        print(f"  {len(result)} results for {len(expected)} operations" if len(result) != len(expected) else describe())
+    return ok
+
+
+def replay_fp_addsub(command, n, seed, out) -> bool:
+    a, b, sub = fp_stimulus.generate(n, seed=seed)
+    vectors, results = out / "fp_addsub.bin", out / "fp_addsub_results.bin"
+    np.stack([a, b, sub], axis=1).astype(">u4").tofile(vectors)
+
+    elapsed = replay(command, vectors, results)
+    result = np.memmap(results, dtype=np.uint32, mode="r") if results.stat().st_size else np.array([], dtype=np.uint32)
+    expected = reference(a, b, sub)
+
+    def describe():
+        # Bucket the mismatches and minimize one vector per bucket, rerunning the testbench once per round
+        triage = Triage()
+        triage.add(a, b, sub, result, expected)
+
+        async def run(ta, tb, tsub):
+            np.stack([ta, tb, tsub], axis=1).astype(">u4").tofile(out / "minimize.bin")
+            replay(command, out / "minimize.bin", out / "minimize_results.bin")
+            return np.fromfile(out / "minimize_results.bin", dtype=np.uint32)
+
+        asyncio.run(triage.minimize(run))
+        triage.write(out)
+        return f"{triage.summary()}\n  triage.json and triage.txt written to {out}"
+    return check("fp_addsub vectors", result, expected, elapsed, describe)
+
+
+def replay_alu_top(command, n, seed, out) -> bool:
+    rng = np.random.default_rng(seed)
+    a, b, sub = fp_stimulus.generate(n, seed=rng)
+    opcode = sub | np.where(rng.random(n) < 0.25, OP_ACCUMULATE, 0).astype(np.uint32)
+    data, control = schedule(a, b, opcode)
+    vectors, results = out / "alu_top.bin", out / "alu_top_results.bin"
+    np.stack([data, control], axis=1).astype(np.uint8).tofile(vectors)
+
+    elapsed = replay(command, vectors, results)
+    result = np.memmap(results, dtype=np.uint32, mode="r") if results.stat().st_size else np.array([], dtype=np.uint32)
+    expected = reference(a, b, opcode)
+
+    def describe():
+        bad = np.flatnonzero(result != expected)
+        return f"  {len(bad)} of {len(expected)} operations mismatched, first is operation {bad[0]} (opcode {opcode[bad[0]]}): " \
+               f"{result[bad[0]]:08x}, expected {expected[bad[0]]:08x}"
+    return check("alu_top operations", result, expected, elapsed, describe)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=1000000, help="vectors replayed through fp_addsub")
+    parser.add_argument("--ops", type=int, default=100000, help="operations streamed through alu_top")
+    parser.add_argument("--seed", type=int, default=int(os.environ.get("RANDOM_SEED", random.randrange(1 << 31))))
+    parser.add_argument("--sim", default=os.environ.get("SIM", "icarus"), choices=["icarus", "verilator"])
+    parser.add_argument("--adder", default=os.environ.get("FP_ADDSUB", "fp_addsub"), help="implementation of fp_addsub to replay")
+    parser.add_argument("--out", type=Path, default=TEST_DIR / "replay", help="output directory")
+    args = parser.parse_args()
+
+    out = args.out.resolve()
+    out.mkdir(parents=True, exist_ok=True)
+    print(f"Replaying on {args.sim} ({args.adder}), seed {args.seed}, output in {out}")
+
+    ok = True
+    if args.vectors:
+        ok &= replay_fp_addsub(build("replay_fp_addsub", args.sim, out, args.adder), args.vectors, args.seed, out)
+    if args.ops:
+        ok &= replay_alu_top(build("replay_alu_top", args.sim, out), args.ops, args.seed, out)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
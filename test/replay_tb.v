@@ -0,0 +1,157 @@
+`default_nettype none
+`timescale 1ns / 1ps
+
+/* Pure-HDL replay testbenches, run by replay.py without cocotb. Vectors are read from a binary
+file in chunks, results are written to another binary file and checked by Python in bulk.
+  +vectors=<file>  input, read with $fread (big-endian words)
+  +results=<file>  output, one 32-bit word per result written with %u (native byte order)
+*/
+
+// Implementation of fp_addsub under test, as in unit_tests.v
+`ifndef FP_ADDSUB
+`define FP_ADDSUB fp_addsub
+`endif
+
+// fp_addsub: every vector is 3 words (a, b, sub), applied one per time step
+module replay_fp_addsub ();
+
+    localparam CHUNK = 3 * 4096;  // Words read from the vector file at a time
+
+    reg  [31:0] vectors [0:CHUNK-1];
+    reg  [31:0] a;
+    reg  [31:0] b;
+    reg         sub;
+    wire [31:0] result;
+
+    `FP_ADDSUB floating_point_adder (
+        .a      (a),
+        .b      (b),
+        .sub    (sub),
+        .result (result)
+    );
+
+    reg [8*256-1:0] vector_file;
+    reg [8*256-1:0] result_file;
+    integer vector_fd, result_fd, words, i, count;
+
+    initial begin
+        if (!$value$plusargs("vectors=%s", vector_file) || !$value$plusargs("results=%s", result_file)) begin
+            $display("usage: +vectors=<file> +results=<file>");
+            $finish;
+        end
+        vector_fd = $fopen(vector_file, "rb");
+        result_fd = $fopen(result_file, "wb");
+        count = 0;
+
+        words = $fread(vectors, vector_fd, 0, CHUNK) / 4;
+        while (words > 0) begin
+            for (i = 0; i + 2 < words; i = i + 3) begin
+                a   = vectors[i];
+                b   = vectors[i + 1];
+                sub = vectors[i + 2][0];
+                #1;
+                $fwrite(result_fd, "%u", result);
+            end
+            count = count + words / 3;
+            words = $fread(vectors, vector_fd, 0, CHUNK) / 4;
+        end
+
+        $fclose(vector_fd);
+        $fclose(result_fd);
+        $display("replay_fp_addsub: %0d vectors", count);
+        $finish;
+    end
+
+endmodule
+
+
+// alu_top: the vector file is the per-cycle schedule of tt_protocol.schedule(), one {data, control}
+// pair of bytes per clock cycle with control = {start, opcode[1:0]}. Inputs are applied and outputs
+// sampled on the falling edge, every result shown on the output pins is written as one word.
+module replay_alu_top ();
+
+    localparam CHUNK = 8192;  // Cycles read from the vector file at a time
+
+    reg  [15:0] schedule [0:CHUNK-1];
+    reg         clk;
+    reg         rst_n;
+    reg  [7:0]  in_;
+    reg  [1:0]  opcode;
+    reg         start;
+    wire [7:0]  out;
+    wire        done;
+    wire [3:0]  state_out;
+
+    alu_top state_machine (
+        .clk       (clk),
+        .rst_n     (rst_n),
+        .in        (in_),
+        .out       (out),
+        .opcode    (opcode),
+        .start     (start),
+        .done      (done),
+        .state_out (state_out)
+    );
+
+    initial clk = 1'b0;
+    always #20 clk = ~clk;  // 40 ns period, as in the cocotb tests
+
+    reg [8*256-1:0] vector_file;
+    reg [8*256-1:0] result_file;
+    integer vector_fd, result_fd, cycles, i, count;
+    reg [31:0] word;   // Result bytes collected so far, byte 0 first
+    reg [1:0]  bytes;  // Number of result bytes in word
+
+    // Collect the output byte of the last rising edge
+    task sample;
+        begin
+            if (done) begin
+                word  = {out, word[31:8]};
+                bytes = bytes + 1;
+                if (bytes == 0) begin
+                    $fwrite(result_fd, "%u", word);
+                    count = count + 1;
+                end
+            end
+        end
+    endtask
+
+    initial begin
+        if (!$value$plusargs("vectors=%s", vector_file) || !$value$plusargs("results=%s", result_file)) begin
+            $display("usage: +vectors=<file> +results=<file>");
+            $finish;
+        end
+        vector_fd = $fopen(vector_file, "rb");
+        result_fd = $fopen(result_file, "wb");
+        count = 0;
+        bytes = 0;
+        word  = 0;
+
+        {in_, opcode, start} = 0;
+        rst_n = 1'b0;
+        repeat (10) @(negedge clk);
+        rst_n = 1'b1;
+
+        cycles = $fread(schedule, vector_fd, 0, CHUNK) / 2;
+        while (cycles > 0) begin
+            for (i = 0; i < cycles; i = i + 1) begin
+                @(negedge clk);
+                sample;
+                in_             = schedule[i][15:8];
+                {start, opcode} = schedule[i][2:0];
+            end
+            cycles = $fread(schedule, vector_fd, 0, CHUNK) / 2;
+        end
+
+        // Outputs of the last scheduled cycle
+        {in_, opcode, start} = 0;
+        @(negedge clk);
+        sample;
+
+        $fclose(vector_fd);
+        $fclose(result_fd);
+        $display("replay_alu_top: %0d results", count);
+        $finish;
+    end
+
+endmodule
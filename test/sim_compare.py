@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare simulators on the random fp_addsub regression.
+
+The same seeded batch runs once per simulator, one after the other, each with its own build
+directory under --out. The total time includes compiling the RTL, the throughput only counts the
+time spent driving vectors, as logged by the regression itself.
+
+    python sim_compare.py --vectors 1000000 --sims icarus verilator
+"""
+
+import argparse
+import json
+import re
+import shutil
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from regress import REGRESSION_MODULE, REGRESSION_TEST, TEST_DIR, Job, run_job
+
+
+BATCH_LOG = re.compile(r"(\d+) vectors in ([\d.]+) s")
+
+
+def measure(sim, vectors, seed, out):
+    out_dir = out / sim
+    shutil.rmtree(out_dir, ignore_errors=True)  # Include the build in the measurement
+    env = {"RANDOM_SEED": str(seed), "FP_VECTORS": str(vectors)}
+    job = run_job(Job(sim, REGRESSION_MODULE, env, testcase=REGRESSION_TEST), out, sim)
+
+    results = out_dir / "results.xml"
+    passed = job.returncode == 0 and results.exists() and ET.parse(results).getroot().find(".//failure") is None
+
+    batches = BATCH_LOG.findall((out_dir / "sim.log").read_text())
+    checked = sum(int(n) for n, _ in batches)
+    driving = sum(float(s) for _, s in batches)
+    return {
+        "sim": sim,
+        "passed": passed,
+        "vectors": checked,
+        "total_s": job.elapsed,
+        "drive_s": driving,                          # Time spent driving vectors through the simulator
+        "vectors_per_s": checked / max(driving, 1e-9),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sims", nargs="+", default=["icarus", "verilator"])
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=TEST_DIR / "sim_compare", help="output directory")
+    args = parser.parse_args()
+
+    out = args.out.resolve()
+    runs = []
+    for sim in args.sims:
+        print(f"Running {args.vectors} vectors on {sim}")
+        runs.append(measure(sim, args.vectors, args.seed, out))
+
+    base = runs[0]["vectors_per_s"]
+    print(f"{'simulator':<12} {'total s':>9} {'drive s':>9} {'vectors/s':>11} {'speedup':>8}")
+    for run in runs:
+        status = "" if run["passed"] else "  FAILED"
+        print(f"{run['sim']:<12} {run['total_s']:9.1f} {run['drive_s']:9.1f} {run['vectors_per_s']:11.0f} "
+              f"{run['vectors_per_s'] / max(base, 1e-9):7.1f}x{status}")
+
+    with open(out / "sim_compare.json", "w") as f:
+        json.dump(runs, f, indent=2)
+    return 0 if all(run["passed"] for run in runs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
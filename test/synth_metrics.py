@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+
+"""Synthesize the adder variants, alu_top and the project top with yosys and record their size and speed.
+
+Every design is synthesized to yosys generic gates (synth -flatten -noabc) for its cell count, flip-flop
+count and logic depth (longest combinational path in gates, ltp -noff). With a liberty file (--liberty,
+or the sky130_fd_sc_hd typical corner under $PDK_ROOT if it is installed), it is also mapped to the
+standard cells with ABC, which reports the area and the critical path delay. Without one, the delay is
+estimated as depth times --level-ps. Either way the delay is compared against clock_hz in info.yaml, and
+the delay_source column tells which one it is ("abc" or "estimate: depth x 150 ps").
+
+Results are kept in synth/metrics.json and synth/metrics.csv, one row per commit, design and liberty
+file, so runs on different commits add up to a table that shows how each change moved the numbers:
+
+    python synth_metrics.py -j 4
+    python synth_metrics.py --rev HEAD~3 --compare HEAD~3
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from git_info import git_commit
+
+
+TEST_DIR = Path(__file__).resolve().parent
+ROOT_DIR = TEST_DIR.parent
+METRICS_FILE = "metrics.json"
+SKY130_LIBERTY = "sky130A/libs.ref/sky130_fd_sc_hd/lib/sky130_fd_sc_hd__tt_025C_1v80.lib"
+LEVEL_PS = 150  # Rough delay of one generic gate level in sky130_fd_sc_hd, used without a liberty file
+
+ADDERS = ["fp_addsub", "fp_addsub_lza", "fp_addsub_dual"]  # Bit-identical implementations of fp_addsub
+PROJECT_TOP = "tt_um_32_bit_fp_ALU_S_M"
+CSV_FIELDS = ["commit", "design", "liberty", "cells", "flops", "depth", "area", "delay_ps", "delay_source",
+              "fmax_mhz", "clock_mhz", "slack_ns", "seconds"]
+
+
+class Design:
+    """A top module with its sources (relative to src/) and parameters. The adder is read in place of
+    fp_addsub for the designs that instantiate it."""
+
+    def __init__(self, name, top, sources, params=None, adder=None):
+        self.name = name
+        self.top = top
+        self.sources = sources
+        self.params = params or {}
+        self.adder = adder
+
+    def script(self, src_dir, liberty=None, period_ps=None) -> str:
+        files = [src_dir / name for name in self.sources]
+        commands = [f"read_verilog {' '.join(str(f) for f in files)}"]
+        if self.adder not in (None, "fp_addsub"):
+            commands.append(f"rename {self.adder} fp_addsub")
+        commands.append(f"hierarchy -top {self.top} " + " ".join(f"-chparam {k} {v}" for k, v in self.params.items()))
+        commands += [
+            f"synth -flatten -noabc -top {self.top}",
+            "tee -q -o generic.txt ltp -noff",
+            "tee -q -a generic.txt stat",
+        ]
+        if liberty:
+            # Written to a separate file, so a failing ABC run still leaves the generic numbers behind
+            commands += [
+                f"dfflibmap -liberty {liberty}",
+                f"abc -liberty {liberty}" + (f" -D {period_ps}" if period_ps else ""),
+                "opt_clean",
+                f"tee -q -o mapped.txt stat -liberty {liberty}",
+            ]
+        return "\n".join(commands) + "\n"
+
+
+def designs(root=ROOT_DIR) -> list:
+    """Every adder variant on its own and inside alu_top and the project top, the pipelined adder with
+    1 to 3 stages and the 16-bit lane. alu_top and the project top are read from the source files of the
+    tree under root, with the adder variant in place of fp_addsub.v"""
+    found = [Design(adder, adder, [f"{adder}.v"]) for adder in ADDERS]
+    found += [Design(f"fp_addsub_pipe[STAGES={n}]", "fp_addsub_pipe", ["fp_addsub_pipe.v"], {"STAGES": n}) for n in (1, 2, 3)]
+    found.append(Design("fp_addsub16", "fp_addsub16", ["fp_addsub16.v"]))
+    project = source_files(root)
+    for adder in ADDERS:
+        suffix = "" if adder == "fp_addsub" else f"[{adder}]"
+        sources = [f"{adder}.v" if name == "fp_addsub.v" else name for name in project]
+        found.append(Design(f"alu_top{suffix}", "alu_top", sources, adder=adder))
+        found.append(Design(f"project{suffix}", PROJECT_TOP, sources, adder=adder))
+    return found
+
+
+def find_yosys() -> list:
+    """Command that runs yosys: $YOSYS, yosys or the yowasp-yosys package"""
+    command = os.environ.get("YOSYS") or shutil.which("yosys") or shutil.which("yowasp-yosys")
+    if not command:
+        raise SystemExit("yosys not found, install it or pip install yowasp-yosys, or set YOSYS")
+    return command.split()
+
+
+def default_liberty():
+    path = Path(os.environ.get("PDK_ROOT", ROOT_DIR / "pdk")) / SKY130_LIBERTY
+    return path if path.exists() else None
+
+
+def clock_hz(root=ROOT_DIR) -> int:
+    match = re.search(r"^\s*clock_hz:\s*(\d+)", (root / "info.yaml").read_text(), re.MULTILINE)
+    return int(match.group(1)) if match else 0
+
+
+def source_files(root=ROOT_DIR) -> list:
+    """Project sources (relative to src/) listed under source_files in info.yaml, or every Verilog file
+    in src/ if the tree has no such list"""
+    info = root / "info.yaml"
+    block = re.search(r"^\s*source_files:\s*\n((?:\s*-.*\n?)+)", info.read_text() if info.exists() else "", re.MULTILINE)
+    if block:
+        return re.findall(r"-\s*[\"']?([^\"'\s#]+)", block.group(1))
+    return sorted(path.name for path in (root / "src").glob("*.v"))
+
+
+def parse_generic(text) -> dict:
+    """Cell and flip-flop counts from stat and the length of the longest path from ltp"""
+    depth = re.search(r"Longest topological path in \S+ \(length=(\d+)\)", text)
+    cells = re.search(r"^\s*(\d+)\s+cells$", text, re.MULTILINE)
+    flops = sum(int(n) for n in re.findall(r"^\s*(\d+)\s+\$_S?DFFE?_\w+$", text, re.MULTILINE))
+    return {
+        "cells": int(cells.group(1)) if cells else None,
+        "flops": flops,
+        "depth": int(depth.group(1)) if depth else None,
+    }
+
+
+def parse_mapped(stat_text, log_text) -> dict:
+    """Chip area from stat -liberty and the critical path delay ABC reports (stime) after mapping"""
+    area = re.search(r"Chip area for (?:top )?module .*?:\s*([\d.]+)", stat_text)
+    delays = re.findall(r"Delay\s*=\s*([\d.]+)\s*ps", log_text)
+    return {
+        "area": float(area.group(1)) if area else None,
+        "delay_ps": float(delays[-1]) if delays else None,
+    }
+
+
+def synthesize(design, yosys, src_dir, out, liberty=None, period_ps=None, level_ps=LEVEL_PS) -> dict:
+    """Run yosys on one design in its own directory under out and return its metrics"""
+    work = out / re.sub(r"[^\w.-]+", "_", design.name).strip("_")
+    work.mkdir(parents=True, exist_ok=True)
+    for name in ("generic.txt", "mapped.txt"):
+        (work / name).unlink(missing_ok=True)
+    (work / "synth.ys").write_text(design.script(src_dir, liberty, period_ps))
+
+    start = time.perf_counter()
+    result = subprocess.run(yosys + ["-q", "-l", "yosys.log", "-s", "synth.ys"], cwd=work,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    metrics = {"design": design.name, "seconds": round(time.perf_counter() - start, 1), "returncode": result.returncode,
+               "log": str(work / "yosys.log")}
+
+    generic = work / "generic.txt"
+    metrics.update(parse_generic(generic.read_text() if generic.exists() else ""))
+    metrics.update(area=None, delay_ps=None, delay_source=None)
+    if liberty:
+        mapped = work / "mapped.txt"
+        if mapped.exists():
+            metrics.update(parse_mapped(mapped.read_text(), (work / "yosys.log").read_text()))
+            metrics["delay_source"] = "abc" if metrics["delay_ps"] is not None else None
+    if metrics["delay_ps"] is None and metrics["depth"] is not None:
+        metrics.update(delay_ps=metrics["depth"] * level_ps, delay_source=f"estimate: depth x {level_ps:g} ps")
+    return metrics
+
+
+def is_estimate(row) -> bool:
+    """Whether the delay of a row is the depth estimate rather than a delay reported by ABC"""
+    return (row["delay_source"] or "").startswith("estimate")
+
+
+def add_timing(metrics, clock) -> dict:
+    """Maximum clock frequency and slack against the project clock"""
+    delay = metrics["delay_ps"]
+    metrics["fmax_mhz"] = round(1e6 / delay, 1) if delay else None
+    metrics["clock_mhz"] = clock / 1e6 if clock else None
+    metrics["slack_ns"] = round((1e12 / clock - delay) / 1e3, 2) if clock and delay else None
+    return metrics
+
+
+def checkout(rev, out) -> Path:
+    """Extract src/ and info.yaml of another commit and return the root of the extracted tree"""
+    tree = out / "rev" / rev.replace("/", "_")
+    shutil.rmtree(tree, ignore_errors=True)
+    tree.mkdir(parents=True)
+    archive = subprocess.run(["git", "archive", rev, "src", "info.yaml"], cwd=ROOT_DIR, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", str(tree)], input=archive, check=True)
+    return tree
+
+
+def short_rev(rev) -> str:
+    return subprocess.run(["git", "rev-parse", "--short", rev], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+
+
+def load(path) -> list:
+    return json.loads(path.read_text()) if path.exists() else []
+
+
+def save(rows, path):
+    """Write the table as JSON and CSV (same name, .csv)"""
+    rows.sort(key=lambda row: (row["commit"], row["liberty"] or "", row["design"]))
+    path.write_text(json.dumps(rows, indent=2) + "\n")
+    with open(path.with_suffix(".csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def format_table(rows, baseline=None) -> str:
+    """One line per design, with the change against the baseline row of the same design if there is one"""
+    base = {row["design"]: row for row in baseline or []}
+    lines = [f"{'Design':<32} {'Cells':>6} {'Flops':>6} {'Depth':>6} {'Area':>10} {'Delay ns':>9} {'Fmax MHz':>9} {'Slack ns':>9}"]
+    for row in rows:
+        area = f"{row['area']:.0f}" if row["area"] is not None else "-"
+        delay = f"{row['delay_ps'] / 1e3:.2f}" + ("*" if is_estimate(row) else "") if row["delay_ps"] else "-"
+        line = (f"{row['design']:<32} {row['cells'] or '-':>6} {row['flops']:>6} {row['depth'] or '-':>6} {area:>10} "
+                f"{delay:>9} {row['fmax_mhz'] or '-':>9} {row['slack_ns'] if row['slack_ns'] is not None else '-':>9}")
+        old = base.get(row["design"])
+        if old and old["cells"] and row["cells"] and old["depth"] and row["depth"]:
+            line += f"  cells {row['cells'] / old['cells'] - 1:+.1%} depth {row['depth'] - old['depth']:+d}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("designs", nargs="*", help="designs to synthesize (default: all, see --list)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="parallel yosys processes")
+    parser.add_argument("--list", action="store_true", help="list the designs and exit")
+    parser.add_argument("--rev", help="synthesize the sources of this commit instead of the working tree")
+    parser.add_argument("--liberty", type=Path, default=default_liberty(), help="liberty file to map to (default: sky130_fd_sc_hd tt under $PDK_ROOT, if installed)")
+    parser.add_argument("--no-liberty", action="store_true", help="generic gates only")
+    parser.add_argument("--level-ps", type=float, default=LEVEL_PS, help="delay per gate level for the estimate without a liberty file")
+    parser.add_argument("--compare", help="commit in the metrics file to show the changes against")
+    parser.add_argument("--out", type=Path, default=TEST_DIR / "synth", help="output directory, also holds the metrics file")
+    args = parser.parse_args()
+
+    names = [design.name for design in designs()]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    unknown = set(args.designs) - set(names)
+    if unknown:
+        parser.error(f"unknown designs: {', '.join(sorted(unknown))}")
+
+    yosys = find_yosys()
+    out = args.out.resolve()
+    out.mkdir(parents=True, exist_ok=True)
+    liberty = None if args.no_liberty or args.liberty is None else args.liberty.resolve()
+    if args.rev:
+        commit, root = short_rev(args.rev), checkout(args.rev, out)
+    else:
+        commit, root = git_commit(), ROOT_DIR
+    src_dir = root / "src"
+    selected = [design for design in designs(root) if not args.designs or design.name in args.designs]
+    missing = [design.name for design in selected if not all((src_dir / name).exists() for name in design.sources)]
+    if missing:
+        print(f"Skipping designs without sources in {commit}: {', '.join(missing)}")
+        selected = [design for design in selected if design.name not in missing]
+    clock = clock_hz(root)
+    period_ps = int(1e12 / clock) if clock else None
+
+    print(f"Synthesizing {len(selected)} designs of {commit} with {' '.join(yosys)}"
+          + (f", liberty {liberty.name}" if liberty else ", generic gates only"))
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        rows = list(pool.map(lambda design: synthesize(design, yosys, src_dir, out / "work", liberty, period_ps, args.level_ps), selected))
+
+    failed = [(row["design"], row.pop("log")) for row in rows if row["cells"] is None]
+    for row in rows:
+        add_timing(row, clock)
+        row.update(commit=commit, liberty=liberty.name if liberty else None)
+        row.pop("returncode")
+        row.pop("log", None)
+    rows = [row for row in rows if row["cells"] is not None]
+
+    path = out / METRICS_FILE
+    keys = {(row["commit"], row["design"], row["liberty"]) for row in rows}
+    table = [row for row in load(path) if (row["commit"], row["design"], row["liberty"]) not in keys] + rows
+    save(table, path)
+
+    baseline = None
+    if args.compare:
+        base_commit = short_rev(args.compare)
+        baseline = [row for row in table if row["commit"] == base_commit and row["liberty"] == (liberty.name if liberty else None)]
+        if not baseline:
+            print(f"No rows for {base_commit} in {path}, run with --rev {args.compare} first")
+    print(format_table(rows, baseline))
+    if any(is_estimate(row) for row in rows):
+        print(f"* estimated as depth x {args.level_ps:g} ps, no delay from a liberty mapping")
+    print(f"Metrics written to {path} and {path.with_suffix('.csv')}")
+    for name, log in failed:
+        print(f"ERROR: yosys did not finish {name}, see {log}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
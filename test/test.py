@@ -6,10 +6,19 @@ from cocotb.binary import BinaryValue
 from cocotb.clock import Clock
 from cocotb.triggers import ClockCycles, RisingEdge, ReadWrite, Timer
 
+import os
 import struct
 
+import numpy as np
+
+import fp_model
+import fp_stimulus
+from fp_driver import format_mismatches
+from tt_protocol import AluDriver, ProjectPins, FORMAT_FP16, OP_ACCUMULATE, reference
+
 
 PERIOD = 40  # Clock period in ns
+STREAM_OPS = int(os.environ.get("TT_STREAM_OPS", 2000))  # Number of operations pushed through the pins by test_project_stream
 
 
 @cocotb.test()
@@ -45,7 +54,7 @@ async def test_project(dut):
     dut._log.info("Reset complete - Test project behavior")
 
     # Begin the test by inputting start (io[2]) (indicate to ALU that we want to start inputting numbers)
-    dut.uio_in.value = BinaryValue("zzzzz1x0")  # Set io[0] = 0 for add, leave the output ones to be driven by design
+    dut.uio_in.value = BinaryValue("zzzzz100")  # Set io[1:0] = 00 for add, leave the output ones to be driven by design
 
     await RisingEdge(dut.clk)
     await ReadWrite()
@@ -54,7 +63,7 @@ async def test_project(dut):
     dut._log.info(f"io in: {dut.uio_in.value.binstr}")
 
     # Reset start to 0
-    dut.uio_in.value = BinaryValue("zzzzz0x0")
+    dut.uio_in.value = BinaryValue("zzzzz000")
 
     # Numbers to add
     a = 1.5
@@ -112,3 +121,52 @@ async def test_project(dut):
     # Check result
     final_number = struct.unpack("<f", result)[0]
     assert abs(final_number - expected) < 1e-6, f"Addition failed: {a} + {b} != {final_number}. {result=}"
+
+
+@cocotb.test()
+async def test_project_stream(dut):
+    """Push a long stream of add, subtract and accumulate operations through the project pins"""
+    alu = AluDriver(ProjectPins(dut), period_ns=PERIOD)
+    await alu.reset()
+
+    rng = np.random.default_rng(cocotb.RANDOM_SEED)
+    a, b, sub = fp_stimulus.generate(STREAM_OPS, seed=rng)
+    opcode = sub | np.where(rng.random(STREAM_OPS) < 0.25, OP_ACCUMULATE, 0)
+
+    # A single operation through the whole FSM, then the batch back to back
+    first = await alu.execute(a[0], b[0], sub[0])
+    assert first == reference(a[0], b[0], sub[0])[0], f"Single operation failed: {first:08x}"
+    cycles = alu.cycles
+    alu.queue(a, b, opcode)
+    result = await alu.run()
+    cycles = alu.cycles - cycles
+
+    # Accumulate operations take their operand A from the previous result
+    expected = reference(a, b, opcode, last=first)
+    a_used = np.where(opcode & OP_ACCUMULATE, np.concatenate([[first], expected[:-1]]), a)
+    assert np.array_equal(result, expected), format_mismatches(a_used, b, sub, result, expected)
+
+    dut._log.info(f"{STREAM_OPS} operations in {cycles} cycles, {cycles / STREAM_OPS:.3f} cycles per operation")
+    assert cycles == 8 * STREAM_OPS - 4 * np.count_nonzero(opcode & OP_ACCUMULATE) + 6, f"{STREAM_OPS} operations took {cycles} cycles"
+
+
+@cocotb.test()
+async def test_project_packed(dut):
+    """Sum two FP16 arrays at once through the project pins, one in each lane of the packed format"""
+    alu = AluDriver(ProjectPins(dut), period_ns=PERIOD)
+    await alu.reset()
+
+    rng = np.random.default_rng(cocotb.RANDOM_SEED)
+    lane0, lane1 = (rng.standard_normal((2, STREAM_OPS)) * 10).astype(np.float32)
+    values = fp_model.pack_halves(fp_model.float_to_half_bits(lane0), fp_model.float_to_half_bits(lane1))
+    sums = await alu.reduce_sum(values, fmt=FORMAT_FP16)
+
+    # values[0] + values[1], then every further value accumulated
+    a = np.zeros(len(values) - 1, dtype=np.uint32)
+    a[0] = values[0]
+    opcode = np.where(np.arange(len(a)) == 0, 0, OP_ACCUMULATE)
+    expected = reference(a, values[1:], opcode, fmt=FORMAT_FP16)
+    assert np.array_equal(sums, expected), format_mismatches(np.r_[values[0], expected[:-1]], values[1:], np.zeros(len(a), dtype=np.uint32), sums, expected)
+
+    total0, total1 = (fp_model.half_bits_to_float(lane) for lane in fp_model.unpack_halves(sums[-1]))
+    dut._log.info(f"Sums of {STREAM_OPS} FP16 values: {total0} and {total1} (float64: {lane0.sum(dtype=np.float64):.3f} and {lane1.sum(dtype=np.float64):.3f})")
@@ -1,9 +1,18 @@
+import os
+
 import cocotb
+import numpy as np
 from cocotb.triggers import RisingEdge, ReadWrite
 from cocotb.clock import Clock
 
+import fp_model
+import fp_stimulus
+from fp_driver import format_mismatches
+from tt_protocol import AluDriver, AluTopPins, FORMAT_BF16, FORMAT_FP16, FORMAT_FP32, OP_ACCUMULATE, PACKED_FORMATS, reference
+
 
 PERIOD = 40  # clock period in ns
+STREAM_OPS = int(os.environ.get("ALU_STREAM_OPS", 500))  # Number of operations in the streaming test
 
 
 @cocotb.test()
@@ -86,3 +95,125 @@ async def test_alu_fsm_sequence(dut):
     await ReadWrite()
     assert dut.state_out.value == 0, "FSM should remain in IDLE until start signal"
     assert dut.done.value == 0, "Done should be deasserted after returning to IDLE"
+
+
+@cocotb.test()
+async def test_alu_streaming(dut):
+    """Stream operations back to back: results are output while the next operands are loaded"""
+
+    cocotb.start_soon(Clock(dut.clk, PERIOD, units="ns").start())
+
+    dut.in_.value = 0
+    dut.opcode.value = 0
+    dut.start.value = 0
+    dut.rst_n.value = 0
+    await RisingEdge(dut.clk)
+    dut.rst_n.value = 1
+    await RisingEdge(dut.clk)
+    await ReadWrite()
+
+    a, b, sub = fp_stimulus.generate(STREAM_OPS, seed=cocotb.RANDOM_SEED)
+    result_bytes = []
+    cycles = 0
+
+    # Advance one clock cycle, collecting the output byte whenever done is high
+    async def tick():
+        nonlocal cycles
+        await RisingEdge(dut.clk)
+        await ReadWrite()
+        cycles += 1
+        if dut.done.value == 1:
+            result_bytes.append(dut.out.value.integer)
+
+    # Start pulse, then keep start low except while loading the last byte of every B that is followed by another operation
+    dut.start.value = 1
+    await tick()
+    dut.start.value = 0
+
+    for i in range(STREAM_OPS):
+        last = i == STREAM_OPS - 1
+
+        for j, byte in enumerate(int(a[i]).to_bytes(4, "little")):
+            assert dut.state_out.value.integer == j + 1, "Incorrect state, should be loading operand A"
+            dut.in_.value = byte
+            await tick()
+
+        for j, byte in enumerate(int(b[i]).to_bytes(4, "little")):
+            assert dut.state_out.value.integer == j + 5, "Incorrect state, should be loading operand B"
+            # The last byte of the previous result is output while the first byte of B is loaded
+            assert dut.done.value == int(j == 0 and i > 0), "Done should only be high with the last result byte"
+            dut.in_.value = byte
+            dut.opcode.value = int(sub[i])
+            dut.start.value = int(j == 3 and not last)
+            await tick()
+        dut.start.value = 0
+
+    # The last operation goes through EXECUTE and OUTPUT as usual
+    assert dut.state_out.value.integer == 9, "Incorrect state, should be calculating"
+    for _ in range(5):
+        await tick()
+    assert dut.state_out.value.integer == 0, "FSM should return to IDLE after the last result"
+
+    result = np.frombuffer(bytes(result_bytes), dtype="<u4")
+    expected = fp_model.fp_addsub(a, b, sub)
+    assert len(result) == STREAM_OPS, f"Expected {STREAM_OPS} results, got {len(result)}"
+    assert np.array_equal(result, expected), format_mismatches(a, b, sub, result, expected)
+
+    cycles_per_op = (cycles - 1) / STREAM_OPS  # Excluding the start pulse
+    dut._log.info(f"{STREAM_OPS} operations in {cycles} cycles, {cycles_per_op:.3f} cycles per operation")
+    assert cycles_per_op <= 8 + 5 / STREAM_OPS, f"Streaming should take 8 cycles per operation, took {cycles_per_op:.3f}"
+
+
+@cocotb.test()
+async def test_alu_accumulate(dut):
+    """Reduce a long float32 array through the accumulate mode and compare every partial sum"""
+
+    alu = AluDriver(AluTopPins(dut), period_ns=PERIOD)
+    await alu.reset()
+
+    rng = np.random.default_rng(cocotb.RANDOM_SEED)
+    values = fp_model.float_to_bits(rng.standard_normal(STREAM_OPS).astype(np.float32) * 100)
+    sums = await alu.reduce_sum(values)
+    cycles = alu.cycles
+
+    expected = fp_model.running_sum(values)
+    assert len(sums) == len(expected), f"Expected {len(expected)} partial sums, got {len(sums)}"
+    bad = np.flatnonzero(sums != expected)
+    assert len(bad) == 0, f"{len(bad)} partial sums mismatched, first after value {bad[0] + 1}: {sums[bad[0]]:08x} != {expected[bad[0]]:08x}"
+    assert dut.state_out.value.integer == 0, "FSM should return to IDLE after the last result"
+
+    cycles_per_add = cycles / len(sums)
+    dut._log.info(f"Sum of {len(values)} values: {fp_model.bits_to_float(sums[-1])} ({cycles} cycles, {cycles_per_add:.3f} cycles per addition)")
+    assert cycles_per_add <= 4 + 14 / len(sums), f"Accumulating should take 4 cycles per addition, took {cycles_per_add:.3f}"
+
+
+@cocotb.test()
+async def test_alu_packed(dut):
+    """Stream packed FP16 and bfloat16 operations (two additions each), then FP32 again to check the format is reloaded"""
+
+    alu = AluDriver(AluTopPins(dut), period_ns=PERIOD)
+    await alu.reset()
+    rng = np.random.default_rng(cocotb.RANDOM_SEED)
+
+    for fmt in [FORMAT_FP16, FORMAT_BF16]:
+        lanes = [fp_stimulus.generate_half(STREAM_OPS, PACKED_FORMATS[fmt], seed=rng) for _ in range(2)]
+        a = fp_model.pack_halves(lanes[0][0], lanes[1][0])
+        b = fp_model.pack_halves(lanes[0][1], lanes[1][1])
+        opcode = lanes[0][2] | np.where(rng.random(STREAM_OPS) < 0.25, OP_ACCUMULATE, 0)
+        opcode[0] &= ~OP_ACCUMULATE  # Accumulate from a result of this format
+
+        cycles = alu.cycles
+        alu.queue(a, b, opcode)
+        result = await alu.run(fmt=fmt)
+        cycles = alu.cycles - cycles
+
+        expected = reference(a, b, opcode, fmt=fmt)
+        a_used = np.where(opcode & OP_ACCUMULATE, np.concatenate([[0], expected[:-1]]), a)
+        assert np.array_equal(result, expected), f"{PACKED_FORMATS[fmt].name}: " + format_mismatches(a_used, b, opcode & 1, result, expected)
+        dut._log.info(f"{PACKED_FORMATS[fmt].name}: {2 * STREAM_OPS} additions in {cycles} cycles, {cycles / (2 * STREAM_OPS):.3f} cycles per addition")
+
+    a, b, sub = fp_stimulus.generate(STREAM_OPS, seed=rng)
+    alu.queue(a, b, sub)
+    result = await alu.run(fmt=FORMAT_FP32)
+    expected = fp_model.fp_addsub(a, b, sub)
+    assert np.array_equal(result, expected), "fp32: " + format_mismatches(a, b, sub, result, expected)
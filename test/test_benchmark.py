@@ -0,0 +1,167 @@
+import os
+import struct
+
+import cocotb
+import numpy as np
+from cocotb.binary import BinaryValue
+from cocotb.clock import Clock
+from cocotb.triggers import ReadWrite, RisingEdge, Timer
+
+import fp_model
+import fp_stimulus
+from benchmark import DEFAULT_TOLERANCE, Benchmark, report_path
+from fp_driver import LANES, drive_fp_addsub, drive_fp_addsub_lanes
+from tt_protocol import AluDriver, AluTopPins, ProjectPins
+
+
+# Fixed workloads measuring how fast the testbench runs (not part of the default MODULE list):
+#   make MODULE=test_benchmark
+# Every test adds its numbers to benchmark.json. With BENCH_BASELINE pointing to an earlier
+# benchmark.json, a test fails when one of its workloads got slower by more than BENCH_TOLERANCE.
+
+PERIOD = 40  # clock period in ns
+SCALE = float(os.environ.get("BENCH_SCALE", 1))  # Multiplier for the size of every workload
+BASELINE = os.environ.get("BENCH_BASELINE")
+TOLERANCE = float(os.environ.get("BENCH_TOLERANCE", DEFAULT_TOLERANCE))
+
+bench = Benchmark()
+baseline = Benchmark.read(BASELINE) if BASELINE else None
+
+
+def size(n) -> int:
+    return max(1, int(n * SCALE))
+
+
+def report(dut, *names):
+    """Write the results so far and fail if any of the given workloads regressed"""
+    bench.write(report_path())
+    for name in names:
+        r = bench.results[name]
+        dut._log.info(f"{name}: {r['rate']:.0f} {r['unit']}/s, {r['us_per_op']:.2f} us each, {r['sim_ns_per_s']:.0f} sim ns/s")
+    if baseline is not None:
+        slower = bench.regressions(baseline, TOLERANCE, names)
+        assert not slower, "Testbench got slower:\n" + "\n".join(slower)
+
+
+@cocotb.test()
+async def bench_triggers(dut):
+    """Cost of a single trigger, which every driver pays at least once per vector or cycle"""
+    cocotb.start_soon(Clock(dut.clk, PERIOD, units="ns").start())
+    n = size(20000)
+
+    step = Timer(1, units="step")
+    start = bench.start()
+    for _ in range(n):
+        await step
+    bench.stop("timer_step", n, start, unit="triggers")
+
+    edge = RisingEdge(dut.clk)
+    start = bench.start()
+    for _ in range(n):
+        await edge
+    bench.stop("rising_edge", n, start, unit="triggers")
+
+    start = bench.start()
+    for _ in range(n):
+        await RisingEdge(dut.clk)
+        await ReadWrite()
+    bench.stop("rising_edge_read_write", n, start, unit="cycles")
+
+    report(dut, "timer_step", "rising_edge", "rising_edge_read_write")
+
+
+@cocotb.test()
+async def bench_handles(dut):
+    """Cost of signal access and value conversions in Python, without advancing simulation time"""
+    n = size(50000)
+    values = np.random.default_rng(1).integers(0, 1 << 32, n, dtype=np.uint64).tolist()
+    a, result = dut.a, dut.result
+    await Timer(1, units="step")
+
+    start = bench.start()
+    for value in values:
+        a.value = value
+    bench.stop("handle_write", n, start)
+
+    start = bench.start()
+    for _ in values:
+        int(result.value)
+    bench.stop("handle_read_int", n, start)
+
+    start = bench.start()
+    for _ in values:
+        result.value.binstr[0:4]
+    bench.stop("handle_read_binstr", n, start)
+
+    start = bench.start()
+    for value in values:
+        BinaryValue(value, n_bits=32, bigEndian=False).binstr
+    bench.stop("binary_value", n, start)
+
+    floats = fp_model.bits_to_float(np.array(values, dtype=np.uint32)).tolist()
+    start = bench.start()
+    for f in floats:
+        for i in range(4):
+            struct.pack("<f", f)[i]
+    bench.stop("struct_pack_bytes", n, start)
+
+    start = bench.start()
+    for value in values:
+        value.to_bytes(4, "little")
+    bench.stop("int_to_bytes", n, start)
+
+    report(dut, "handle_write", "handle_read_int", "handle_read_binstr", "binary_value", "struct_pack_bytes", "int_to_bytes")
+
+
+@cocotb.test()
+async def bench_fp_addsub(dut):
+    """Vectors per second through the combinational adder, as driven by the random regression"""
+    n = size(20000)
+    a, b, sub = fp_stimulus.generate(n, seed=1)
+
+    start = bench.start()
+    await drive_fp_addsub(dut, a, b, sub)
+    bench.stop("fp_addsub", n, start, unit="vectors")
+
+    start = bench.start()
+    await drive_fp_addsub_lanes(dut, a, b, sub)
+    bench.stop("fp_addsub_lanes", n, start, unit="vectors")
+
+    start = bench.start()
+    fp_model.fp_addsub(a, b, sub)
+    bench.stop("fp_model", n, start, unit="vectors")
+
+    dut._log.info(f"fp_addsub_lanes: {LANES} lanes")
+    report(dut, "fp_addsub", "fp_addsub_lanes", "fp_model")
+
+
+@cocotb.test()
+async def bench_alu_top(dut):
+    """Operations per second streamed through alu_top on its own"""
+    alu = AluDriver(AluTopPins(dut), period_ns=PERIOD)
+    await alu.reset()
+    n = size(2000)
+    a, b, sub = fp_stimulus.generate(n, seed=1)
+
+    start = bench.start()
+    alu.queue(a, b, sub)
+    await alu.run()
+    bench.stop("alu_top", n, start)
+
+    report(dut, "alu_top")
+
+
+@cocotb.test()
+async def bench_project(dut):
+    """Operations per second streamed through the project pins"""
+    alu = AluDriver(ProjectPins(dut), period_ns=PERIOD)
+    await alu.reset()
+    n = size(2000)
+    a, b, sub = fp_stimulus.generate(n, seed=1)
+
+    start = bench.start()
+    alu.queue(a, b, sub)
+    await alu.run()
+    bench.stop("project", n, start)
+
+    report(dut, "project")
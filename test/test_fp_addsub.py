@@ -1,11 +1,26 @@
+import glob
 import math
+import os
 import struct                                  # For float <-> binary conversion
 
 import cocotb                                  # Main Cocotb library
+import numpy as np
 from cocotb.triggers import Timer              # For time-based delays
 
+import fp_model                                # Bit-exact reference model of fp_addsub.v
+import fp_stimulus                             # Random vectors of every class of operation
+from fp_driver import LANES, drive_fp_addsub, drive_fp_addsub_lanes, format_mismatches, run_regression  # Batched drivers for the combinational adder
+from fp_coverage import Coverage, report_path, steer  # Functional coverage of the adder's branches
+from fp_fuzz import read_vectors                # Replay files, one "a b sub" vector per line
+from fp_triage import Triage, report_dir        # Mismatches bucketed by root-cause signature
+
 
 PERIOD = 40  # clock period in ns
+VECTORS = int(os.environ.get("FP_VECTORS", 100000))  # Number of vectors in the random regression
+BATCH = 10000                                        # Vectors generated and checked at a time
+STOP_ON_COVERAGE = os.environ.get("FP_STOP_ON_COVERAGE", "0") == "1"  # Stop the regression once every bin is hit
+# Replay files rerun by test_replay_files, regressions/*.txt unless FP_REPLAY lists other files
+REPLAY = os.environ.get("FP_REPLAY", "").split() or sorted(glob.glob(os.path.join(os.path.dirname(__file__), "regressions", "*.txt")))
 
 
 # NOTE: cocotb handles the endianness issue, so 240 = 0x00 FF = 00000000 11111111 is inputted as a[16..0] = 00000000 11111111, and not a[16..0] = 11111111 00000000 due to little endianness represents it as 0xFF 00 in memory
@@ -472,3 +487,79 @@ async def test_result_negative_zero(dut):
     await Timer(PERIOD, units='ns')
     result = bits_to_float(dut.result.value.integer)
     assert str(result) == str(expected), f"Result should have been positive zero: {a} - {b} != {result}"
+
+# Test bit-exact agreement with the reference model on directed edge cases
+@cocotb.test()
+async def test_reference_model(dut):
+    # (a, b, sub) bit patterns: truncation on align, cancellation, subnormals, overflow, signed zeros, NaN payloads
+    vectors = [
+        (0x3F800000, 0x33800001, 0),  # 1.0 + tiny, bits of B are truncated away
+        (0x3F800000, 0x3F7FFFFF, 1),  # 1.0 - (1.0 - ulp), full cancellation down to one bit
+        (0x40490FDB, 0x402DF854, 1),  # pi - e
+        (0x00000001, 0x00000001, 0),  # Smallest subnormal + smallest subnormal
+        (0x00800000, 0x00000001, 1),  # Smallest normal - smallest subnormal = largest subnormal
+        (0x007FFFFF, 0x00000001, 0),  # Largest subnormal + smallest subnormal = smallest normal
+        (0x7F7FFFFF, 0x7F7FFFFF, 0),  # Overflow to +inf
+        (0xFF7FFFFF, 0x7F7FFFFF, 1),  # Overflow to -inf
+        (0x80000000, 0x00000000, 1),  # -0 - +0 = -0
+        (0x80000000, 0x80000000, 1),  # -0 - -0 = +0
+        (0x7F800001, 0x3F800000, 0),  # Signalling NaN is returned as +qNaN
+        (0xFFC12345, 0x3F800000, 1),  # Negative NaN with payload is returned as +qNaN
+        (0x7F800000, 0x7F800000, 1),  # inf - inf = qNaN
+        (0x4B800000, 0x3F800000, 1),  # 2^24 - 1.0, the subtracted bit is truncated
+    ]
+
+    for a, b, sub in vectors:
+        dut.a.value = a
+        dut.b.value = b
+        dut.sub.value = sub
+
+        await Timer(PERIOD, units='ns')
+        result = dut.result.value.integer
+        expected = int(fp_model.fp_addsub(a, b, sub))
+        assert result == expected, f"Reference model mismatch: {a:08x} {'-' if sub else '+'} {b:08x} = {result:08x}, expected {expected:08x}"
+
+# Test that the multi-lane adder returns every lane in its place, including a partly filled last step
+@cocotb.test()
+async def test_multi_lane(dut):
+    a, b, sub = fp_stimulus.generate(3 * LANES + 5, seed=cocotb.RANDOM_SEED)
+    lanes = await drive_fp_addsub_lanes(dut, a, b, sub)
+    single = await drive_fp_addsub(dut, a, b, sub)
+    expected = fp_model.fp_addsub(a, b, sub)
+    assert np.array_equal(single, expected), format_mismatches(a, b, sub, single, expected)
+    assert np.array_equal(lanes, expected), format_mismatches(a, b, sub, lanes, expected)
+
+# Test a large generated batch (uniform, exponent sweeps, cancellation, subnormal, overflow and special classes)
+# Generation is steered towards uncovered branches of fp_addsub.v and the coverage report is written next to results.xml
+# Mismatches don't stop the run, they are bucketed by signature and every bucket is minimized into triage.txt
+# The batches go through the multi-lane adder, LANES vectors per simulator step
+@cocotb.test()
+async def test_random_regression(dut):
+    coverage = Coverage()
+    triage = Triage()
+    batch = 0
+    while coverage.vectors < VECTORS:
+        a, b, sub = steer(coverage, min(BATCH, VECTORS - coverage.vectors), seed=(cocotb.RANDOM_SEED, batch))
+        await run_regression(dut, a, b, sub, triage, drive=drive_fp_addsub_lanes)
+        coverage.sample(a, b, sub)
+        batch += 1
+
+        if STOP_ON_COVERAGE and coverage.closed:
+            dut._log.info(f"Coverage closed after {coverage.vectors} vectors")
+            break
+
+    coverage.write(report_path())
+    dut._log.info(coverage.summary())
+
+    if triage.failures:
+        await triage.minimize(lambda a, b, sub: drive_fp_addsub_lanes(dut, a, b, sub))
+        triage.write(report_dir())
+    assert not triage.failures, triage.summary()
+
+# Rerun the replay files: the cases in regressions/, or the files in FP_REPLAY (e.g. a triage.txt or fuzz/failures.txt)
+@cocotb.test()
+async def test_replay_files(dut):
+    for path in REPLAY:
+        a, b, sub = read_vectors(path)
+        await run_regression(dut, a, b, sub)
+        dut._log.info(f"Replayed {len(a)} vectors from {path}")
@@ -0,0 +1,135 @@
+import glob
+import os
+
+import cocotb
+import numpy as np
+from cocotb.clock import Clock
+from cocotb.triggers import ReadWrite, RisingEdge
+
+import fp_model
+import fp_stimulus
+from fp_driver import format_mismatches
+from fp_fuzz import read_vectors
+
+
+PERIOD = 40  # clock period in ns
+STAGES = int(os.environ.get("PIPE_STAGES", 3))       # Expected latency of the pipelined adder, in cycles
+VECTORS = int(os.environ.get("FP_PIPE_VECTORS", 20000))  # Number of vectors streamed through the pipeline
+
+# Replay files streamed by test_pipe_replay_files, the same as in test_fp_addsub.py
+REPLAY = os.environ.get("FP_REPLAY", "").split() or sorted(glob.glob(os.path.join(os.path.dirname(__file__), "regressions", "*.txt")))
+
+
+async def reset(dut):
+    cocotb.start_soon(Clock(dut.clk, PERIOD, units="ns").start())
+
+    dut.pipe_valid_in.value = 0
+    dut.pipe_a.value = 0
+    dut.pipe_b.value = 0
+    dut.pipe_sub.value = 0
+    dut.rst_n.value = 0
+
+    await RisingEdge(dut.clk)
+    await ReadWrite()
+    dut.rst_n.value = 1
+
+
+async def stream(dut, a, b, sub, valid):
+    """Offer one vector per cycle (only where valid is set) and collect every result leaving the pipeline.
+
+    Returns the results and the number of cycles until the last one came out
+    """
+    results = []
+    cycles = 0
+    pending = int(np.count_nonzero(valid))
+    inputs = zip(a.tolist(), b.tolist(), sub.tolist(), valid.tolist())
+
+    while len(results) < pending:
+        # Drive the next vector (or a bubble once all vectors are in)
+        a_bits, b_bits, sub_bit, valid_bit = next(inputs, (0, 0, 0, 0))
+        dut.pipe_a.value = a_bits
+        dut.pipe_b.value = b_bits
+        dut.pipe_sub.value = sub_bit
+        dut.pipe_valid_in.value = valid_bit
+
+        await RisingEdge(dut.clk)
+        await ReadWrite()
+        cycles += 1
+        assert cycles <= len(valid) + STAGES, f"Pipeline lost results: {len(results)} of {pending} after {cycles} cycles"
+
+        if dut.pipe_valid_out.value == 1:
+            results.append(dut.pipe_result.value.integer)
+
+    return np.array(results, dtype=np.uint32), cycles
+
+
+@cocotb.test()
+async def test_pipe_latency(dut):
+    """A single operation comes out exactly STAGES cycles after it went in"""
+    await reset(dut)
+
+    a, b = fp_model.float_to_bits(1.5), fp_model.float_to_bits(1.75)
+    dut.pipe_a.value = int(a)
+    dut.pipe_b.value = int(b)
+    dut.pipe_sub.value = 0
+    dut.pipe_valid_in.value = 1
+
+    latency = 0
+    while True:
+        await RisingEdge(dut.clk)
+        await ReadWrite()
+        dut.pipe_valid_in.value = 0
+        latency += 1
+        if dut.pipe_valid_out.value == 1:
+            break
+        assert latency < STAGES, f"No result after {latency} cycles"
+
+    assert latency == STAGES, f"Latency should be {STAGES} cycles, got {latency}"
+    assert dut.pipe_result.value.integer == fp_model.float_to_bits(3.25), f"1.5 + 1.75 != {dut.pipe_result.value.integer:08x}"
+
+    # valid_out is a single cycle pulse for a single operation
+    await RisingEdge(dut.clk)
+    await ReadWrite()
+    assert dut.pipe_valid_out.value == 0, "valid_out should drop after the only result"
+
+
+@cocotb.test()
+async def test_pipe_back_to_back(dut):
+    """Sustain one result per cycle for a long batch and match the reference model"""
+    await reset(dut)
+
+    a, b, sub = fp_stimulus.generate(VECTORS, seed=cocotb.RANDOM_SEED)
+    result, cycles = await stream(dut, a, b, sub, np.ones(VECTORS, dtype=bool))
+
+    expected = fp_model.fp_addsub(a, b, sub)
+    assert np.array_equal(result, expected), format_mismatches(a, b, sub, result, expected)
+    assert cycles == VECTORS + STAGES - 1, f"{VECTORS} back-to-back operations took {cycles} cycles"
+
+
+@cocotb.test()
+async def test_pipe_bubbles(dut):
+    """Results stay in order and aligned with their operands when valid_in has gaps"""
+    await reset(dut)
+
+    rng = np.random.default_rng(cocotb.RANDOM_SEED)
+    a, b, sub = fp_stimulus.generate(VECTORS // 4, seed=rng)
+    valid = rng.random(len(a)) < 0.6
+    result, _ = await stream(dut, a, b, sub, valid)
+
+    a, b, sub = a[valid], b[valid], sub[valid]
+    expected = fp_model.fp_addsub(a, b, sub)
+    assert np.array_equal(result, expected), format_mismatches(a, b, sub, result, expected)
+
+
+# Stream the replay files back to back, e.g. a counterexample of formal_equiv.py (in the order of its cycles)
+@cocotb.test()
+async def test_pipe_replay_files(dut):
+    await reset(dut)
+    for path in REPLAY:
+        a, b, sub = read_vectors(path)
+        result, cycles = await stream(dut, a, b, sub, np.ones(len(a), dtype=bool))
+
+        expected = fp_model.fp_addsub(a, b, sub)
+        assert np.array_equal(result, expected), f"{path}: " + format_mismatches(a, b, sub, result, expected)
+        assert cycles == len(a) + STAGES - 1, f"{path}: {len(a)} back-to-back operations took {cycles} cycles"
+        dut._log.info(f"Replayed {len(a)} vectors from {path}")
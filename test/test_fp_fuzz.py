@@ -0,0 +1,58 @@
+import os
+from pathlib import Path
+
+import cocotb
+import numpy as np
+
+from fp_driver import drive_fp_addsub_lanes
+from fp_fuzz import Corpus, Fuzzer, read_vectors, write_vectors
+from fp_triage import Triage, describe, signature
+
+
+# Coverage-guided fuzzing of fp_addsub, not part of the default run:
+#   make -B MODULE=test_fp_fuzz FUZZ_VECTORS=1000000
+# The corpus is kept in FUZZ_DIR between runs, so every run carries on from where the last one stopped.
+
+FUZZ_DIR = Path(os.environ.get("FUZZ_DIR", Path(__file__).resolve().parent / "fuzz"))
+VECTORS = int(os.environ.get("FUZZ_VECTORS", 200000))  # Number of fuzzed vectors per run
+BATCH = 5000                                           # Candidates generated and checked at a time
+
+CORPUS_FILE = FUZZ_DIR / "corpus.txt"
+FAILURES_FILE = FUZZ_DIR / "failures.txt"
+
+
+@cocotb.test()
+async def test_fuzz(dut):
+    """Replay the saved corpus and failures, fuzz from the corpus and save it back along with minimized failures"""
+    FUZZ_DIR.mkdir(parents=True, exist_ok=True)
+    corpus = Corpus.read(CORPUS_FILE)
+    saved_failures = read_vectors(FAILURES_FILE)
+    dut._log.info(f"Loaded from {FUZZ_DIR}: {corpus.summary()}, {len(saved_failures[0])} saved failures")
+
+    async def run(a, b, sub):
+        return await drive_fp_addsub_lanes(dut, a, b, sub)
+
+    # Replay first, so a fix or a regression shows up before any fuzzing
+    triage = Triage()
+    for a, b, sub in ((corpus.a, corpus.b, corpus.sub), saved_failures):
+        triage.add(a, b, sub, await run(a, b, sub))
+
+    fuzzer = Fuzzer(corpus, seed=cocotb.RANDOM_SEED)
+    for start in range(0, VECTORS, BATCH):
+        a, b, sub = fuzzer.candidates(min(BATCH, VECTORS - start))
+        triage.add(a, b, sub, await run(a, b, sub))
+        kept = corpus.add(a, b, sub)
+        if kept:
+            dut._log.info(f"{start + len(a)} vectors: {kept} new, {corpus.summary()}")
+    corpus.write(CORPUS_FILE)
+    dut._log.info(corpus.summary())
+
+    if triage.failures:
+        # One minimized vector per failure signature, earlier cases stay in the file as regression cases
+        await triage.minimize(run)
+        cases = sorted(set(zip(*(column.tolist() for column in saved_failures))) | set(triage.representatives()))
+        a, b, sub = np.array(cases, dtype=np.uint32).T
+        comments = [describe(code) for code in signature(a, b, sub, await run(a, b, sub))]
+        write_vectors(FAILURES_FILE, a, b, sub, comments)
+        dut._log.info(f"{len(cases)} failure cases written to {FAILURES_FILE}")
+    assert not triage.failures, triage.summary()
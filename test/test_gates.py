@@ -4,12 +4,34 @@
 import cocotb
 from cocotb.binary import BinaryValue
 from cocotb.clock import Clock
-from cocotb.triggers import ClockCycles, RisingEdge, ReadWrite, Timer
+from cocotb.result import SimTimeoutError
+from cocotb.triggers import ClockCycles, RisingEdge, ReadWrite, Timer, with_timeout
 
+import json
+import os
 import struct
+import time
 
+import numpy as np
 
-PERIOD = 40  # Clock period in ns
+import fp_model
+from fp_coverage import BINS, balanced, classify
+from fp_driver import format_mismatches
+from synth_metrics import clock_hz
+from tt_protocol import AluDriver, ProjectPins
+
+
+PERIOD = float(os.environ.get("GL_PERIOD", 40))  # Clock period in ns
+GL_VECTORS = int(os.environ.get("GL_VECTORS", 1000))  # Number of operations in the gate level regression
+
+# Clock period sweep, only with delays back-annotated from the SDF of the hardened design (GL_SDF)
+SDF = os.environ.get("GL_SDF")
+SWEEP_START = float(os.environ.get("GL_SWEEP_START", 50))      # First (slowest) clock period in ns
+SWEEP_STOP = float(os.environ.get("GL_SWEEP_STOP", 5))         # Shortest clock period tried
+SWEEP_STEP = float(os.environ.get("GL_SWEEP_STEP", 2.5))       # Decrease of the period per step
+SWEEP_VECTORS = int(os.environ.get("GL_SWEEP_VECTORS", 500))   # Operations per period, same count in every bin
+SWEEP_FAILS = int(os.environ.get("GL_SWEEP_FAILS", 2))         # Stop after this many failing periods in a row
+TIMING_FILE = "timing.json"
 
 
 @cocotb.test()
@@ -49,7 +71,7 @@ async def test_project(dut):
     dut._log.info("Reset complete - Test project behavior")
 
     # Begin the test by inputting start (io[2]) (indicate to ALU that we want to start inputting numbers)
-    dut.uio_in.value = BinaryValue("zzzzz1x0")  # Set io[0] = 0 for add, leave the output ones to be driven by design
+    dut.uio_in.value = BinaryValue("zzzzz100")  # Set io[1:0] = 00 for add, leave the output ones to be driven by design
 
     await RisingEdge(dut.clk)
     await ReadWrite()
@@ -57,7 +79,7 @@ async def test_project(dut):
     dut._log.info(f"io in: {dut.uio_in.value.binstr}")
 
     # Reset start to 0
-    dut.uio_in.value = BinaryValue("zzzzz0x0")
+    dut.uio_in.value = BinaryValue("zzzzz000")
 
     # Numbers to add
     a = 1.5
@@ -122,3 +144,95 @@ async def test_project(dut):
     # Check result
     final_number = struct.unpack("<f", result)[0]
     assert abs(final_number - expected) < 1e-6, f"Addition failed: {a} + {b} != {final_number}. {result=}"
+
+
+@cocotb.test(skip=GL_VECTORS == 0)
+async def test_gl_regression(dut):
+    """Stream a seeded batch with the same number of vectors in every coverage bin through the netlist"""
+    dut.user_project.VPWR.value = 1
+    dut.user_project.VGND.value = 0
+    alu = AluDriver(ProjectPins(dut), gate_level=True, period_ns=PERIOD)
+    await alu.reset()
+
+    a, b, sub = balanced(GL_VECTORS, seed=cocotb.RANDOM_SEED)
+    alu.queue(a, b, sub)
+    start = time.perf_counter()
+    result = await alu.run()
+    elapsed = time.perf_counter() - start
+    dut._log.info(f"{GL_VECTORS} operations ({alu.cycles} cycles) in {elapsed:.1f} s, {GL_VECTORS / elapsed:.1f} vectors/s")
+
+    # The model is bit-exact with the RTL (see test_fp_addsub.py), so any difference comes from the netlist
+    expected = fp_model.fp_addsub(a, b, sub)
+    bad = result != expected
+    if bad.any():
+        failing = np.bincount(classify(a[bad], b[bad], sub[bad]), minlength=len(BINS))
+        dut._log.error("Mismatches per bin: " + ", ".join(f"{BINS[i]}: {n}" for i, n in enumerate(failing) if n))
+    assert not bad.any(), format_mismatches(a, b, sub, result, expected)
+
+
+@cocotb.test(skip=not SDF)
+async def test_gl_timing_sweep(dut):
+    """Run a class-balanced batch at shorter and shorter clock periods and report the fastest one without mismatches"""
+    dut.user_project.VPWR.value = 1
+    dut.user_project.VGND.value = 0
+    a, b, sub = balanced(SWEEP_VECTORS, seed=cocotb.RANDOM_SEED)
+    expected = fp_model.fp_addsub(a, b, sub)
+    bins = classify(a, b, sub)
+
+    steps, fails, fastest = [], 0, None
+    periods = [round(SWEEP_START - k * SWEEP_STEP, 3) for k in range(int((SWEEP_START - SWEEP_STOP) / SWEEP_STEP + 1e-9) + 1)]
+    for period in periods:
+        if fails >= SWEEP_FAILS:
+            break
+        # A new driver per period: fresh clock, reset, so a failure at one period does not leak into the next
+        alu = AluDriver(ProjectPins(dut), gate_level=True, period_ns=period)
+        await alu.reset()
+        alu.queue(a, b, sub)
+        try:
+            result = await with_timeout(alu.run(), 2 * (8 * SWEEP_VECTORS + 20) * period, "ns")
+        except SimTimeoutError:
+            result = np.array(alu.monitor.results, dtype=np.uint32)  # The protocol broke down, missing results count as mismatches
+        alu.stop()
+
+        done = min(len(result), SWEEP_VECTORS)
+        bad = np.ones(SWEEP_VECTORS, dtype=bool)
+        bad[:done] = result[:done] != expected[:done]
+        failing = np.bincount(bins[bad], minlength=len(BINS))
+        steps.append({
+            "period_ns": period,
+            "mhz": round(1e3 / period, 2),
+            "mismatches": int(bad.sum()),
+            "completed": int(done),
+            "bins": {BINS[i]: int(n) for i, n in enumerate(failing) if n},
+        })
+        dut._log.info(f"{period:6.2f} ns ({1e3 / period:6.1f} MHz): {int(bad.sum())} of {SWEEP_VECTORS} wrong" +
+                      "".join(f", {BINS[i]}: {n}" for i, n in sorted(enumerate(failing), key=lambda x: -x[1])[:4] if n))
+        if bad.any():
+            fails += 1
+        elif fails == 0:
+            fastest = period  # Every period down to this one passed
+
+    # Bins failing first and most often, over every failing period
+    worst = np.zeros(len(BINS), dtype=np.int64)
+    for step in steps:
+        for name, n in step["bins"].items():
+            worst[BINS.index(name)] += n
+    report = {
+        "sdf": SDF,
+        "vectors": SWEEP_VECTORS,
+        "seed": cocotb.RANDOM_SEED,
+        "clock_hz": clock_hz(),
+        "fastest_period_ns": fastest,
+        "fmax_mhz": None if fastest is None else round(1e3 / fastest, 2),
+        "worst_bins": {BINS[i]: int(worst[i]) for i in np.argsort(-worst, kind="stable") if worst[i]},
+        "steps": steps,
+    }
+    path = os.path.join(os.path.dirname(os.path.abspath(os.environ.get("COCOTB_RESULTS_FILE", "results.xml"))), TIMING_FILE)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    assert fastest is not None, f"Mismatches already at {SWEEP_START} ns, see {path}"
+    dut._log.info(f"Fastest clock without mismatches: {fastest:.2f} ns ({1e3 / fastest:.1f} MHz), info.yaml has {clock_hz() / 1e6:g} MHz")
+    if report["worst_bins"]:
+        dut._log.info("Bins failing at shorter periods: " + ", ".join(f"{name}: {n}" for name, n in report["worst_bins"].items()))
+    assert clock_hz() <= 1e9 / fastest, f"clock_hz in info.yaml ({clock_hz() / 1e6:g} MHz) is faster than the measured {1e3 / fastest:.1f} MHz"
@@ -0,0 +1,86 @@
+import os
+
+import cocotb
+import numpy as np
+from cocotb.clock import Clock
+from cocotb.triggers import ReadWrite, RisingEdge
+
+import fp_stimulus
+from alu_model import AluTop, PipelinedAdder
+
+
+PERIOD = 40  # clock period in ns
+STAGES = int(os.environ.get("PIPE_STAGES", 3))             # Latency of the pipelined adder
+CYCLES = int(os.environ.get("MODEL_DIFF_CYCLES", 20000))  # Number of random clock cycles to compare
+
+
+@cocotb.test()
+async def test_model_matches_rtl(dut):
+    """Drive random inputs into every clocked block and compare the RTL with alu_model.py on every cycle"""
+    cocotb.start_soon(Clock(dut.clk, PERIOD, units="ns").start())
+    rng = np.random.default_rng(cocotb.RANDOM_SEED)
+    project, alu, pipe = AluTop(), AluTop(), PipelinedAdder(STAGES)
+
+    # Operand bytes come from the stimulus mix, so that 4 consecutive bytes often form an interesting float
+    a, b, sub = fp_stimulus.generate(CYCLES, seed=rng)
+    data = np.frombuffer(a.astype("<u4").tobytes(), dtype=np.uint8)[:CYCLES].tolist()
+    alu_data = np.frombuffer(b.astype("<u4").tobytes(), dtype=np.uint8)[:CYCLES].tolist()
+    start = (rng.random((2, CYCLES)) < 0.3).astype(int).tolist()
+    opcode = rng.integers(0, 4, (2, CYCLES)).tolist()
+    valid = (rng.random(CYCLES) < 0.7).astype(int).tolist()
+    reset = (rng.random(CYCLES) < 0.002).astype(int).tolist()
+    a, b, sub = a.tolist(), b.tolist(), sub.tolist()
+
+    dut.ena.value = 1
+    dut.rst_n.value = 0
+    await RisingEdge(dut.clk)
+    await ReadWrite()
+
+    for i in range(CYCLES):
+        # Inputs of this cycle, an occasional asynchronous reset
+        dut.rst_n.value = 1 - reset[i]
+        dut.ui_in.value = data[i]
+        dut.uio_in.value = start[0][i] << 2 | opcode[0][i]
+        dut.in_.value = alu_data[i]
+        dut.start.value = start[1][i]
+        dut.opcode.value = opcode[1][i]
+        dut.pipe_valid_in.value = valid[i]
+        dut.pipe_a.value = a[i]
+        dut.pipe_b.value = b[i]
+        dut.pipe_sub.value = sub[i]
+
+        await RisingEdge(dut.clk)
+        await ReadWrite()
+
+        if reset[i]:
+            project.reset()
+            alu.reset()
+            pipe.reset()
+        else:
+            project.clock(data[i], opcode[0][i], start[0][i])
+            alu.clock(alu_data[i], opcode[1][i], start[1][i])
+            pipe.clock(valid[i], a[i], b[i], sub[i])
+
+        rtl = {
+            "uo_out": int(dut.uo_out.value),
+            "uio_out": int(dut.uio_out.value),
+            "out": int(dut.out.value),
+            "done": int(dut.done.value),
+            "state_out": int(dut.state_out.value),
+            "pipe_valid_out": int(dut.pipe_valid_out.value),
+        }
+        model = {
+            "uo_out": project.out,
+            "uio_out": project.state << 4 | project.done << 3,
+            "out": alu.out,
+            "done": alu.done,
+            "state_out": alu.state,
+            "pipe_valid_out": pipe.valid_out,
+        }
+        if pipe.valid_out:
+            rtl["pipe_result"], model["pipe_result"] = int(dut.pipe_result.value), pipe.result
+
+        diff = [f"{name}: RTL {rtl[name]:#x}, model {model[name]:#x}" for name in rtl if rtl[name] != model[name]]
+        assert not diff, f"Model and RTL differ after cycle {i}:\n  " + "\n  ".join(diff)
+
+    dut._log.info(f"Model matched the RTL for {CYCLES} cycles")
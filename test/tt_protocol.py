@@ -0,0 +1,279 @@
+import functools
+
+import numpy as np
+import cocotb
+
+import fp_model
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, Event, FallingEdge, ReadWrite, RisingEdge
+
+
+# Transaction-level driver and monitor for the ALU byte protocol (see docs/info.md).
+#
+# Operations are queued as (a, b, opcode) transactions and turned into a per-cycle schedule of
+# input pin values up front, which is then played back one clock cycle at a time. Consecutive
+# operations are streamed (start held high while B[3] is loaded), so a batch costs 8 cycles per
+# operation, or 4 for accumulate operations. The monitor independently collects a result from
+# every 4 output bytes presented with done high.
+#
+# The byte on the input bus in the cycle where an operation is started from IDLE selects the number
+# format (FORMAT_*), which holds for the whole stream. In the packed formats every 32-bit operand and
+# result holds two 16-bit floats (see fp_model.pack_halves), so one operation does two additions.
+
+OP_ADD = 0b00         # A + B
+OP_SUB = 0b01         # A - B
+OP_ACCUMULATE = 0b10  # Operand A is the previous result, only B is loaded
+
+FORMAT_FP32 = 0       # One 32-bit float per operand
+FORMAT_FP16 = 1       # Two packed FP16 floats per operand
+FORMAT_BF16 = 2       # Two packed bfloat16 floats per operand
+PACKED_FORMATS = {FORMAT_FP16: fp_model.FP16, FORMAT_BF16: fp_model.BF16}
+
+
+class RtlTiming:
+    """Drive and sample right after the rising edge, registered outputs are already updated in ReadWrite"""
+
+    def __init__(self, clk):
+        self.clk = clk
+
+    async def drive_point(self):
+        await RisingEdge(self.clk)
+        await ReadWrite()
+
+    sample_point = drive_point
+
+
+class GateLevelTiming:
+    """Drive and sample on the falling edge: flip-flop outputs of the netlist change after a delay, so
+    nothing is read or changed close to the rising edge"""
+
+    def __init__(self, clk):
+        self.clk = clk
+
+    async def drive_point(self):
+        await FallingEdge(self.clk)
+
+    sample_point = drive_point
+
+
+class ProjectPins:
+    """Pins of tt_um_32_bit_fp_ALU_S_M: ui_in, uo_out, uio_in[2:0] = {start, opcode}, uio_out[7:3] = {state, done}"""
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.clk = dut.clk
+        self.rst_n = dut.rst_n
+
+    def reset_inputs(self):
+        self.dut.ena.value = 1
+        self.dut.ui_in.value = 0
+        self.dut.uio_in.value = 0
+
+    def drive(self, byte, control):
+        self.dut.ui_in.value = byte
+        self.dut.uio_in.value = control  # {start, opcode[1:0]}
+
+    def sample(self):
+        """Return (done, output byte, state)"""
+        uio_out = int(self.dut.uio_out.value)
+        return (uio_out >> 3) & 1, int(self.dut.uo_out.value), uio_out >> 4
+
+
+class AluTopPins:
+    """Pins of alu_top used on its own (the state_machine instance of unit_tests.v)"""
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.clk = dut.clk
+        self.rst_n = dut.rst_n
+
+    def reset_inputs(self):
+        self.dut.in_.value = 0
+        self.dut.opcode.value = 0
+        self.dut.start.value = 0
+
+    def drive(self, byte, control):
+        self.dut.in_.value = byte
+        self.dut.opcode.value = control & 0b11
+        self.dut.start.value = control >> 2
+
+    def sample(self):
+        return int(self.dut.done.value), int(self.dut.out.value), int(self.dut.state_out.value)
+
+
+def schedule(a, b, opcode, stream=True, fmt=FORMAT_FP32):
+    """Build the per-cycle input values for a batch of operations.
+
+    Returns (bytes, controls) arrays with one entry per clock cycle, where control is {start, opcode[1:0]}.
+    With stream=False every operation is started from IDLE and its result is read out before the next one.
+    fmt is the number format (FORMAT_*) of the whole batch.
+    """
+    a = np.asarray(a, dtype=np.uint32)
+    b = np.asarray(b, dtype=np.uint32)
+    opcode = np.broadcast_to(np.asarray(opcode, dtype=np.uint8), a.shape)
+    START = 0b100
+
+    data, control = [], []
+    for i in range(len(a)):
+        op = int(opcode[i])
+        first = i == 0 or not stream
+        last = i == len(a) - 1
+
+        if first:
+            data.append(fmt)
+            control.append(START | op)  # Start from IDLE, opcode[1] picks the first operation's type, the byte the format
+
+        if not op & OP_ACCUMULATE:
+            data.extend(int(a[i]).to_bytes(4, "little"))
+            control.extend([op] * 4)
+        data.extend(int(b[i]).to_bytes(4, "little"))
+        control.extend([op] * 3)
+
+        if stream and not last:
+            # Start the next operation, whose opcode[1] is sampled with start. This one is executed in its first cycle
+            control.append(START | (op & OP_SUB) | (int(opcode[i + 1]) & OP_ACCUMULATE))
+        else:
+            control.append(op)
+            # EXECUTE and OUTPUT_0..3, then back to IDLE
+            data.extend([0] * 5)
+            control.extend([op & OP_SUB] * 5)
+
+    return np.array(data, dtype=np.uint8), np.array(control, dtype=np.uint8)
+
+
+def reference(a, b, opcode, last=0, fmt=FORMAT_FP32) -> np.ndarray:
+    """Expected results of a batch of operations, accumulate operations taking the previous result as operand A.
+
+    last is the result of the operation before the batch (0 after reset)
+    """
+    a, b, opcode = np.broadcast_arrays(np.atleast_1d(np.asarray(a, dtype=np.uint32)),
+                                       np.asarray(b, dtype=np.uint32), np.asarray(opcode, dtype=np.uint8))
+    sub = (opcode & OP_SUB).astype(np.uint32)
+    if fmt in PACKED_FORMATS:
+        addsub = functools.partial(fp_model.fp_addsub_packed, fmt=PACKED_FORMATS[fmt])
+    else:
+        addsub = fp_model.fp_addsub
+    result = addsub(a, b, sub)
+
+    # Accumulate operations are resolved in passes, each one once the operation before it is final
+    todo = (opcode & OP_ACCUMULATE) != 0
+    while todo.any():
+        ready = np.flatnonzero(todo & ~np.concatenate([[False], todo[:-1]]))
+        operand_a = np.where(ready == 0, np.uint32(last), result[ready - 1])
+        result[ready] = addsub(operand_a, b[ready], sub[ready])
+        todo[ready] = False
+    return result
+
+
+class AluMonitor:
+    """Collects a 32-bit result from every 4 output bytes presented with done high"""
+
+    def __init__(self, pins, timing, record_states=False):
+        self.pins = pins
+        self.timing = timing
+        self.results = []
+        self.states = [] if record_states else None
+        self._bytes = []
+        self._event = Event()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = cocotb.start_soon(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.kill()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.timing.sample_point()
+            done, byte, state = self.pins.sample()
+            if self.states is not None:
+                self.states.append((state, done))
+            if done:
+                self._bytes.append(byte)
+                if len(self._bytes) == 4:
+                    self.results.append(int.from_bytes(bytes(self._bytes), "little"))
+                    self._bytes = []
+                    self._event.set()
+
+    async def wait_for(self, count):
+        """Wait until at least count results have been collected"""
+        while len(self.results) < count:
+            self._event.clear()
+            await self._event.wait()
+
+
+class AluDriver:
+    """Issues whole operations as awaitable transactions"""
+
+    def __init__(self, pins, gate_level=False, period_ns=40, record_states=False):
+        self.pins = pins
+        self.period_ns = period_ns
+        timing = GateLevelTiming if gate_level else RtlTiming
+        self.timing = timing(self.pins.clk)
+        self.monitor = AluMonitor(self.pins, self.timing, record_states)
+        self.cycles = 0   # Clock cycles spent driving operations
+        self._queue = []
+        self._clock = None
+
+    async def reset(self, cycles=10):
+        """Start the clock, reset the design and start the monitor"""
+        self._clock = cocotb.start_soon(Clock(self.pins.clk, self.period_ns, units="ns").start())
+        self.pins.reset_inputs()
+        self.pins.rst_n.value = 0
+        await ClockCycles(self.pins.clk, cycles)
+        self.pins.rst_n.value = 1
+        await self.timing.drive_point()
+        self.monitor.start()
+
+    def stop(self):
+        """Stop the clock and the monitor, so that another driver can take over the pins"""
+        self.monitor.stop()
+        if self._clock is not None:
+            self._clock.kill()
+            self._clock = None
+
+    def queue(self, a, b=0, opcode=OP_ADD):
+        """Queue one operation, or arrays of operations, to be run by the next call to run()"""
+        a, b, opcode = np.broadcast_arrays(np.atleast_1d(np.asarray(a, dtype=np.uint32)),
+                                           np.asarray(b, dtype=np.uint32), np.asarray(opcode, dtype=np.uint8))
+        self._queue.append((a, b, opcode))
+
+    async def run(self, stream=True, fmt=FORMAT_FP32) -> np.ndarray:
+        """Run every queued operation back to back in the number format fmt and return their results"""
+        if not self._queue:
+            return np.array([], dtype=np.uint32)
+        a, b, opcode = (np.concatenate(column) for column in zip(*self._queue))
+        self._queue = []
+
+        data, control = schedule(a, b, opcode, stream, fmt)
+        first = len(self.monitor.results)
+        for byte, ctrl in zip(data.tolist(), control.tolist()):
+            self.pins.drive(byte, ctrl)
+            await self.timing.drive_point()
+        self.pins.drive(0, 0)
+        self.cycles += len(data)
+
+        await self.monitor.wait_for(first + len(a))
+        return np.array(self.monitor.results[first:first + len(a)], dtype=np.uint32)
+
+    async def execute(self, a, b, opcode=OP_ADD) -> int:
+        """Run a single operation and return its result"""
+        self.queue(a, b, opcode)
+        return int((await self.run())[0])
+
+    async def reduce_sum(self, values, fmt=FORMAT_FP32) -> np.ndarray:
+        """Sum float32 bit patterns: values[0] + values[1] as a normal operation, then accumulate every further value.
+
+        In a packed format every value holds two 16-bit floats, which are summed separately.
+        Returns every partial sum, the last one being the total
+        """
+        values = np.asarray(values, dtype=np.uint32)
+        if len(values) < 2:
+            raise ValueError("reduce_sum needs at least 2 values")
+        self.queue(values[0], values[1], OP_ADD)
+        self.queue(0, values[2:], OP_ACCUMULATE | OP_ADD)
+        return await self.run(fmt=fmt)
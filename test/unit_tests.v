@@ -1,18 +1,57 @@
 `default_nettype none
 `timescale 1ns / 1ps
 
+// Number of stages of the pipelined adder under test
+`ifndef PIPE_STAGES
+`define PIPE_STAGES 3
+`endif
+
+// Number of lanes of the multi-lane adder
+`ifndef FP_LANES
+`define FP_LANES 16
+`endif
+
+// Implementation of fp_addsub under test (fp_addsub or one of its bit-identical variants)
+`ifndef FP_ADDSUB
+`define FP_ADDSUB fp_addsub
+`endif
+
 /* This testbench just instantiates the module and makes some convenient wires
 that can be driven / tested by the cocotb test.py.
 */
 module unit_tests ();
 
-    // Dump the signals to a VCD file. You can view it with gtkwave or surfer.
+    // Dump the signals to a VCD or FST file. You can view it with gtkwave or surfer.
+    // Dumping is off unless the Makefile passes +dumpfile=<file> (DUMP=1 or DUMP=window):
+    //   +dumpscope=<instance>  only dump one instance, e.g. floating_point_adder or state_machine
+    //   +dumpall               dump from the start, otherwise only while dump_on is set from Python
+    reg dump_on;                // Switches dumping on and off, see waves.py
+    reg [8*256-1:0] dump_file;
+    reg [8*64-1:0]  dump_scope;
+
     initial begin
-    $dumpfile("unit_tests.vcd");
-    $dumpvars(0, unit_tests);
+    if ($value$plusargs("dumpfile=%s", dump_file)) begin
+        if (!$value$plusargs("dumpscope=%s", dump_scope)) dump_scope = "unit_tests";
+        $dumpfile(dump_file);
+        case (dump_scope)
+            "user_project":         $dumpvars(0, user_project);
+            "floating_point_adder": $dumpvars(0, floating_point_adder);
+            "half_adder":           $dumpvars(0, half_adder);
+            "multi_lane_adder":     $dumpvars(0, multi_lane_adder);
+            "pipelined_adder":      $dumpvars(0, pipelined_adder);
+            "state_machine":        $dumpvars(0, state_machine);
+            default:                $dumpvars(0, unit_tests);
+        endcase
+        if (!$test$plusargs("dumpall")) $dumpoff;
+    end
     #1;
     end
 
+    always @(dump_on) begin
+        if (dump_on) $dumpon;
+        else         $dumpoff;
+    end
+
     // Test the whole system
     // Wire up the inputs and outputs:
     reg clk;
@@ -42,7 +81,7 @@ module unit_tests ();
     wire sub;
     wire [31:0] result;
 
-    fp_addsub floating_point_adder (
+    `FP_ADDSUB floating_point_adder (
         .a      (a),
         .b      (b),
         .sub    (sub),
@@ -50,10 +89,60 @@ module unit_tests ();
     );
 
 
+    // Test the floating point adder in FP_LANES lanes side by side, FP_LANES vectors at a time
+    wire [32*`FP_LANES-1:0] lanes_a;
+    wire [32*`FP_LANES-1:0] lanes_b;
+    wire [`FP_LANES-1:0] lanes_sub;
+    wire [32*`FP_LANES-1:0] lanes_result;
+
+    fp_addsub_lanes #(.LANES(`FP_LANES)) multi_lane_adder (
+        .a      (lanes_a),
+        .b      (lanes_b),
+        .sub    (lanes_sub),
+        .result (lanes_result)
+    );
+
+
+    // Test one 16-bit lane of the packed formats by itself
+    wire [15:0] half_a;
+    wire [15:0] half_b;
+    wire half_sub;
+    wire half_bf16;
+    wire [15:0] half_result;
+
+    fp_addsub16 half_adder (
+        .a      (half_a),
+        .b      (half_b),
+        .sub    (half_sub),
+        .bf16   (half_bf16),
+        .result (half_result)
+    );
+
+
+    // Test the pipelined floating point adder/subtract
+    wire pipe_valid_in;
+    wire [31:0] pipe_a;
+    wire [31:0] pipe_b;
+    wire pipe_sub;
+    wire pipe_valid_out;
+    wire [31:0] pipe_result;
+
+    fp_addsub_pipe #(.STAGES(`PIPE_STAGES)) pipelined_adder (
+        .clk       (clk),
+        .rst_n     (rst_n),
+        .valid_in  (pipe_valid_in),
+        .a         (pipe_a),
+        .b         (pipe_b),
+        .sub       (pipe_sub),
+        .valid_out (pipe_valid_out),
+        .result    (pipe_result)
+    );
+
+
     // Test the state machine (alu_top) on its own
     wire [7:0] in_;
     wire [7:0] out;
-    wire opcode;
+    wire [1:0] opcode;
     wire start;
     wire done;
     wire [3:0] state_out;
@@ -63,7 +152,7 @@ module unit_tests ();
         .rst_n     (rst_n),    // Active-low reset input
         .in        (in_),      // 8-bit input data bus for operand bytes
         .out       (out),      // 8-bit output data bus for result bytes
-        .opcode    (opcode),   // 1-bit opcode (0 for add, 1 for subtract)
+        .opcode    (opcode),   // 2-bit opcode (bit 0: add/subtract, bit 1: accumulate)
         .start     (start),    // 'Start' signal for user to request an operation
         .done      (done),     // 'Done' signal indicating ready to output data
         .state_out (state_out) // Current state of the ALU
@@ -0,0 +1,33 @@
+import os
+from contextlib import contextmanager
+
+
+# Waveform control for unit_tests.v and integration_tests.v. The Makefile sets DUMP:
+#   0       no waveform file (default)
+#   1       dump the whole run
+#   window  only dump while a test has a window open, e.g. around the first failing vector
+# Dumping is switched with the dump_on register of the testbench, so outside of DUMP=window
+# everything here does nothing.
+
+MODE = os.environ.get("DUMP", "0")
+WINDOWED = MODE == "window"
+
+
+def on(dut):
+    if WINDOWED:
+        dut.dump_on.value = 1
+
+
+def off(dut):
+    if WINDOWED:
+        dut.dump_on.value = 0
+
+
+@contextmanager
+def window(dut):
+    """Dump everything simulated inside the with block"""
+    on(dut)
+    try:
+        yield
+    finally:
+        off(dut)